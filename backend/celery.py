@@ -2,8 +2,9 @@
 Celery configuration for backend project.
 """
 import os
-from celery import Celery
-from celery.schedules import crontab
+import socket
+from celery import Celery, group
+from backend.schedules import crontab
 from decouple import config
 
 # Set the default Django settings module for the 'celery' program.
@@ -22,197 +23,66 @@ app.autodiscover_tasks()
 
 
 # ============================================================================
-# CONSOLIDATED CELERY BEAT SCHEDULE FOR ALL APPS
+# CELERY BEAT SCHEDULE
 # ============================================================================
+# Each app owns its periodic tasks in <app>/celery_beat.py. They are merged
+# into the existing schedule with .update() rather than reassigning the dict,
+# so Beat only rebuilds its heap when the schedule actually changes.
+# Entries tagged [long] usually run for more than a minute. The report tasks
+# among them are routed to the `reports_long` queue (see task_routes) so they
+# never hold up short notification tasks.
 
-app.conf.beat_schedule = {
-    # ============================================================================
-    # CUSTOMERS APP SCHEDULES
-    # ============================================================================
-    'cleanup-expired-reset-codes': {
-        'task': 'customers.tasks.cleanup_expired_reset_codes',
-        'schedule': crontab(hour=0, minute=0),  # Daily at midnight
-    },
-    'generate-customer-report': {
-        'task': 'customers.tasks.generate_customer_report',
-        'schedule': crontab(day_of_week=1, hour=9, minute=0),  # Every Monday at 9 AM
-    },
-    'check-inactive-customers': {
-        'task': 'customers.tasks.check_inactive_customers',
-        'schedule': crontab(day_of_week=0, hour=10, minute=0),  # Every Sunday at 10 AM
-    },
-    'analyze-customer-engagement': {
-        'task': 'customers.tasks.analyze_customer_engagement',
-        'schedule': crontab(day_of_month=1, hour=8, minute=0),  # First day of month at 8 AM
-    },
-    
-    # ============================================================================
-    # INVENTORY APP SCHEDULES
-    # ============================================================================
-    'monitor-stock-levels': {
-        'task': 'inventory.tasks.monitor_stock_levels',
-        'schedule': crontab(minute='*/30'),  # Every 30 minutes
-    },
-    'check-damaged-stock': {
-        'task': 'inventory.tasks.check_damaged_stock',
-        'schedule': crontab(hour=9, minute=0),  # Daily at 9 AM
-    },
-    'monitor-warehouse-capacity': {
-        'task': 'inventory.tasks.monitor_warehouse_capacity',
-        'schedule': crontab(minute=0, hour='*/6'),  # Every 6 hours
-    },
-    'monitor-pending-transfers': {
-        'task': 'inventory.tasks.monitor_pending_transfers',
-        'schedule': crontab(minute=0, hour='*/2'),  # Every 2 hours
-    },
-    'schedule-automatic-stock-counts': {
-        'task': 'inventory.tasks.schedule_automatic_stock_counts',
-        'schedule': crontab(day_of_week=1, hour=8, minute=0),  # Every Monday at 8 AM
-    },
-    'analyze-stock-count-discrepancies': {
-        'task': 'inventory.tasks.analyze_stock_count_discrepancies',
-        'schedule': crontab(day_of_week=0, hour=10, minute=0),  # Every Sunday at 10 AM
-    },
-    'generate-inventory-valuation-report': {
-        'task': 'inventory.tasks.generate_inventory_valuation_report',
-        'schedule': crontab(hour=23, minute=0),  # Daily at 11 PM
-    },
-    'generate-reorder-recommendations': {
-        'task': 'inventory.tasks.generate_reorder_recommendations',
-        'schedule': crontab(hour=9, minute=0),  # Daily at 9 AM
-    },
-    'analyze-stock-turnover': {
-        'task': 'inventory.tasks.analyze_stock_turnover',
-        'schedule': crontab(day_of_week=0, hour=11, minute=0),  # Every Sunday at 11 AM
-    },
-    'detect-suspicious-movements': {
-        'task': 'inventory.tasks.detect_suspicious_movements',
-        'schedule': crontab(hour=8, minute=0),  # Daily at 8 AM
-    },
-    'generate-movement-audit-report': {
-        'task': 'inventory.tasks.generate_movement_audit_report',
-        'schedule': crontab(day_of_week=1, hour=10, minute=0),  # Every Monday at 10 AM
-    },
-    'cleanup-old-resolved-alerts': {
-        'task': 'inventory.tasks.cleanup_old_resolved_alerts',
-        'schedule': crontab(day_of_month=1, hour=3, minute=0),  # Monthly on 1st at 3 AM
-    },
-    'sync-product-stock-from-warehouses': {
-        'task': 'inventory.tasks.sync_product_stock_from_warehouses',
-        'schedule': crontab(minute=0, hour='*/6'),  # Every 6 hours
-    },
-    
-    # ============================================================================
-    # ORDERS APP SCHEDULES
-    # ============================================================================
-    'auto-confirm-paid-orders': {
-        'task': 'orders.tasks.auto_confirm_paid_orders',
-        'schedule': crontab(minute='*/5'),  # Every 5 minutes
-    },
-    'auto-cancel-unpaid-orders': {
-        'task': 'orders.tasks.auto_cancel_unpaid_orders',
-        'schedule': crontab(hour=2, minute=0),  # Daily at 2 AM
-    },
-    'check-delayed-orders': {
-        'task': 'orders.tasks.check_delayed_orders',
-        'schedule': crontab(hour=9, minute=0),  # Daily at 9 AM
-    },
-    'check-pending-orders': {
-        'task': 'orders.tasks.check_pending_orders',
-        'schedule': crontab(minute=0),  # Every hour
-    },
-    'sync-tracking-updates': {
-        'task': 'orders.tasks.sync_tracking_updates',
-        'schedule': crontab(minute=0, hour='*/6'),  # Every 6 hours
-    },
-    'generate-daily-order-report': {
-        'task': 'orders.tasks.generate_daily_order_report',
-        'schedule': crontab(hour=23, minute=0),  # Daily at 11 PM
-    },
-    'cleanup-old-order-data': {
-        'task': 'orders.tasks.cleanup_old_order_data',
-        'schedule': crontab(day_of_week=0, hour=3, minute=0),  # Every Sunday at 3 AM
-    },
-    
-    # ============================================================================
-    # PAYMENTS APP SCHEDULES
-    # ============================================================================
-    'check-pending-mpesa-transactions': {
-        'task': 'payments.tasks.check_pending_transactions',
-        'schedule': crontab(minute='*/5'),  # Every 5 minutes
-    },
-    'auto-timeout-stuck-transactions': {
-        'task': 'payments.tasks.auto_timeout_stuck_transactions',
-        'schedule': crontab(minute=0),  # Every hour
-    },
-    'monitor-failed-payments': {
-        'task': 'payments.tasks.monitor_failed_payments',
-        'schedule': crontab(minute=30),  # Every hour at minute 30
-    },
-    'reconcile-daily-mpesa-transactions': {
-        'task': 'payments.tasks.reconcile_daily_transactions',
-        'schedule': crontab(hour=23, minute=30),  # Daily at 11:30 PM
-    },
-    'cleanup-old-mpesa-callbacks': {
-        'task': 'payments.tasks.cleanup_old_callbacks',
-        'schedule': crontab(day_of_week=0, hour=2, minute=0),  # Every Sunday at 2 AM
-    },
-    'refresh-mpesa-access-tokens': {
-        'task': 'payments.tasks.refresh_mpesa_access_tokens',
-        'schedule': crontab(minute='*/50'),  # Every 50 minutes
-    },
-    
-    # ============================================================================
-    # PRODUCTS APP SCHEDULES
-    # ============================================================================
-    'check-low-stock-products': {
-        'task': 'products.tasks.check_low_stock_products',
-        'schedule': crontab(minute=0),  # Every hour
-    },
-    'check-out-of-stock-products': {
-        'task': 'products.tasks.check_out_of_stock_products',
-        'schedule': crontab(minute=0, hour='*/2'),  # Every 2 hours
-    },
-    'auto-deactivate-out-of-stock': {
-        'task': 'products.tasks.auto_deactivate_out_of_stock_products',
-        'schedule': crontab(day_of_week=1, hour=3, minute=0),  # Every Monday at 3 AM
-    },
-    'auto-approve-verified-reviews': {
-        'task': 'products.tasks.auto_approve_verified_reviews',
-        'schedule': crontab(hour=2, minute=0),  # Daily at 2 AM
-    },
-    'expire-sales-daily': {
-        'task': 'products.tasks.expire_sale_prices',
-        'schedule': crontab(hour=0, minute=5),  # Daily at 12:05 AM
-    },
-    'expire-new-arrivals-daily': {
-        'task': 'products.tasks.expire_new_arrivals',
-        'schedule': crontab(hour=0, minute=10),  # Daily at 12:10 AM
-    },
-    'activate-scheduled-products': {
-        'task': 'products.tasks.activate_scheduled_products',
-        'schedule': crontab(hour=0, minute=15),  # Daily at 12:15 AM
-    },
-    'update-bestsellers-daily': {
-        'task': 'products.tasks.update_bestseller_status',
-        'schedule': crontab(hour=3, minute=0),  # Daily at 3 AM
-    },
-    'generate-product-performance-report': {
-        'task': 'products.tasks.generate_product_performance_report',
-        'schedule': crontab(hour=23, minute=0),  # Daily at 11 PM
-    },
-    'update-product-popularity-scores': {
-        'task': 'products.tasks.update_product_popularity_scores',
-        'schedule': crontab(hour=4, minute=0),  # Daily at 4 AM
-    },
-    'check-pricing-anomalies': {
-        'task': 'products.tasks.check_pricing_anomalies',
+from customers.celery_beat import BEAT_SCHEDULE as CUSTOMERS_BEAT_SCHEDULE
+from inventory.celery_beat import BEAT_SCHEDULE as INVENTORY_BEAT_SCHEDULE
+from orders.celery_beat import BEAT_SCHEDULE as ORDERS_BEAT_SCHEDULE
+from payments.celery_beat import BEAT_SCHEDULE as PAYMENTS_BEAT_SCHEDULE
+from products.celery_beat import BEAT_SCHEDULE as PRODUCTS_BEAT_SCHEDULE
+
+for _schedule in (
+    CUSTOMERS_BEAT_SCHEDULE,
+    INVENTORY_BEAT_SCHEDULE,
+    ORDERS_BEAT_SCHEDULE,
+    PAYMENTS_BEAT_SCHEDULE,
+    PRODUCTS_BEAT_SCHEDULE,
+):
+    app.conf.beat_schedule.update(_schedule)
+
+# Jobs that share a firing time are fanned out by a single dispatcher task
+# instead of Beat publishing several messages in the same instant.
+DAILY_9AM_TASKS = (
+    'inventory.tasks.check_damaged_stock',
+    'inventory.tasks.generate_reorder_recommendations',
+    'orders.tasks.check_delayed_orders',
+    'products.tasks.check_pricing_anomalies',
+)
+
+NIGHTLY_REPORT_TASKS = (
+    'orders.tasks.generate_daily_order_report',
+    'inventory.tasks.generate_inventory_valuation_report',
+    'products.tasks.generate_product_performance_report',
+)
+
+app.conf.beat_schedule.update({
+    'dispatch-daily-9am': {
+        'task': 'backend.celery.dispatch_daily_9am',
         'schedule': crontab(hour=9, minute=0),  # Daily at 9 AM
     },
-    'cleanup-orphaned-product-images': {
-        'task': 'products.tasks.cleanup_orphaned_product_images',
-        'schedule': crontab(day_of_week=0, hour=4, minute=0),  # Every Sunday at 4 AM
+    'dispatch-nightly-reports': {
+        'task': 'backend.celery.dispatch_nightly_reports',
+        'schedule': crontab(hour=23, minute=0),  # Daily at 11 PM [long]
     },
+})
+
+# TCP keepalive tuning for the Redis broker socket. The TCP_KEEP* constants
+# only exist on some platforms (not Windows), so include whichever are there.
+BROKER_KEEPALIVE_OPTIONS = {
+    getattr(socket, name): value
+    for name, value in (
+        ('TCP_KEEPIDLE', 60),
+        ('TCP_KEEPINTVL', 30),
+        ('TCP_KEEPCNT', 3),
+    )
+    if hasattr(socket, name)
 }
 
 # Celery configuration
@@ -221,6 +91,19 @@ app.conf.update(
     result_backend=config('CELERY_RESULT_BACKEND', default='redis://127.0.0.1:0'),
     
     
+    # Broker connections - keep a warm pool so scheduled bursts don't
+    # open new sockets, and survive Redis restarts
+    broker_pool_limit=50,
+    broker_connection_retry_on_startup=True,
+    broker_connection_max_retries=None,
+    broker_heartbeat=10,
+    broker_transport_options={
+        'socket_keepalive': True,
+        'socket_keepalive_options': BROKER_KEEPALIVE_OPTIONS,
+        'health_check_interval': 30,
+        'visibility_timeout': 3600,
+    },
+    
     # Task serialization
     task_serializer='json',
     accept_content=['json'],
@@ -234,14 +117,46 @@ app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes soft limit
     
     # Worker settings
-    worker_prefetch_multiplier=4,
+    # Most tasks are I/O-bound (SMTP, M-Pesa HTTP, ORM writes) and some run
+    # for minutes, so reserve one message at a time and only ack it once the
+    # task has finished. This stops short tasks queueing behind a busy child.
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
     worker_max_tasks_per_child=1000,
+    worker_max_memory_per_child=200000,  # KB (~200 MB); recycle bloated children
+    worker_disable_rate_limits=True,
+    worker_hijack_root_logger=False,
     
     # Result expiration
     result_expires=3600,  # 1 hour
     
+    # Almost no task result is ever read back, so don't write them to Redis
+    # unless a task opts in with ignore_result=False.
+    task_ignore_result=True,
+    result_compression='gzip',
+    result_backend_transport_options={'global_keyprefix': 'shop_results_'},
+    redis_socket_keepalive=True,
+    
     # Task routing by app queues
     task_routes={
+        # Long-running, DB-bound reports run on a dedicated gevent worker so
+        # they never block the per-app prefork queues (see README).
+        'inventory.tasks.generate_inventory_valuation_report': {'queue': 'reports_long'},
+        'inventory.tasks.generate_reorder_recommendations': {'queue': 'reports_long'},
+        'inventory.tasks.analyze_stock_turnover': {'queue': 'reports_long'},
+        'inventory.tasks.generate_movement_audit_report': {'queue': 'reports_long'},
+        'orders.tasks.generate_daily_order_report': {'queue': 'reports_long'},
+        'payments.tasks.reconcile_daily_transactions': {'queue': 'reports_long'},
+        'products.tasks.generate_product_performance_report': {'queue': 'reports_long'},
+        'customers.tasks.generate_customer_report': {'queue': 'reports_long'},
+        # Fast notification tasks get their own queue so that worker can be
+        # started with a higher --prefetch-multiplier (see README).
+        'customers.tasks.send_loyalty_points_notification': {'queue': 'notifications'},
+        # Periodic inventory monitors/analyzers get their own queue so a burst of
+        # stock or transfer work can't delay their dispatch.
+        'inventory.tasks.monitor_*': {'queue': 'inventory_monitoring'},
+        'inventory.tasks.analyze_*': {'queue': 'inventory_monitoring'},
+        'inventory.tasks.schedule_automatic_stock_counts': {'queue': 'inventory_monitoring'},
         'customers.tasks.*': {'queue': 'customers'},
         'orders.tasks.*': {'queue': 'orders'},
         'payments.tasks.*': {'queue': 'payments'},
@@ -254,4 +169,16 @@ app.conf.update(
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     """Debug task to test Celery is working"""
-    print(f'Request: {self.request!r}')
\ No newline at end of file
+    print(f'Request: {self.request!r}')
+
+
+@app.task(ignore_result=True)
+def dispatch_daily_9am():
+    """Fan out the daily 9 AM checks to their own queues"""
+    group(app.signature(name) for name in DAILY_9AM_TASKS).apply_async()
+
+
+@app.task(ignore_result=True)
+def dispatch_nightly_reports():
+    """Fan out the daily 11 PM report tasks to their own queues"""
+    group(app.signature(name) for name in NIGHTLY_REPORT_TASKS).apply_async()
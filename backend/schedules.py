@@ -0,0 +1,17 @@
+"""
+Shared Celery Beat helpers used by every app's celery_beat module.
+"""
+from functools import lru_cache
+
+from celery.schedules import crontab as _crontab
+
+
+@lru_cache(maxsize=None)
+def crontab(**fields):
+    """
+    Return one shared crontab instance per distinct expression.
+
+    Drop-in replacement for celery.schedules.crontab: each expression is
+    parsed once per process, no matter how many entries use it.
+    """
+    return _crontab(**fields)
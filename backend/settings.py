@@ -113,7 +113,13 @@ DATABASES = {
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', 5432),
         'CONN_MAX_AGE': 600,  # Connection pooling - keep connections alive
+        # Celery's Django fixup reuses the connection across tasks; check it is
+        # still alive before each task instead of failing on a dropped socket
+        'CONN_HEALTH_CHECKS': True,
         'ATOMIC_REQUESTS': False,  # Set to True if you want transaction per request
+        # Keep server-side cursors so QuerySet.iterator() streams rows in
+        # background tasks (must be True behind pgbouncer transaction pooling)
+        'DISABLE_SERVER_SIDE_CURSORS': False,
     }
 }
 
@@ -150,7 +156,8 @@ TEMPLATES[0]['DIRS'] = [
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication that also joins the Customer profile
+        'backend.authentication.CustomerJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -289,15 +296,35 @@ CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # 25 minutes
 
 # Worker settings
-CELERY_WORKER_PREFETCH_MULTIPLIER = 4
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_ACKS_LATE = True
 CELERY_WORKER_MAX_TASKS_PER_CHILD = 1000
+CELERY_WORKER_MAX_MEMORY_PER_CHILD = 200000  # KB (~200 MB)
+CELERY_WORKER_HIJACK_ROOT_LOGGER = False
+CELERY_WORKER_DISABLE_RATE_LIMITS = True
 
 # Result expiration
 CELERY_RESULT_EXPIRES = 3600  # 1 hour
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_RESULT_COMPRESSION = 'gzip'
+CELERY_RESULT_BACKEND_TRANSPORT_OPTIONS = {'global_keyprefix': 'shop_results_'}
+CELERY_REDIS_SOCKET_KEEPALIVE = True
 
 
 # Task routing - route tasks to specific queues
 CELERY_TASK_ROUTES = {
+    'inventory.tasks.generate_inventory_valuation_report': {'queue': 'reports_long'},
+    'inventory.tasks.generate_reorder_recommendations': {'queue': 'reports_long'},
+    'inventory.tasks.analyze_stock_turnover': {'queue': 'reports_long'},
+    'inventory.tasks.generate_movement_audit_report': {'queue': 'reports_long'},
+    'orders.tasks.generate_daily_order_report': {'queue': 'reports_long'},
+    'payments.tasks.reconcile_daily_transactions': {'queue': 'reports_long'},
+    'products.tasks.generate_product_performance_report': {'queue': 'reports_long'},
+    'customers.tasks.generate_customer_report': {'queue': 'reports_long'},
+    'customers.tasks.send_loyalty_points_notification': {'queue': 'notifications'},
+    'inventory.tasks.monitor_*': {'queue': 'inventory_monitoring'},
+    'inventory.tasks.analyze_*': {'queue': 'inventory_monitoring'},
+    'inventory.tasks.schedule_automatic_stock_counts': {'queue': 'inventory_monitoring'},
     'customers.tasks.*': {'queue': 'customers'},
     'orders.tasks.*': {'queue': 'orders'},
     'payments.tasks.*': {'queue': 'payments'},
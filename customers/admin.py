@@ -1,8 +1,9 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from django.db.models import BooleanField, ExpressionWrapper, F, Q
+from django.db.models.functions import Now
 from django.utils.html import format_html
-from django.utils.timezone import now
 
 from .models import Customer, Address, PasswordResetCode, ContactMessage
 
@@ -58,6 +59,9 @@ class UserAdmin(BaseUserAdmin):
     search_fields = ('username', 'email', 'first_name', 'last_name', 'customer__phone')
     ordering = ('-date_joined',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('customer')
+
     def loyalty_points(self, obj):
         return obj.customer.loyalty_points if hasattr(obj, 'customer') else 0
 
@@ -100,6 +104,9 @@ class CustomerAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
     def username(self, obj):
         return obj.user.username
 
@@ -113,16 +120,16 @@ class CustomerAdmin(admin.ModelAdmin):
     actions = ('add_100_points', 'add_500_points', 'reset_points')
 
     def add_100_points(self, request, queryset):
-        queryset.update(loyalty_points=models.F('loyalty_points') + 100)
-        self.message_user(request, f"Added 100 points to {queryset.count()} customers.")
+        updated = queryset.update(loyalty_points=F('loyalty_points') + 100)
+        self.message_user(request, f"Added 100 points to {updated} customers.")
 
     def add_500_points(self, request, queryset):
-        queryset.update(loyalty_points=models.F('loyalty_points') + 500)
-        self.message_user(request, f"Added 500 points to {queryset.count()} customers.")
+        updated = queryset.update(loyalty_points=F('loyalty_points') + 500)
+        self.message_user(request, f"Added 500 points to {updated} customers.")
 
     def reset_points(self, request, queryset):
-        queryset.update(loyalty_points=0)
-        self.message_user(request, f"Loyalty points reset for {queryset.count()} customers.")
+        updated = queryset.update(loyalty_points=0)
+        self.message_user(request, f"Loyalty points reset for {updated} customers.")
 
     add_100_points.short_description = "➕ Add 100 loyalty points"
     add_500_points.short_description = "➕ Add 500 loyalty points"
@@ -175,6 +182,9 @@ class AddressAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('customer__user')
+
     def customer_name(self, obj):
         return obj.customer.user.get_full_name() or obj.customer.user.username
 
@@ -193,6 +203,21 @@ class AddressAdmin(admin.ModelAdmin):
 # =========================
 # Password Reset Code Admin
 # =========================
+class ExpiredFilter(admin.SimpleListFilter):
+    title = "expired"
+    parameter_name = "expired"
+
+    def lookups(self, request, model_admin):
+        return (('yes', "Yes"), ('no', "No"))
+
+    def queryset(self, request, queryset):
+        if self.value() == 'yes':
+            return queryset.filter(expires_at__lt=Now())
+        if self.value() == 'no':
+            return queryset.filter(expires_at__gte=Now())
+        return queryset
+
+
 @admin.register(PasswordResetCode)
 class PasswordResetCodeAdmin(admin.ModelAdmin):
     list_display = (
@@ -203,7 +228,7 @@ class PasswordResetCodeAdmin(admin.ModelAdmin):
         'created_at',
         'expires_at',
     )
-    list_filter = ('is_used', 'created_at', 'expires_at')
+    list_filter = ('is_used', ExpiredFilter, 'created_at', 'expires_at')
     search_fields = ('user__email', 'code')
     readonly_fields = (
         'id',
@@ -215,11 +240,19 @@ class PasswordResetCodeAdmin(admin.ModelAdmin):
     )
     ordering = ('-created_at',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user').annotate(
+            _is_expired=ExpressionWrapper(
+                Q(expires_at__lt=Now()), output_field=BooleanField()
+            )
+        )
+
     def is_expired(self, obj):
-        return obj.expires_at < now()
+        return obj._is_expired
 
     is_expired.boolean = True
     is_expired.short_description = "Expired"
+    is_expired.admin_order_field = '_is_expired'
 
     actions = ('mark_used',)
 
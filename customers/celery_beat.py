@@ -0,0 +1,25 @@
+"""
+Celery Beat schedule for the customers app.
+Merged into the project-wide schedule by backend/celery.py.
+"""
+from backend.schedules import crontab
+
+
+BEAT_SCHEDULE = {
+    'cleanup-expired-reset-codes': {
+        'task': 'customers.tasks.cleanup_expired_reset_codes',
+        'schedule': crontab(hour=0, minute=0),  # Daily at midnight
+    },
+    'generate-customer-report': {
+        'task': 'customers.tasks.generate_customer_report',
+        'schedule': crontab(day_of_week=1, hour=9, minute=0),  # Every Monday at 9 AM [long]
+    },
+    'check-inactive-customers': {
+        'task': 'customers.tasks.check_inactive_customers',
+        'schedule': crontab(day_of_week=0, hour=10, minute=0),  # Every Sunday at 10 AM [long]
+    },
+    'analyze-customer-engagement': {
+        'task': 'customers.tasks.analyze_customer_engagement',
+        'schedule': crontab(day_of_month=1, hour=8, minute=0),  # First day of month at 8 AM [long]
+    },
+}
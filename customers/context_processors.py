@@ -6,9 +6,37 @@ Add to settings.py TEMPLATES['OPTIONS']['context_processors']:
 'customers.context_processors.email_context',
 """
 
+from datetime import date
+from functools import lru_cache
+
 from django.conf import settings
 
 
+# Resolved once per process; none of these change after settings load.
+_EMAIL_CONTEXT = {
+    'site_name': 'SoundWaveAudio',
+    'site_url': getattr(settings, 'FRONTEND_URL', 'https://soundwaveaudio.com'),
+    'support_email': getattr(settings, 'SUPPORT_EMAIL', 'support@soundwaveaudio.com'),
+    'company_address': 'Nairobi, Kenya',
+    'company_phone': '+254 700 000 000',
+    'social_media': {
+        'facebook': 'https://facebook.com/soundwaveaudio',
+        'twitter': 'https://twitter.com/soundwaveaudio',
+        'instagram': 'https://instagram.com/soundwaveaudio',
+        'youtube': 'https://youtube.com/soundwaveaudio',
+    },
+}
+
+
+@lru_cache(maxsize=1)
+def _email_context_for_day(day_ordinal):
+    """Build the context once per calendar day so current_year stays correct."""
+    return {
+        **_EMAIL_CONTEXT,
+        'current_year': str(date.fromordinal(day_ordinal).year),
+    }
+
+
 def email_context(request):
     """
     Add common email-related variables to template context.
@@ -16,17 +44,4 @@ def email_context(request):
     This makes these variables available in all templates without
     having to pass them manually each time.
     """
-    return {
-        'site_name': 'SoundWaveAudio',
-        'site_url': getattr(settings, 'FRONTEND_URL', 'https://soundwaveaudio.com'),
-        'support_email': getattr(settings, 'SUPPORT_EMAIL', 'support@soundwaveaudio.com'),
-        'company_address': 'Nairobi, Kenya',
-        'company_phone': '+254 700 000 000',
-        'social_media': {
-            'facebook': 'https://facebook.com/soundwaveaudio',
-            'twitter': 'https://twitter.com/soundwaveaudio',
-            'instagram': 'https://instagram.com/soundwaveaudio',
-            'youtube': 'https://youtube.com/soundwaveaudio',
-        },
-        'current_year': '2026',
-    }
\ No newline at end of file
+    return _email_context_for_day(date.today().toordinal())
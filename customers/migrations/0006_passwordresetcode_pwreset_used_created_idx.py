@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0005_contactmessage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='passwordresetcode',
+            index=models.Index(condition=models.Q(('is_used', True)), fields=['created_at'], name='pwreset_used_created_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-16 09:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('customers', '0006_passwordresetcode_pwreset_used_created_idx'),
+    ]
+
+    # auth.User belongs to django.contrib.auth, so the index backing the
+    # engagement/inactivity scans (is_active, last_login) is added with SQL.
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS auth_user_active_login_idx ON auth_user (is_active, last_login);',
+            reverse_sql='DROP INDEX IF EXISTS auth_user_active_login_idx;',
+        ),
+    ]
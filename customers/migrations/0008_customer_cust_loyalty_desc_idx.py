@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0007_auth_user_active_last_login_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['-loyalty_points'], name='cust_loyalty_desc_idx'),
+        ),
+    ]
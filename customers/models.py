@@ -1,6 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from django.conf import settings
@@ -15,6 +18,12 @@ class Customer(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Top-N / percentile lookups by loyalty points
+            models.Index(fields=['-loyalty_points'], name='cust_loyalty_desc_idx'),
+        ]
+
     def __str__(self):
         return self.user.email
 
@@ -51,6 +60,16 @@ def create_customer_profile(sender, instance, created, **kwargs):
     if created:
         Customer.objects.create(user=instance)
 
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def clear_admin_emails_cache(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login and can't change who is an admin
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    from .utils import ADMIN_EMAILS_CACHE_KEY
+    cache.delete(ADMIN_EMAILS_CACHE_KEY)
+
 class PasswordResetCode(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reset_codes')
@@ -66,6 +85,12 @@ class PasswordResetCode(models.Model):
             models.Index(fields=['user', 'is_used']),
             models.Index(fields=['code']),
             models.Index(fields=['expires_at']),
+            # Serves the "used codes older than 7 days" cleanup delete
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(is_used=True),
+                name='pwreset_used_created_idx',
+            ),
         ]
     
     def __str__(self):
@@ -107,6 +132,13 @@ class ContactMessage(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['email']),
             models.Index(fields=['created_at']),
+            # Trigram index for the admin search; icontains compiles to
+            # UPPER(col) LIKE UPPER(%s) on PostgreSQL, hence the Upper()
+            GinIndex(
+                OpClass(Upper('name'), name='gin_trgm_ops'),
+                OpClass(Upper('email'), name='gin_trgm_ops'),
+                name='contact_trgm_idx',
+            ),
         ]
 
     def __str__(self):
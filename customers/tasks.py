@@ -3,19 +3,24 @@ Celery tasks for the customers app.
 Handles asynchronous email sending and background jobs.
 """
 from celery import shared_task
-from django.core.mail import send_mail
+from celery.exceptions import Retry
+from django.core.mail import send_mail, EmailMultiAlternatives, get_connection
 from django.conf import settings
 from django.utils import timezone
 from django.contrib.auth.models import User
-from django.db.models import Avg, Count, Sum
+from django.db import connection as db_connection
+from django.db.models import Avg, Count, F, Q, Sum
 from datetime import timedelta
+from itertools import islice
 from .models import Customer, PasswordResetCode
 from .utils import (
     send_password_reset_email,
     send_welcome_email_html,
     send_loyalty_points_email,
-    send_reengagement_email,
+    send_reengagement_email_bulk,
     send_customer_report_to_admins,
+    get_admin_emails,
+    EMAIL_RETRY_EXCEPTIONS,
 )
 import logging
 
@@ -26,7 +31,15 @@ logger = logging.getLogger(__name__)
 # EMAIL TASKS
 # ============================================================================
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+@shared_task(
+    bind=True,
+    ignore_result=True,
+    autoretry_for=EMAIL_RETRY_EXCEPTIONS,
+    retry_backoff=60,
+    retry_backoff_max=1800,
+    retry_jitter=True,
+    max_retries=3,
+)
 def send_welcome_email(self, user_id):
     """
     Send welcome email to newly registered user.
@@ -41,11 +54,11 @@ def send_welcome_email(self, user_id):
     try:
         user = User.objects.get(id=user_id)
         
-        # Add welcome bonus loyalty points
-        if hasattr(user, 'customer'):
-            customer = user.customer
-            customer.loyalty_points += 100
-            customer.save(update_fields=['loyalty_points'])
+        # Add welcome bonus loyalty points atomically; the UPDATE's row count
+        # tells us whether the user has a customer profile.
+        if Customer.objects.filter(user_id=user.id).update(
+            loyalty_points=F('loyalty_points') + 100
+        ):
             logger.info(f"Added 100 welcome points to user {user.email}")
         
         # Send welcome email using HTML template
@@ -57,21 +70,25 @@ def send_welcome_email(self, user_id):
     except User.DoesNotExist:
         logger.error(f"User with id {user_id} not found")
         raise
-        
-    except Exception as exc:
-        logger.error(f"Failed to send welcome email: {exc}", exc_info=True)
-        # Retry with exponential backoff (60s, 120s, 240s)
-        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def send_password_reset_email_async(self, user_id, reset_code):
+@shared_task(
+    bind=True,
+    ignore_result=True,
+    autoretry_for=EMAIL_RETRY_EXCEPTIONS,
+    retry_backoff=60,
+    retry_backoff_max=1800,
+    retry_jitter=True,
+    max_retries=3,
+)
+def send_password_reset_email_async(self, user_id, reset_code, token=None):
     """
     Send password reset email asynchronously.
     
     Args:
         user_id: ID of the user requesting password reset
         reset_code: Generated reset code
+        token: Token stored with the reset code, if any
     
     Returns:
         str: Success message
@@ -85,7 +102,7 @@ def send_password_reset_email_async(self, user_id, reset_code):
         logger.info(f"📧 Calling send_password_reset_email...")
         
         # Send email using utility function
-        send_password_reset_email(user, reset_code)
+        send_password_reset_email(user, reset_code, token)
         
         logger.info(f"✅ Password reset email sent successfully to {user.email}")
         return f"Password reset email sent to {user.email}"
@@ -93,13 +110,17 @@ def send_password_reset_email_async(self, user_id, reset_code):
     except User.DoesNotExist:
         logger.error(f"❌ User with id {user_id} not found")
         raise
-        
-    except Exception as exc:
-        logger.error(f"❌ Failed to send password reset email: {exc}", exc_info=True)
-        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+@shared_task(
+    bind=True,
+    ignore_result=True,
+    autoretry_for=EMAIL_RETRY_EXCEPTIONS,
+    retry_backoff=60,
+    retry_backoff_max=1800,
+    retry_jitter=True,
+    max_retries=3,
+)
 def send_loyalty_points_notification(self, customer_id, points_added, reason):
     """
     Send email notification when loyalty points are added to customer account.
@@ -130,17 +151,27 @@ def send_loyalty_points_notification(self, customer_id, points_added, reason):
     except Customer.DoesNotExist:
         logger.error(f"Customer with id {customer_id} not found")
         raise
-        
-    except Exception as exc:
-        logger.error(f"Failed to send loyalty notification: {exc}", exc_info=True)
-        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
 
-@shared_task(bind=True, max_retries=2)
+# Recipients per BCC message, and recipients handled by one batch task
+PROMO_EMAIL_BATCH_SIZE = 50
+PROMO_TASK_BATCH_SIZE = 500
+
+
+@shared_task(
+    bind=True,
+    ignore_result=True,
+    autoretry_for=EMAIL_RETRY_EXCEPTIONS,
+    retry_backoff=300,
+    retry_backoff_max=1800,
+    retry_jitter=True,
+    max_retries=2,
+)
 def send_bulk_promotional_email(self, subject, message, html_message=None, customer_ids=None):
     """
     Send promotional emails to customers in bulk.
-    Uses batching to avoid overwhelming the mail server.
+    Streams recipient addresses and fans them out to parallel
+    send_promotional_email_batch tasks.
     
     Args:
         subject: Email subject
@@ -153,68 +184,128 @@ def send_bulk_promotional_email(self, subject, message, html_message=None, custo
     """
     try:
         # Get target customers
+        customers = Customer.objects.filter(user__is_active=True)
         if customer_ids:
-            customers = Customer.objects.filter(
-                id__in=customer_ids
-            ).select_related('user').filter(user__is_active=True)
-        else:
-            customers = Customer.objects.filter(
-                user__is_active=True
-            ).select_related('user')
+            customers = customers.filter(id__in=customer_ids)
         
-        email_list = [customer.user.email for customer in customers]
+        # Each batch is published as soon as it is read so memory stays
+        # bounded however many customers match
+        emails = customers.values_list('user__email', flat=True).iterator(
+            chunk_size=PROMO_TASK_BATCH_SIZE
+        )
+        
+        recipient_count = 0
+        batch_count = 0
+        for batch in iter(lambda: list(islice(emails, PROMO_TASK_BATCH_SIZE)), []):
+            send_promotional_email_batch.delay(subject, message, html_message, batch)
+            recipient_count += len(batch)
+            batch_count += 1
         
-        if not email_list:
+        if not batch_count:
             logger.warning("No customers found for bulk email")
             return "No customers to email"
         
-        # Send emails in batches to avoid rate limits
-        batch_size = 50
+        logger.info(
+            f"Bulk email campaign queued: {recipient_count} recipients in "
+            f"{batch_count} batches"
+        )
+        return f"Queued bulk email to {recipient_count} customers"
+        
+    except Exception as exc:
+        logger.error(f"Failed to send bulk email: {exc}", exc_info=True)
+        raise
+
+
+@shared_task(
+    bind=True,
+    ignore_result=True,
+    autoretry_for=EMAIL_RETRY_EXCEPTIONS,
+    retry_backoff=300,
+    retry_backoff_max=1800,
+    retry_jitter=True,
+    max_retries=2,
+)
+def send_promotional_email_batch(self, subject, message, html_message, recipients):
+    """
+    Send one slice of a promotional campaign.
+    Uses BCC batching to avoid overwhelming the mail server.
+    
+    Args:
+        subject: Email subject
+        message: Plain text message
+        html_message: Optional HTML message
+        recipients: List of recipient email addresses
+    
+    Returns:
+        str: Success message with count
+    """
+    try:
         sent_count = 0
         
-        for i in range(0, len(email_list), batch_size):
-            batch = email_list[i:i + batch_size]
-            
-            try:
-                if html_message:
-                    from django.core.mail import EmailMultiAlternatives
-                    email = EmailMultiAlternatives(
-                        subject=subject,
-                        body=message,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        bcc=batch,  # Use BCC for privacy
+        # One SMTP connection (and TLS handshake) for every message in this slice
+        connection = get_connection()
+        connection.open()
+        try:
+            for i in range(0, len(recipients), PROMO_EMAIL_BATCH_SIZE):
+                batch = recipients[i:i + PROMO_EMAIL_BATCH_SIZE]
+                
+                try:
+                    if html_message:
+                        email = EmailMultiAlternatives(
+                            subject=subject,
+                            body=message,
+                            from_email=settings.DEFAULT_FROM_EMAIL,
+                            bcc=batch,  # Use BCC for privacy
+                            connection=connection,
+                        )
+                        email.attach_alternative(html_message, "text/html")
+                        email.send(fail_silently=False)
+                    else:
+                        send_mail(
+                            subject=subject,
+                            message=message,
+                            from_email=settings.DEFAULT_FROM_EMAIL,
+                            recipient_list=batch,
+                            fail_silently=False,
+                            connection=connection,
+                        )
+                    
+                    sent_count += len(batch)
+                    logger.info(f"Sent batch {i//PROMO_EMAIL_BATCH_SIZE + 1}: {len(batch)} emails")
+                    
+                except EMAIL_RETRY_EXCEPTIONS as exc:
+                    # Retry only the recipients not reached yet so delivered
+                    # batches are not mailed twice
+                    logger.warning(
+                        f"Batch {i//PROMO_EMAIL_BATCH_SIZE + 1} failed, retrying "
+                        f"{len(recipients) - i} remaining recipients: {exc}"
                     )
-                    email.attach_alternative(html_message, "text/html")
-                    email.send(fail_silently=False)
-                else:
-                    send_mail(
-                        subject=subject,
-                        message=message,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=batch,
-                        fail_silently=False,
+                    raise self.retry(
+                        exc=exc,
+                        args=(subject, message, html_message, recipients[i:]),
+                        countdown=min(300 * (2 ** self.request.retries), 1800),
                     )
-                
-                sent_count += len(batch)
-                logger.info(f"Sent batch {i//batch_size + 1}: {len(batch)} emails")
-                
-            except Exception as batch_exc:
-                logger.error(f"Failed to send batch {i//batch_size + 1}: {batch_exc}")
-                continue
+                except Exception as batch_exc:
+                    logger.error(f"Failed to send batch {i//PROMO_EMAIL_BATCH_SIZE + 1}: {batch_exc}")
+                    continue
+        finally:
+            connection.close()
         
-        logger.info(f"Bulk email campaign completed: {sent_count}/{len(email_list)} sent")
+        logger.info(f"Promotional batch completed: {sent_count}/{len(recipients)} sent")
         return f"Sent bulk email to {sent_count} customers"
         
+    except Retry:
+        raise
     except Exception as exc:
-        logger.error(f"Failed to send bulk email: {exc}", exc_info=True)
-        raise self.retry(exc=exc, countdown=300)  # Retry after 5 minutes
+        logger.error(f"Failed to send promotional batch: {exc}", exc_info=True)
+        raise
 
 
 # ============================================================================
 # CUSTOMER MANAGEMENT TASKS
 # ============================================================================
 
-@shared_task
+@shared_task(ignore_result=True)
 def update_customer_loyalty_points(customer_id, points_to_add, reason="Loyalty program update"):
     """
     Update customer loyalty points and send notification.
@@ -249,11 +340,15 @@ def update_customer_loyalty_points(customer_id, points_to_add, reason="Loyalty p
         raise
 
 
-@shared_task
+REENGAGEMENT_BATCH_SIZE = 100
+
+
+@shared_task(ignore_result=True)
 def check_inactive_customers():
     """
     Check for customers who haven't logged in for 90 days.
-    Send re-engagement emails with special offers.
+    Queues one re-engagement batch task per 100 inactive users so sends
+    run in parallel without one broker message per user.
     
     Returns:
         str: Success message with count
@@ -261,41 +356,110 @@ def check_inactive_customers():
     try:
         # Find users inactive for 90 days
         threshold_date = timezone.now() - timedelta(days=90)
-        inactive_users = User.objects.filter(
+        # Streamed through a server-side cursor; each batch is published as
+        # soon as it is read so memory stays bounded however many users match
+        inactive_user_ids = User.objects.filter(
             last_login__lt=threshold_date,
             is_active=True
-        ).select_related('customer')
-        
-        sent_count = 0
+        ).values_list('id', flat=True).iterator(chunk_size=500)
         
-        for user in inactive_users:
-            try:
-                # Get loyalty points if customer exists
-                loyalty_points = 0
-                if hasattr(user, 'customer'):
-                    loyalty_points = user.customer.loyalty_points
-                
-                # Send re-engagement email
-                send_reengagement_email(user, loyalty_points)
-                sent_count += 1
-                
-            except Exception as user_exc:
-                logger.error(f"Failed to send re-engagement email to {user.email}: {user_exc}")
-                continue
+        queued_count = 0
+        batch_count = 0
+        for batch in iter(lambda: list(islice(inactive_user_ids, REENGAGEMENT_BATCH_SIZE)), []):
+            send_reengagement_batch.delay(batch)
+            queued_count += len(batch)
+            batch_count += 1
         
-        logger.info(f"Sent re-engagement emails to {sent_count} inactive customers")
-        return f"Sent re-engagement emails to {sent_count} customers"
+        logger.info(
+            f"Queued re-engagement emails for {queued_count} inactive customers "
+            f"in {batch_count} batches"
+        )
+        return f"Queued re-engagement emails for {queued_count} customers"
         
     except Exception as exc:
         logger.error(f"Failed to check inactive customers: {exc}", exc_info=True)
         raise
 
 
+@shared_task(
+    bind=True,
+    ignore_result=True,
+    autoretry_for=EMAIL_RETRY_EXCEPTIONS,
+    retry_backoff=60,
+    retry_backoff_max=1800,
+    retry_jitter=True,
+    max_retries=3,
+)
+def send_reengagement_batch(self, user_ids):
+    """
+    Send re-engagement emails to a batch of inactive users over a single
+    SMTP connection.
+    
+    Args:
+        user_ids: IDs of the inactive users
+    
+    Returns:
+        str: Success message with count
+    """
+    # Only the columns the email reads (skips password, last_login, etc.)
+    users = User.objects.select_related('customer').only(
+        'email', 'first_name', 'customer__loyalty_points'
+    ).filter(id__in=user_ids)
+    
+    users_with_points = []
+    for user in users:
+        # customer was joined above, so a missing profile is a cached None
+        customer = getattr(user, 'customer', None)
+        loyalty_points = customer.loyalty_points if customer is not None else 0
+        users_with_points.append((user, loyalty_points))
+    
+    sent_user_ids = []
+    try:
+        sent_count = send_reengagement_email_bulk(users_with_points, sent_user_ids)
+    except EMAIL_RETRY_EXCEPTIONS as exc:
+        # Retry only the users not emailed yet so nobody gets it twice
+        sent = set(sent_user_ids)
+        remaining = [user_id for user_id in user_ids if user_id not in sent]
+        logger.warning(
+            f"Re-engagement batch interrupted after {len(sent)} emails, "
+            f"retrying {len(remaining)} users: {exc}"
+        )
+        raise self.retry(
+            exc=exc,
+            args=(remaining,),
+            countdown=min(60 * (2 ** self.request.retries), 1800),
+        )
+    
+    logger.info(f"Sent re-engagement emails to {sent_count}/{len(user_ids)} users")
+    return f"Sent re-engagement emails to {sent_count} customers"
+
+
 # ============================================================================
 # CLEANUP & MAINTENANCE TASKS
 # ============================================================================
 
-@shared_task
+RESET_CODE_DELETE_BATCH_SIZE = 10000
+
+
+def _raw_delete_in_batches(queryset, batch_size=RESET_CODE_DELETE_BATCH_SIZE):
+    """
+    Delete matching rows in bounded batches without the deletion collector.
+    PasswordResetCode has no dependants or delete signals, so skipping the
+    collector is safe and keeps both memory and lock time constant.
+    
+    Returns:
+        int: Number of rows deleted
+    """
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += model.objects.filter(pk__in=ids)._raw_delete(using=queryset.db)
+
+
+@shared_task(ignore_result=True)
 def cleanup_expired_reset_codes():
     """
     Clean up expired and used password reset codes.
@@ -305,20 +469,20 @@ def cleanup_expired_reset_codes():
         str: Success message with count
     """
     try:
+        now = timezone.now()
+        
         # Delete expired codes
-        expired_codes = PasswordResetCode.objects.filter(
-            expires_at__lt=timezone.now()
+        expired_count = _raw_delete_in_batches(
+            PasswordResetCode.objects.filter(expires_at__lt=now)
         )
-        expired_count = expired_codes.count()
-        expired_codes.delete()
         
         # Delete used codes older than 7 days
-        old_used_codes = PasswordResetCode.objects.filter(
-            is_used=True,
-            created_at__lt=timezone.now() - timedelta(days=7)
+        used_count = _raw_delete_in_batches(
+            PasswordResetCode.objects.filter(
+                is_used=True,
+                created_at__lt=now - timedelta(days=7)
+            )
         )
-        used_count = old_used_codes.count()
-        old_used_codes.delete()
         
         total_cleaned = expired_count + used_count
         logger.info(f"Cleaned up {total_cleaned} password reset codes ({expired_count} expired, {used_count} old used)")
@@ -334,7 +498,7 @@ def cleanup_expired_reset_codes():
 # ANALYTICS & REPORTING TASKS
 # ============================================================================
 
-@shared_task
+@shared_task(ignore_result=False)
 def generate_customer_report():
     """
     Generate comprehensive customer analytics report.
@@ -345,28 +509,29 @@ def generate_customer_report():
         dict: Report data
     """
     try:
-        # Calculate statistics
-        total_customers = Customer.objects.count()
-        
-        # Average loyalty points
-        avg_loyalty_points = Customer.objects.aggregate(
-            avg_points=Avg('loyalty_points')
-        )['avg_points'] or 0
-        
-        # Total loyalty points awarded
-        total_loyalty_points = Customer.objects.aggregate(
-            total_points=Sum('loyalty_points')
-        )['total_points'] or 0
-        
-        # New customers this month
-        month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        new_customers_month = Customer.objects.filter(
-            created_at__gte=month_start
-        ).count()
-        
-        # Top customers by loyalty points
-        top_customers = Customer.objects.select_related('user').order_by(
-            '-loyalty_points'
+        now = timezone.now()
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        
+        # Calculate statistics in a single aggregate query
+        stats = Customer.objects.aggregate(
+            total=Count('id'),
+            avg_points=Avg('loyalty_points'),
+            total_points=Sum('loyalty_points'),
+            new_this_month=Count('id', filter=Q(created_at__gte=month_start)),
+        )
+        total_customers = stats['total'] or 0
+        avg_loyalty_points = stats['avg_points'] or 0
+        total_loyalty_points = stats['total_points'] or 0
+        new_customers_month = stats['new_this_month'] or 0
+        
+        # Top customers by loyalty points (plain rows, no model instances)
+        top_customers = Customer.objects.order_by('-loyalty_points').values(
+            'user__email',
+            'user__first_name',
+            'user__last_name',
+            'user__username',
+            'loyalty_points',
+            'phone',
         )[:10]
         
         # Prepare report data
@@ -377,14 +542,17 @@ def generate_customer_report():
             'new_customers_this_month': new_customers_month,
             'top_customers': [
                 {
-                    'email': c.user.email,
-                    'name': c.user.get_full_name() or c.user.username,
-                    'loyalty_points': c.loyalty_points,
-                    'phone': c.phone,
+                    'email': c['user__email'],
+                    'name': (
+                        f"{c['user__first_name']} {c['user__last_name']}".strip()
+                        or c['user__username']
+                    ),
+                    'loyalty_points': c['loyalty_points'],
+                    'phone': c['phone'],
                 }
                 for c in top_customers
             ],
-            'generated_at': timezone.now().isoformat(),
+            'generated_at': now.isoformat(),
             'report_period': 'Monthly',
         }
         
@@ -400,7 +568,7 @@ def generate_customer_report():
         raise
 
 
-@shared_task
+@shared_task(ignore_result=False)
 def analyze_customer_engagement():
     """
     Analyze customer engagement metrics.
@@ -410,32 +578,33 @@ def analyze_customer_engagement():
         dict: Engagement analysis
     """
     try:
-        # Active customers (logged in within 30 days)
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        active_customers = User.objects.filter(
-            last_login__gte=thirty_days_ago,
-            is_active=True
-        ).count()
-        
-        # At-risk customers (no login in 60-90 days)
-        sixty_days_ago = timezone.now() - timedelta(days=60)
-        ninety_days_ago = timezone.now() - timedelta(days=90)
-        at_risk_customers = User.objects.filter(
-            last_login__lt=sixty_days_ago,
-            last_login__gte=ninety_days_ago,
-            is_active=True
-        ).count()
-        
-        # Dormant customers (no login in 90+ days)
-        dormant_customers = User.objects.filter(
-            last_login__lt=ninety_days_ago,
-            is_active=True
-        ).count()
-        
-        # Customers with high loyalty points (top 10%)
-        high_value_threshold = Customer.objects.order_by('-loyalty_points')[
-            int(Customer.objects.count() * 0.1)
-        ].loyalty_points if Customer.objects.count() > 0 else 0
+        now = timezone.now()
+        thirty_days_ago = now - timedelta(days=30)
+        sixty_days_ago = now - timedelta(days=60)
+        ninety_days_ago = now - timedelta(days=90)
+        
+        # Active (logged in within 30 days), at-risk (no login in 60-90 days)
+        # and dormant (no login in 90+ days) customers in one query
+        buckets = User.objects.filter(is_active=True).aggregate(
+            active=Count('id', filter=Q(last_login__gte=thirty_days_ago)),
+            at_risk=Count('id', filter=Q(
+                last_login__lt=sixty_days_ago,
+                last_login__gte=ninety_days_ago,
+            )),
+            dormant=Count('id', filter=Q(last_login__lt=ninety_days_ago)),
+        )
+        active_customers = buckets['active']
+        at_risk_customers = buckets['at_risk']
+        dormant_customers = buckets['dormant']
+        
+        # Customers with high loyalty points (top 10%), computed as a single
+        # percentile aggregate rather than a full sort + OFFSET
+        with db_connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT percentile_disc(0.9) WITHIN GROUP (ORDER BY loyalty_points) "
+                f"FROM {Customer._meta.db_table}"
+            )
+            high_value_threshold = cursor.fetchone()[0] or 0
         
         high_value_customers = Customer.objects.filter(
             loyalty_points__gte=high_value_threshold
@@ -447,7 +616,7 @@ def analyze_customer_engagement():
             'dormant_customers': dormant_customers,
             'high_value_customers': high_value_customers,
             'high_value_threshold': high_value_threshold,
-            'analyzed_at': timezone.now().isoformat(),
+            'analyzed_at': now.isoformat(),
         }
         
         logger.info(f"Engagement analysis: {active_customers} active, {at_risk_customers} at-risk, {dormant_customers} dormant")
@@ -459,7 +628,7 @@ def analyze_customer_engagement():
         raise
 # Add this to your existing tasks.py
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+@shared_task(bind=True, ignore_result=True, max_retries=3, default_retry_delay=60)
 def notify_admins_contact_message(self, contact_message_id):
     """
     Notify all admin staff when a new contact form submission arrives.
@@ -474,10 +643,7 @@ def notify_admins_contact_message(self, contact_message_id):
         from .models import ContactMessage
         msg = ContactMessage.objects.get(id=contact_message_id)
 
-        admin_emails = list(
-            User.objects.filter(is_staff=True, is_active=True)
-            .values_list('email', flat=True)
-        )
+        admin_emails = list(get_admin_emails())
 
         if not admin_emails:
             logger.warning("No admin users found — contact notification not sent.")
@@ -519,12 +685,12 @@ https://shop.nerdwaretechnologies.com/admin/
         )
         return f"Notification sent for contact message {contact_message_id}"
 
-    except Exception as exc:
+    except EMAIL_RETRY_EXCEPTIONS as exc:
         logger.error(f"Failed to send contact notification: {exc}", exc_info=True)
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+@shared_task(bind=True, ignore_result=True, max_retries=3, default_retry_delay=60)
 def send_contact_acknowledgement(self, contact_message_id):
     """
     Send an auto-acknowledgement email to the person who submitted the contact form.
@@ -572,7 +738,7 @@ The SoundWaveAudio Team
         logger.info(f"Contact acknowledgement sent to {msg.email}")
         return f"Acknowledgement sent to {msg.email}"
 
-    except Exception as exc:
+    except EMAIL_RETRY_EXCEPTIONS as exc:
         logger.error(f"Failed to send contact acknowledgement: {exc}", exc_info=True)
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
@@ -1,11 +1,21 @@
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
+from django.core import mail
+from django.core.mail.backends import locmem
 from django.contrib.auth.models import User
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from backend.authentication import CustomerJWTAuthentication
 from .models import Customer, Address
+from .serializers import CustomerSerializer
 from django.urls import reverse
 import json
 from datetime import date
+from smtplib import SMTPRecipientsRefused, SMTPServerDisconnected
+from unittest.mock import patch
+from celery.exceptions import Retry
 
 class KenyanAddressModelTests(TestCase):
     """Comprehensive model tests for Kenyan address system"""
@@ -607,4 +617,207 @@ class KenyanAddressPerformanceTests(TestCase):
             for addr in addresses:
                 _ = addr.county
                 _ = addr.subcounty
-                _ = addr.ward
\ No newline at end of file
+                _ = addr.ward
+
+
+class CustomerEngagementTaskTests(TestCase):
+    """percentile_disc threshold matches the old sort + index lookup"""
+    
+    def _old_threshold(self):
+        count = Customer.objects.count()
+        if not count:
+            return 0
+        return Customer.objects.order_by('-loyalty_points')[int(count * 0.1)].loyalty_points
+    
+    def test_high_value_threshold_matches_previous_calculation(self):
+        """Same threshold and count for several population sizes"""
+        from .tasks import analyze_customer_engagement
+        
+        points = [0, 5, 5, 12, 40, 40, 75, 90, 120, 300, 301, 450, 500, 800, 999]
+        for n in (1, 4, 10, 15):
+            Customer.objects.all().delete()
+            User.objects.all().delete()
+            for i, loyalty_points in enumerate(points[:n]):
+                user = User.objects.create_user(username=f'engaged{i}', password='testpass123')
+                Customer.objects.filter(user=user).update(loyalty_points=loyalty_points)
+            
+            result = analyze_customer_engagement()
+            
+            expected = self._old_threshold()
+            self.assertEqual(result['high_value_threshold'], expected, msg=f'n={n}')
+            self.assertEqual(
+                result['high_value_customers'],
+                Customer.objects.filter(loyalty_points__gte=expected).count(),
+                msg=f'n={n}'
+            )
+
+
+class LogoutAPITests(APITestCase):
+    """Logout blacklists the refresh token before responding"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='logoutuser',
+            email='logout@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('customer-logout')
+    
+    def test_logout_blacklists_refresh_token(self):
+        """Token is blacklisted synchronously and the response is 200"""
+        refresh = RefreshToken.for_user(self.user)
+        
+        response = self.client.post(self.url, {'refresh_token': str(refresh)}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=refresh['jti']).exists())
+    
+    def test_logout_twice_with_same_token_fails(self):
+        """A blacklisted token cannot be used to log out again"""
+        refresh = str(RefreshToken.for_user(self.user))
+        
+        self.client.post(self.url, {'refresh_token': refresh}, format='json')
+        response = self.client.post(self.url, {'refresh_token': refresh}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_logout_without_token_fails(self):
+        """Missing refresh token is rejected"""
+        response = self.client.post(self.url, {}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CustomerSerializerAddressTests(APITestCase):
+    """Customer list returns every address, exactly as the serializer does"""
+    
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='staffuser',
+            email='staff@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+        self.user = User.objects.create_user(
+            username='addressuser',
+            email='addresses@example.com',
+            password='testpass123'
+        )
+        self.customer = self.user.customer
+        for i, is_default in enumerate([True, False, False]):
+            Address.objects.create(
+                customer=self.customer,
+                address_type='shipping',
+                street_address=f'{i} Moi Avenue',
+                county='Nairobi',
+                city='Nairobi',
+                postal_code='00100',
+                country='Kenya',
+                is_default=is_default
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff)
+    
+    def test_list_includes_non_default_addresses(self):
+        """List output matches serializing the customer directly"""
+        response = self.client.get(reverse('customer-list'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        listed = next(c for c in response.data['results'] if c['id'] == self.customer.id)
+        self.assertEqual(len(listed['addresses']), 3)
+        self.assertEqual(listed['addresses'], CustomerSerializer(self.customer).data['addresses'])
+    
+    def test_detail_matches_list(self):
+        """Detail and list render the same addresses"""
+        detail = self.client.get(reverse('customer-detail', args=[self.customer.id]))
+        listing = self.client.get(reverse('customer-list'))
+        
+        listed = next(c for c in listing.data['results'] if c['id'] == self.customer.id)
+        self.assertEqual(detail.data['addresses'], listed['addresses'])
+
+
+class ReengagementBatchTaskTests(TestCase):
+    """Transient SMTP failures retry only the users not emailed yet"""
+    
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                username=f'inactive{i}',
+                email=f'inactive{i}@example.com',
+                password='testpass123',
+                first_name=f'User{i}'
+            )
+            for i in range(3)
+        ]
+        self.user_ids = [user.id for user in self.users]
+    
+    def test_all_users_emailed(self):
+        from .tasks import send_reengagement_batch
+        
+        send_reengagement_batch(self.user_ids)
+        
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), sorted(u.email for u in self.users))
+    
+    def test_dropped_connection_retries_remaining_users(self):
+        from .tasks import send_reengagement_batch
+        
+        with patch.object(locmem.EmailBackend, 'send_messages',
+                          side_effect=[1, SMTPServerDisconnected('dropped')]) as mock_send, \
+                patch.object(send_reengagement_batch, 'retry', side_effect=Retry()) as mock_retry:
+            with self.assertRaises(Retry):
+                send_reengagement_batch(self.user_ids)
+        
+        delivered_email = mock_send.call_args_list[0].args[0][0].to[0]
+        delivered_id = User.objects.get(email=delivered_email).id
+        remaining = mock_retry.call_args.kwargs['args'][0]
+        self.assertEqual(sorted(remaining), sorted(set(self.user_ids) - {delivered_id}))
+    
+    def test_rejected_address_is_skipped(self):
+        from .tasks import send_reengagement_batch
+        
+        with patch.object(locmem.EmailBackend, 'send_messages',
+                          side_effect=[1, SMTPRecipientsRefused({}), 1]):
+            result = send_reengagement_batch(self.user_ids)
+        
+        self.assertEqual(result, 'Sent re-engagement emails to 2 customers')
+
+
+class CustomerJWTAuthenticationTests(TestCase):
+    """JWT authentication loads the customer profile in the user query"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='jwtuser',
+            email='jwt@example.com',
+            password='testpass123'
+        )
+        self.auth = CustomerJWTAuthentication()
+    
+    def authenticate(self, user):
+        token = str(AccessToken.for_user(user))
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.auth.authenticate(request)
+    
+    def test_customer_costs_no_extra_query(self):
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate(self.user)
+            self.assertEqual(user.customer.loyalty_points, 0)
+    
+    def test_inactive_user_is_rejected(self):
+        token = str(AccessToken.for_user(self.user))
+        self.user.is_active = False
+        self.user.save()
+        
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(request)
+    
+    def test_deleted_user_is_rejected(self):
+        token = str(AccessToken.for_user(self.user))
+        self.user.delete()
+        
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(request)
@@ -1,25 +1,113 @@
-import secrets
+import random
+import re
 import string
-from django.core.mail import send_mail, EmailMultiAlternatives
-from django.template.loader import render_to_string
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template, render_to_string
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.contrib.auth.models import User
-import six
 import logging
+from smtplib import SMTPException, SMTPRecipientsRefused, SMTPResponseException
+from socket import timeout as SocketTimeout
 
 logger = logging.getLogger(__name__)
 
+# Transient mail/network failures worth retrying. Anything else (missing
+# templates, bad data) fails immediately instead of burning the retry budget.
+EMAIL_RETRY_EXCEPTIONS = (SMTPException, SocketTimeout, ConnectionError, TimeoutError)
+
+# Characters stripped before validating, and the standard Kenyan mobile format
+_PHONE_CLEAN_RE = re.compile(r'[\s\-\(\)]')
+_KE_PHONE_RE = re.compile(r'^(\+254|254|0)(7|1)\d{8}$')
+
+# Frontend base URL used in email links, resolved once per process
+FRONTEND_URL = (
+    settings.CORS_ALLOWED_ORIGINS[0]
+    if getattr(settings, 'CORS_ALLOWED_ORIGINS', None)
+    else settings.FRONTEND_URL
+)
+RESET_URL_TEMPLATE = f"{FRONTEND_URL}/reset-password?uid={{uid}}&token={{token}}&code={{code}}"
+
+# Alphabet and CSPRNG for reset/unique codes
+_CODE_ALPHABET = string.ascii_uppercase + string.digits
+_SYSRAND = random.SystemRandom()
+
+# Plain-text email bodies, filled in with str.format()
+_RESET_TXT = """
+Hello {first_name},
+
+We received a request to reset your password for your SoundWaveAudio account.
+
+Your password reset code is: {reset_code}
+
+Or use this link: {reset_url}
+
+This code will expire in 24 hours.
+
+If you didn't request a password reset, you can safely ignore this email.
+
+Best regards,
+The SoundWaveAudio Team
+"""
+
+_WELCOME_TXT = """
+Hello {first_name},
+
+Welcome to SoundWaveAudio! We're excited to have you as part of our community.
+
+Your account has been successfully created. You can now:
+- Browse our premium speaker collection
+- Save your favorite products
+- Track your orders
+- Earn loyalty points with every purchase
+
+We've added 100 loyalty points to get you started!
+
+If you have any questions, feel free to reach out to our support team at {support_email}.
+
+Happy shopping!
+
+Best regards,
+The SoundWaveAudio Team
+"""
+
+_LOYALTY_TXT = """
+Hello {first_name},
+
+Great news! {points_added} loyalty points have been added to your account.
+
+Reason: {reason}
+Total Loyalty Points: {total_points}
+
+Keep shopping to earn more points and unlock exclusive rewards!
+
+Best regards,
+The SoundWaveAudio Team
+"""
+
+_REENGAGEMENT_TXT = """
+Hello {first_name},
+
+We noticed you haven't visited us in a while. We'd love to have you back!
+
+Special Offer: Use code WELCOME15 for 15% off your next order!
+
+You still have {loyalty_points} loyalty points waiting for you.
+
+Check out our latest products and exclusive offers just for you.
+
+Best regards,
+The SoundWaveAudio Team
+"""
+
 
 class AccountActivationTokenGenerator(PasswordResetTokenGenerator):
     """Custom token generator for account activation and password reset"""
     
     def _make_hash_value(self, user, timestamp):
-        return (
-            six.text_type(user.pk) + six.text_type(timestamp) + 
-            six.text_type(user.is_active)
-        )
+        return f"{user.pk}{timestamp}{user.is_active}"
 
 
 account_activation_token = AccountActivationTokenGenerator()
@@ -35,26 +123,26 @@ def generate_reset_code(length=6):
     Returns:
         str: Random alphanumeric code in uppercase
     """
-    characters = string.ascii_uppercase + string.digits
-    return ''.join(secrets.choice(characters) for _ in range(length))
+    return ''.join(_SYSRAND.choices(_CODE_ALPHABET, k=length))
 
 
-def send_password_reset_email(user, reset_code):
+def send_password_reset_email(user, reset_code, token=None):
     """
     Send password reset email with code using HTML template.
     
     Args:
         user: User object
         reset_code: Generated reset code
+        token: Token already issued for this reset, if any
     """
     try:
-        # Generate token for URL
-        token = account_activation_token.make_token(user)
-        uid = six.text_type(user.pk)
+        # Reuse the token stored with the reset code instead of hashing again
+        if token is None:
+            token = account_activation_token.make_token(user)
+        uid = str(user.pk)
         
         # Build reset URL
-        frontend_url = settings.CORS_ALLOWED_ORIGINS[0] if settings.CORS_ALLOWED_ORIGINS else settings.FRONTEND_URL
-        reset_url = f"{frontend_url+'/reset-password'}?uid={uid}&token={token}&code={reset_code}"
+        reset_url = RESET_URL_TEMPLATE.format(uid=uid, token=token, code=reset_code)
         
         # Prepare context for template
         context = {
@@ -62,29 +150,18 @@ def send_password_reset_email(user, reset_code):
             'reset_code': reset_code,
             'reset_url': reset_url,
             'support_email': settings.SUPPORT_EMAIL,
-            'site_url': frontend_url,
+            'site_url': FRONTEND_URL,
         }
         
         # Render HTML email
         html_message = render_to_string('reset_email.html', context)
         
         # Plain text fallback
-        plain_message = f"""
-            Hello {user.first_name},
-
-            We received a request to reset your password for your SoundWaveAudio account.
-
-            Your password reset code is: {reset_code}
-
-            Or use this link: {reset_url}
-
-            This code will expire in 24 hours.
-
-            If you didn't request a password reset, you can safely ignore this email.
-
-            Best regards,
-            The SoundWaveAudio Team
-            """
+        plain_message = _RESET_TXT.format(
+            first_name=user.first_name,
+            reset_code=reset_code,
+            reset_url=reset_url,
+        )
         
         # Send email with both HTML and plain text
         email = EmailMultiAlternatives(
@@ -111,38 +188,20 @@ def send_welcome_email_html(user):
         user: User object
     """
     try:
-        frontend_url = settings.CORS_ALLOWED_ORIGINS[0] if settings.CORS_ALLOWED_ORIGINS else settings.FRONTEND_URL
-        
         context = {
             'user': user,
             'support_email': settings.SUPPORT_EMAIL,
-            'site_url': frontend_url,
+            'site_url': FRONTEND_URL,
         }
         
         # Render HTML email
         html_message = render_to_string('welcome_email.html', context)
         
         # Plain text fallback
-        plain_message = f"""
-        Hello {user.first_name},
-
-        Welcome to SoundWaveAudio! We're excited to have you as part of our community.
-
-        Your account has been successfully created. You can now:
-        - Browse our premium speaker collection
-        - Save your favorite products
-        - Track your orders
-        - Earn loyalty points with every purchase
-
-        We've added 100 loyalty points to get you started!
-
-        If you have any questions, feel free to reach out to our support team at {settings.SUPPORT_EMAIL}.
-
-        Happy shopping!
-
-        Best regards,
-        The SoundWaveAudio Team
-        """
+        plain_message = _WELCOME_TXT.format(
+            first_name=user.first_name,
+            support_email=settings.SUPPORT_EMAIL,
+        )
         
         email = EmailMultiAlternatives(
             subject='Welcome to SoundWaveAudio!',
@@ -171,34 +230,25 @@ def send_loyalty_points_email(user, points_added, total_points, reason):
         reason: Reason for points addition
     """
     try:
-        frontend_url = settings.CORS_ALLOWED_ORIGINS[0] if settings.CORS_ALLOWED_ORIGINS else settings.FRONTEND_URL
-        
         context = {
             'user': user,
             'points_added': points_added,
             'total_points': total_points,
             'reason': reason,
             'support_email': settings.SUPPORT_EMAIL,
-            'site_url': frontend_url,
+            'site_url': FRONTEND_URL,
         }
         
         # Render HTML email
         html_message = render_to_string('loyalty_points_notification.html', context)
         
         # Plain text fallback
-        plain_message = f"""
-Hello {user.first_name},
-
-Great news! {points_added} loyalty points have been added to your account.
-
-Reason: {reason}
-Total Loyalty Points: {total_points}
-
-Keep shopping to earn more points and unlock exclusive rewards!
-
-Best regards,
-The SoundWaveAudio Team
-"""
+        plain_message = _LOYALTY_TXT.format(
+            first_name=user.first_name,
+            points_added=points_added,
+            reason=reason,
+            total_points=total_points,
+        )
         
         email = EmailMultiAlternatives(
             subject='Loyalty Points Added to Your Account!',
@@ -216,50 +266,59 @@ The SoundWaveAudio Team
         raise
 
 
-def send_reengagement_email(user, loyalty_points=0):
+def _build_reengagement_email(user, loyalty_points, template, connection=None):
+    """
+    Build (but don't send) a re-engagement email from a compiled template.
+    
+    Args:
+        user: User object
+        loyalty_points: Current loyalty points balance
+        template: Compiled 'reengagement_email.html' template
+        connection: Optional open mail connection to reuse
+    
+    Returns:
+        EmailMultiAlternatives: Ready-to-send message
+    """
+    context = {
+        'user': user,
+        'loyalty_points': loyalty_points,
+        'support_email': settings.SUPPORT_EMAIL,
+        'site_url': FRONTEND_URL,
+    }
+    
+    # Render HTML email
+    html_message = template.render(context)
+    
+    # Plain text fallback
+    plain_message = _REENGAGEMENT_TXT.format(
+        first_name=user.first_name,
+        loyalty_points=loyalty_points,
+    )
+    
+    email = EmailMultiAlternatives(
+        subject='We Miss You at SoundWaveAudio!',
+        body=plain_message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+        connection=connection,
+    )
+    email.attach_alternative(html_message, "text/html")
+    return email
+
+
+def send_reengagement_email(user, loyalty_points=0, connection=None):
     """
     Send re-engagement email to inactive users with HTML template.
     
     Args:
         user: User object
         loyalty_points: Current loyalty points balance
+        connection: Optional open mail connection to reuse
     """
     try:
-        frontend_url = settings.CORS_ALLOWED_ORIGINS[0] if settings.CORS_ALLOWED_ORIGINS else settings.FRONTEND_URL
-        
-        context = {
-            'user': user,
-            'loyalty_points': loyalty_points,
-            'support_email': settings.SUPPORT_EMAIL,
-            'site_url': frontend_url,
-        }
-        
-        # Render HTML email
-        html_message = render_to_string('reengagement_email.html', context)
-        
-        # Plain text fallback
-        plain_message = f"""
-Hello {user.first_name},
-
-We noticed you haven't visited us in a while. We'd love to have you back!
-
-Special Offer: Use code WELCOME15 for 15% off your next order!
-
-You still have {loyalty_points} loyalty points waiting for you.
-
-Check out our latest products and exclusive offers just for you.
-
-Best regards,
-The SoundWaveAudio Team
-"""
-        
-        email = EmailMultiAlternatives(
-            subject='We Miss You at SoundWaveAudio!',
-            body=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[user.email],
+        email = _build_reengagement_email(
+            user, loyalty_points, get_template('reengagement_email.html'), connection
         )
-        email.attach_alternative(html_message, "text/html")
         email.send(fail_silently=False)
         
         logger.info(f"Re-engagement email sent to {user.email}")
@@ -269,6 +328,80 @@ The SoundWaveAudio Team
         raise
 
 
+def send_reengagement_email_bulk(users_with_points, sent_user_ids=None):
+    """
+    Send re-engagement emails to many users.
+    Compiles the template once and sends every message over a single
+    SMTP connection.
+    
+    Transient failures (EMAIL_RETRY_EXCEPTIONS) propagate so the calling task
+    can retry; ``sent_user_ids`` then says who already has their email.
+    Permanent rejections are logged and skipped.
+    
+    Args:
+        users_with_points: Iterable of (user, loyalty_points) pairs
+        sent_user_ids: Optional list, extended with the id of each user emailed
+    
+    Returns:
+        int: Number of emails sent
+    """
+    template = get_template('reengagement_email.html')
+    sent_count = 0
+    
+    with get_connection() as connection:
+        for user, loyalty_points in users_with_points:
+            try:
+                message = _build_reengagement_email(user, loyalty_points, template, connection)
+            except Exception as e:
+                logger.error(f"Failed to build re-engagement email for {user.email}: {str(e)}")
+                continue
+            
+            try:
+                sent = connection.send_messages([message])
+            except EMAIL_RETRY_EXCEPTIONS as e:
+                if not _is_permanent_email_error(e):
+                    raise
+                logger.error(f"Re-engagement email to {user.email} rejected: {str(e)}")
+                continue
+            
+            if sent:
+                sent_count += 1
+                if sent_user_ids is not None:
+                    sent_user_ids.append(user.id)
+    
+    logger.info(f"Re-engagement emails sent to {sent_count} users")
+    return sent_count
+
+
+def _is_permanent_email_error(exc):
+    """True for SMTP 5xx rejections, which retrying cannot fix"""
+    if isinstance(exc, SMTPRecipientsRefused):
+        return True
+    return isinstance(exc, SMTPResponseException) and 500 <= exc.smtp_code < 600
+
+
+ADMIN_EMAILS_CACHE_KEY = 'admin_emails_v1'
+ADMIN_EMAILS_CACHE_TIMEOUT = 300  # 5 minutes
+
+
+def get_admin_emails():
+    """
+    Return the email addresses of active staff users.
+    Cached briefly; the cache is cleared whenever a User is saved or deleted.
+    
+    Returns:
+        tuple: Admin email addresses
+    """
+    admin_emails = cache.get(ADMIN_EMAILS_CACHE_KEY)
+    if admin_emails is None:
+        admin_emails = tuple(
+            User.objects.filter(is_staff=True, is_active=True)
+            .values_list('email', flat=True)
+        )
+        cache.set(ADMIN_EMAILS_CACHE_KEY, admin_emails, ADMIN_EMAILS_CACHE_TIMEOUT)
+    return admin_emails
+
+
 def send_mail_to_admins(subject, message, html_message=None):
     """
     Send email to all admin users.
@@ -280,32 +413,25 @@ def send_mail_to_admins(subject, message, html_message=None):
     """
     try:
         # Get all admin emails
-        admin_emails = list(
-            User.objects.filter(is_staff=True, is_active=True)
-            .values_list('email', flat=True)
-        )
+        admin_emails = list(get_admin_emails())
         
         if not admin_emails:
             logger.warning("No admin users found to send email")
             return
         
-        if html_message:
+        # One message, BCC'd to every admin, over a single SMTP connection
+        with get_connection() as connection:
             email = EmailMultiAlternatives(
                 subject=subject,
                 body=message,
                 from_email=settings.DEFAULT_FROM_EMAIL,
-                to=admin_emails,
+                to=[settings.DEFAULT_FROM_EMAIL],
+                bcc=admin_emails,
+                connection=connection,
             )
-            email.attach_alternative(html_message, "text/html")
+            if html_message:
+                email.attach_alternative(html_message, "text/html")
             email.send(fail_silently=False)
-        else:
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=admin_emails,
-                fail_silently=False,
-            )
         
         logger.info(f"Admin notification sent to {len(admin_emails)} admins")
         
@@ -335,10 +461,11 @@ Average Loyalty Points: {report_data.get('average_loyalty_points', 0)}
 Top 10 Customers by Loyalty Points:
 """
         
-        for i, customer in enumerate(report_data.get('top_customers', [])[:10], 1):
-            message += f"\n{i}. {customer.get('name', 'N/A')} ({customer.get('email', 'N/A')}) - {customer.get('loyalty_points', 0)} points"
-        
-        message += "\n\nBest regards,\nSoundWaveAudio Analytics System"
+        lines = [
+            f"\n{i}. {customer.get('name', 'N/A')} ({customer.get('email', 'N/A')}) - {customer.get('loyalty_points', 0)} points"
+            for i, customer in enumerate(report_data.get('top_customers', [])[:10], 1)
+        ]
+        message = message + ''.join(lines) + "\n\nBest regards,\nSoundWaveAudio Analytics System"
         
         send_mail_to_admins(subject, message)
         
@@ -349,30 +476,39 @@ Top 10 Customers by Loyalty Points:
         raise
 
 
-def generate_unique_code(prefix='', length=8, model=None, field_name='code'):
+def generate_unique_code(prefix='', length=8, model=None, field_name='code', batch_size=5):
     """
     Generate a unique code for a model.
     
+    Candidates are checked ``batch_size`` at a time with a single ``__in``
+    query. ``field_name`` should carry ``unique=True`` so the lookup is an
+    index scan and a concurrent insert of the same code fails loudly.
+    
     Args:
         prefix: Optional prefix for the code
         length: Length of the random part
         model: Model class to check uniqueness
         field_name: Field name to check for uniqueness
+        batch_size: Number of candidates checked per query
     
     Returns:
         str: Unique code
     """
+    if model is None:
+        return f"{prefix}{''.join(_SYSRAND.choices(_CODE_ALPHABET, k=length))}"
+    
     while True:
-        random_part = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(length))
-        code = f"{prefix}{random_part}" if prefix else random_part
-        
-        if model is None:
-            return code
-        
-        # Check if code exists in database
-        filter_kwargs = {field_name: code}
-        if not model.objects.filter(**filter_kwargs).exists():
-            return code
+        candidates = [
+            f"{prefix}{''.join(_SYSRAND.choices(_CODE_ALPHABET, k=length))}"
+            for _ in range(batch_size)
+        ]
+        existing = set(
+            model.objects.filter(**{f'{field_name}__in': candidates})
+            .values_list(field_name, flat=True)
+        )
+        for code in candidates:
+            if code not in existing:
+                return code
 
 
 def validate_kenyan_phone(phone):
@@ -385,27 +521,19 @@ def validate_kenyan_phone(phone):
     Returns:
         tuple: (is_valid, formatted_phone)
     """
-    import re
-    
     # Remove any spaces, dashes, or parentheses
-    cleaned = re.sub(r'[\s\-\(\)]', '', phone)
-    
-    # Check various Kenyan formats
-    patterns = [
-        r'^(\+254|254|0)(7|1)\d{8}$',  # Standard Kenyan mobile
-    ]
+    cleaned = _PHONE_CLEAN_RE.sub('', phone)
     
-    for pattern in patterns:
-        if re.match(pattern, cleaned):
-            # Convert to international format
-            if cleaned.startswith('0'):
-                formatted = '+254' + cleaned[1:]
-            elif cleaned.startswith('254'):
-                formatted = '+' + cleaned
-            else:
-                formatted = cleaned
-            
-            return True, formatted
+    if _KE_PHONE_RE.match(cleaned):
+        # Convert to international format
+        if cleaned.startswith('0'):
+            formatted = '+254' + cleaned[1:]
+        elif cleaned.startswith('254'):
+            formatted = '+' + cleaned
+        else:
+            formatted = cleaned
+        
+        return True, formatted
     
     return False, phone
 
@@ -1,11 +1,18 @@
+import logging
+from functools import cached_property
 from django.shortcuts import render
 from rest_framework import viewsets, status, generics, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
 from django.contrib.auth.models import User
+from django.db.models import F
+from django.http import Http404
 from django.utils import timezone
 from django.conf import settings
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
@@ -26,6 +33,11 @@ from .serializers import (
 from backend.pagination import StandardResultsSetPagination, LargeResultsSetPagination
 from .tasks import send_welcome_email, send_password_reset_email_async, send_loyalty_points_notification, notify_admins_contact_message, send_contact_acknowledgement
 
+logger = logging.getLogger(__name__)
+
+# Valid ?status= values for the contact admin list
+CONTACT_STATUSES = frozenset(value for value, _ in ContactMessage.STATUS_CHOICES)
+
 
 class RegisterView(generics.CreateAPIView):
     """API endpoint for user registration"""
@@ -64,26 +76,26 @@ class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        try:
-            refresh_token = request.data.get("refresh_token")
-            if not refresh_token:
-                return Response(
-                    {"error": "Refresh token is required"}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            token = RefreshToken(refresh_token)
-            token.blacklist()
-            
+        refresh_token = request.data.get("refresh_token")
+        if not isinstance(refresh_token, str) or not refresh_token:
             return Response(
-                {"message": "Successfully logged out"}, 
-                status=status.HTTP_200_OK
+                {"error": "Refresh token is required"}, 
+                status=status.HTTP_400_BAD_REQUEST
             )
-        except Exception as e:
+        
+        try:
+            # Revoked in the request so the token is unusable once we answer
+            RefreshToken(refresh_token).blacklist()
+        except TokenError:
             return Response(
-                {"error": str(e)}, 
+                {"error": "Token is invalid or expired"}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        return Response(
+            {"message": "Successfully logged out"}, 
+            status=status.HTTP_200_OK
+        )
 
 
 class CustomerProfileView(generics.RetrieveUpdateAPIView):
@@ -114,7 +126,14 @@ class UpdateProfileView(generics.UpdateAPIView):
     serializer_class = UserUpdateSerializer
 
     def get_object(self):
-        return self.request.user
+        """
+        Load the customer with its addresses once and update through its user,
+        so the serializer saves the same objects the response is built from.
+        """
+        customer = Customer.objects.select_related('user').prefetch_related(
+            'addresses'
+        ).get(user=self.request.user)
+        return customer.user
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
@@ -123,11 +142,9 @@ class UpdateProfileView(generics.UpdateAPIView):
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
         
-        # Return updated customer data with prefetching
-        customer = Customer.objects.select_related('user').prefetch_related(
-            'addresses'
-        ).get(user=instance)
-        customer_serializer = CustomerSerializer(customer)
+        # select_related caches the reverse one-to-one, so this is the
+        # prefetched customer updated above
+        customer_serializer = CustomerSerializer(instance.customer)
         
         return Response({
             'message': 'Profile updated successfully',
@@ -159,14 +176,19 @@ class AddressViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
 
+    @cached_property
+    def customer(self):
+        """The requesting user's customer profile, looked up once per request."""
+        return self.request.user.customer
+
     def get_queryset(self):
         """
-        Optimized query with customer prefetching.
         Filter to only show current user's addresses.
+        AddressSerializer doesn't read the customer, so no join is needed.
         """
         return Address.objects.filter(
-            customer=self.request.user.customer
-        ).select_related('customer__user').order_by('-is_default', '-created_at')
+            customer=self.customer
+        ).order_by('-is_default', '-created_at')
 
     def perform_create(self, serializer):
         """
@@ -176,11 +198,11 @@ class AddressViewSet(viewsets.ModelViewSet):
         if serializer.validated_data.get('is_default', False):
             address_type = serializer.validated_data['address_type']
             Address.objects.filter(
-                customer=self.request.user.customer,
+                customer=self.customer,
                 address_type=address_type
             ).update(is_default=False)
         
-        serializer.save(customer=self.request.user.customer)
+        serializer.save(customer=self.customer)
 
     def perform_update(self, serializer):
         """
@@ -193,7 +215,7 @@ class AddressViewSet(viewsets.ModelViewSet):
                 serializer.instance.address_type
             )
             Address.objects.filter(
-                customer=self.request.user.customer,
+                customer=self.customer,
                 address_type=address_type
             ).exclude(id=serializer.instance.id).update(is_default=False)
         
@@ -206,7 +228,7 @@ class AddressViewSet(viewsets.ModelViewSet):
         
         # Unset other default addresses of the same type
         Address.objects.filter(
-            customer=request.user.customer,
+            customer=self.customer,
             address_type=address.address_type
         ).exclude(id=address.id).update(is_default=False)
         
@@ -228,6 +250,7 @@ class CustomerViewSet(viewsets.ReadOnlyModelViewSet):
     
     # Use large pagination for admin customer lists
     pagination_class = LargeResultsSetPagination
+    lookup_value_regex = r'\d+'
 
     def get_queryset(self):
         """
@@ -238,7 +261,7 @@ class CustomerViewSet(viewsets.ReadOnlyModelViewSet):
         
         # Non-staff users can only see their own profile
         if not self.request.user.is_staff:
-            return queryset.filter(user=self.request.user)
+            return queryset.filter(user_id=self.request.user.id)
         
         # Staff users see all customers with ordering
         return queryset.order_by('-created_at')
@@ -246,30 +269,31 @@ class CustomerViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def add_loyalty_points(self, request, pk=None):
         """Add loyalty points to a customer (admin only)"""
-        customer = self.get_object()
-        points = request.data.get('points', 0)
-        
         try:
-            points = int(points)
-            customer.loyalty_points += points
-            customer.save(update_fields=['loyalty_points'])
-
-            # Send notification asynchronously
-            send_loyalty_points_notification.delay(
-                customer.id,
-                points,
-                "Admin awarded loyalty points"
-            )
-            
-            return Response({
-                'message': f'Added {points} loyalty points',
-                'total_points': customer.loyalty_points
-            })
-        except ValueError:
+            points = int(request.data.get('points', 0))
+        except (TypeError, ValueError):
             return Response(
                 {'error': 'Invalid points value'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        # Atomic increment; no fetch-then-save race with concurrent awards
+        customers = Customer.objects.filter(pk=pk)
+        if not customers.update(loyalty_points=F('loyalty_points') + points):
+            raise Http404
+        total_points = customers.values_list('loyalty_points', flat=True).get()
+
+        # Send notification asynchronously
+        send_loyalty_points_notification.delay(
+            int(pk),
+            points,
+            "Admin awarded loyalty points"
+        )
+        
+        return Response({
+            'message': f'Added {points} loyalty points',
+            'total_points': total_points
+        })
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
     def top_customers(self, request):
@@ -290,8 +314,6 @@ class PasswordResetRequestView(generics.GenericAPIView):
     
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
-
-        print("Yo testing Me")
         
         if not serializer.is_valid():
             # Always return a success response for security
@@ -317,12 +339,8 @@ class PasswordResetRequestView(generics.GenericAPIView):
         )
         
         # Send email asynchronously using Celery
-        print(f"📝 Reset code created: {reset_code}")
-        
-        # Send email asynchronously using Celery
-        print(f"📧 Queuing email task for user {user.id}")
-        task = send_password_reset_email_async.delay(user.id, reset_code)
-        print(f"✅ Task queued with ID: {task.id}")
+        task = send_password_reset_email_async.delay(user.id, reset_code, token)
+        logger.debug("Queued password reset email task %s for user %s", task.id, user.id)
         
         return Response({
             "message": "If an account exists with this email, a reset code will be sent."
@@ -366,16 +384,16 @@ class PasswordResetConfirmView(generics.GenericAPIView):
         # Mark reset code as used
         reset_code.mark_as_used()
         
-        # Invalidate all existing refresh tokens
-        from rest_framework_simplejwt.tokens import RefreshToken
-        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
-        from rest_framework_simplejwt.utils import aware_utcnow
-        
-        # Blacklist all outstanding tokens for this user
-        tokens = OutstandingToken.objects.filter(user=user)
-        for token in tokens:
-            if not BlacklistedToken.objects.filter(token=token).exists():
-                BlacklistedToken.objects.create(token=token, blacklisted_at=aware_utcnow())
+        # Blacklist all outstanding tokens for this user that aren't already
+        pending_ids = OutstandingToken.objects.filter(
+            user=user, blacklistedtoken__isnull=True
+        ).values_list('id', flat=True)
+        blacklisted_at = aware_utcnow()
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token_id=token_id, blacklisted_at=blacklisted_at) for token_id in pending_ids],
+            batch_size=500,
+            ignore_conflicts=True
+        )
         
         return Response({
             "message": "Password has been reset successfully. You can now log in with your new password."
@@ -436,7 +454,7 @@ class ContactMessageAdminViewSet(viewsets.ModelViewSet):
 
         # Filter by status
         status_filter = self.request.query_params.get('status')
-        if status_filter in dict(ContactMessage.STATUS_CHOICES):
+        if status_filter in CONTACT_STATUSES:
             qs = qs.filter(status=status_filter)
 
         # Simple search by name or email
@@ -0,0 +1,56 @@
+"""
+Celery Beat schedule for the inventory app.
+Merged into the project-wide schedule by backend/celery.py.
+
+Daily 9 AM and 11 PM jobs are not listed here; they are fanned out by the
+dispatch_daily_9am / dispatch_nightly_reports tasks in backend/celery.py.
+"""
+from backend.schedules import crontab
+
+
+BEAT_SCHEDULE = {
+    'monitor-stock-levels': {
+        'task': 'inventory.tasks.monitor_stock_levels',
+        'schedule': crontab(minute='*/30'),  # Every 30 minutes
+    },
+    'monitor-warehouse-capacity': {
+        'task': 'inventory.tasks.monitor_warehouse_capacity',
+        'schedule': crontab(hour=6, minute=30),  # Daily at 6:30 AM (safety net)
+    },
+    'flush-transfer-notifications': {
+        'task': 'inventory.tasks.flush_transfer_notifications',
+        'schedule': crontab(),  # Every minute
+    },
+    'monitor-pending-transfers': {
+        'task': 'inventory.tasks.monitor_pending_transfers',
+        'schedule': crontab(minute=0, hour='*/2'),  # Every 2 hours
+    },
+    'schedule-automatic-stock-counts': {
+        'task': 'inventory.tasks.schedule_automatic_stock_counts',
+        'schedule': crontab(day_of_week=1, hour=8, minute=0),  # Every Monday at 8 AM
+    },
+    'analyze-stock-count-discrepancies': {
+        'task': 'inventory.tasks.analyze_stock_count_discrepancies',
+        'schedule': crontab(day_of_week=0, hour=10, minute=0),  # Every Sunday at 10 AM
+    },
+    'analyze-stock-turnover': {
+        'task': 'inventory.tasks.analyze_stock_turnover',
+        'schedule': crontab(day_of_week=0, hour=11, minute=0),  # Every Sunday at 11 AM [long]
+    },
+    'detect-suspicious-movements': {
+        'task': 'inventory.tasks.detect_suspicious_movements',
+        'schedule': crontab(hour=8, minute=0),  # Daily at 8 AM
+    },
+    'generate-movement-audit-report': {
+        'task': 'inventory.tasks.generate_movement_audit_report',
+        'schedule': crontab(day_of_week=1, hour=10, minute=0),  # Every Monday at 10 AM [long]
+    },
+    'cleanup-old-resolved-alerts': {
+        'task': 'inventory.tasks.cleanup_old_resolved_alerts',
+        'schedule': crontab(day_of_month=1, hour=3, minute=0),  # Monthly on 1st at 3 AM
+    },
+    'sync-product-stock-from-warehouses': {
+        'task': 'inventory.tasks.sync_product_stock_from_warehouses',
+        'schedule': crontab(minute=0, hour='*/6'),  # Every 6 hours [long]
+    },
+}
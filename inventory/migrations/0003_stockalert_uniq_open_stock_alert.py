@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-16 10:05
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def resolve_duplicate_open_alerts(apps, schema_editor):
+    """Keep only the newest open alert per type/warehouse/product."""
+    StockAlert = apps.get_model('inventory', 'StockAlert')
+    duplicates = (
+        StockAlert.objects.filter(is_resolved=False)
+        .values('alert_type', 'warehouse_id', 'product_id')
+        .annotate(n=Count('id'), keep_id=Max('id'))
+        .filter(n__gt=1)
+    )
+    for row in duplicates:
+        StockAlert.objects.filter(
+            is_resolved=False,
+            alert_type=row['alert_type'],
+            warehouse_id=row['warehouse_id'],
+            product_id=row['product_id'],
+        ).exclude(id=row['keep_id']).update(
+            is_resolved=True,
+            resolution_notes='Duplicate alert closed automatically',
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_inventorytransfer_stockalert_stockcount_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_duplicate_open_alerts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='stockalert',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_resolved', False)), fields=('alert_type', 'warehouse', 'product'), name='uniq_open_stock_alert'),
+        ),
+    ]
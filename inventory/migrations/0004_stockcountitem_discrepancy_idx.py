@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_stockalert_uniq_open_stock_alert'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stockcountitem',
+            index=models.Index(condition=models.Q(('has_discrepancy', True)), fields=['stock_count'], name='stockcountitem_discrepancy_idx'),
+        ),
+    ]
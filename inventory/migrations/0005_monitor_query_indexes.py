@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-16 12:15
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('inventory', '0004_stockcountitem_discrepancy_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='stockmovement',
+            index=models.Index(fields=['warehouse', '-created_at'], name='movement_wh_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='inventorytransfer',
+            index=models.Index(fields=['status', 'requested_at'], name='transfer_status_requested_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='inventorytransfer',
+            index=models.Index(fields=['status', 'expected_arrival'], name='transfer_status_arrival_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='stockcount',
+            index=models.Index(fields=['status', 'completed_at'], name='stockcount_status_done_idx'),
+        ),
+    ]
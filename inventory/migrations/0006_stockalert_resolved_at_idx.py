@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-16 13:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('inventory', '0005_monitor_query_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='stockalert',
+            index=models.Index(fields=['is_resolved', 'resolved_at'], name='stockalert_resolved_at_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-16 15:10
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations
+
+
+def recompute_current_capacity(apps, schema_editor):
+    """Set current_capacity from on-hand stock times product volume (cm -> m3)."""
+    Warehouse = apps.get_model('inventory', 'Warehouse')
+    WarehouseStock = apps.get_model('inventory', 'WarehouseStock')
+
+    used = defaultdict(Decimal)
+    rows = WarehouseStock.objects.filter(quantity__gt=0).values_list(
+        'warehouse_id', 'quantity', 'product__dimensions'
+    )
+    for warehouse_id, quantity, dimensions in rows.iterator():
+        dimensions = dimensions or {}
+        try:
+            unit_volume = (
+                Decimal(str(dimensions['length']))
+                * Decimal(str(dimensions['width']))
+                * Decimal(str(dimensions['height']))
+                / Decimal('1000000')
+            )
+        except (KeyError, TypeError, ArithmeticError):
+            continue
+        if unit_volume > 0:
+            used[warehouse_id] += unit_volume * quantity
+
+    warehouses = list(Warehouse.objects.only('id', 'current_capacity'))
+    for warehouse in warehouses:
+        warehouse.current_capacity = used[warehouse.id].quantize(Decimal('0.01'))
+    Warehouse.objects.bulk_update(warehouses, ['current_capacity'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_stockalert_resolved_at_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_current_capacity, migrations.RunPython.noop),
+    ]
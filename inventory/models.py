@@ -1,13 +1,32 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from django.utils import timezone
-from django.db.models import Sum, F, Q
+from django.db.models import Sum, F, Q, Value
+from django.db.models.functions import Greatest
 from products.models import Product
 from decimal import Decimal
 import uuid
 
 
+def unit_volume(dimensions):
+    """
+    Volume of one unit in cubic meters from Product.dimensions (cm), or None
+    when the dimensions are missing or unusable.
+    """
+    dimensions = dimensions or {}
+    try:
+        volume = (
+            Decimal(str(dimensions['length']))
+            * Decimal(str(dimensions['width']))
+            * Decimal(str(dimensions['height']))
+            / Decimal('1000000')
+        )
+    except (KeyError, TypeError, ArithmeticError):
+        return None
+    return volume if volume > 0 else None
+
+
 class Warehouse(models.Model):
     """Physical or virtual warehouse locations"""
     name = models.CharField(max_length=100, unique=True) # e.g. "Home", "Office", "Warehouse"
@@ -59,6 +78,72 @@ class Warehouse(models.Model):
     def total_products(self):
         return self.stock.aggregate(total=Sum('quantity'))['total'] or 0
 
+    # Usage percentages at which a capacity alert is raised, highest first
+    CAPACITY_THRESHOLDS = ((90, 'critical'), (80, 'high'), (70, 'medium'))
+
+    @classmethod
+    def capacity_priority(cls, usage):
+        """Alert priority for a usage percentage, or None below the lowest threshold"""
+        for threshold, priority in cls.CAPACITY_THRESHOLDS:
+            if usage >= threshold:
+                return priority
+        return None
+
+    @classmethod
+    def recompute_capacity(cls):
+        """
+        Reset every warehouse's current_capacity to on-hand stock times product
+        volume. Stock changes that bypass StockMovement never reach
+        adjust_capacity, so this is the source of truth the counter is reset to.
+        
+        Returns:
+            int: Number of warehouses whose counter changed
+        """
+        used = {}
+        rows = WarehouseStock.objects.filter(quantity__gt=0).values_list(
+            'warehouse_id', 'quantity', 'product__dimensions'
+        )
+        for warehouse_id, quantity, dimensions in rows.iterator():
+            volume = unit_volume(dimensions)
+            if volume:
+                used[warehouse_id] = used.get(warehouse_id, Decimal('0')) + volume * quantity
+        
+        changed = []
+        for warehouse in cls.objects.only('id', 'current_capacity'):
+            current = used.get(warehouse.id, Decimal('0')).quantize(Decimal('0.01'))
+            if warehouse.current_capacity != current:
+                warehouse.current_capacity = current
+                changed.append(warehouse)
+        cls.objects.bulk_update(changed, ['current_capacity'], batch_size=500)
+        return len(changed)
+
+    def adjust_capacity(self, delta):
+        """
+        Atomically add ``delta`` cubic meters to current_capacity, never going
+        below zero, and queue a capacity alert when the change pushes usage up
+        across a threshold.
+        """
+        from .tasks import send_capacity_alert
+
+        delta = Decimal(delta)
+        Warehouse.objects.filter(pk=self.pk).update(
+            current_capacity=Greatest(F('current_capacity') + delta, Value(Decimal('0')))
+        )
+        self.current_capacity = Warehouse.objects.filter(pk=self.pk).values_list(
+            'current_capacity', flat=True
+        ).get()
+
+        if not self.max_capacity or self.max_capacity <= 0 or delta <= 0:
+            return self.current_capacity
+
+        usage = float(self.current_capacity * 100 / self.max_capacity)
+        previous = float((self.current_capacity - delta) * 100 / self.max_capacity)
+        priority = self.capacity_priority(usage)
+        if priority and priority != self.capacity_priority(previous):
+            alert = {'warehouse': self.name, 'usage': usage, 'priority': priority}
+            transaction.on_commit(lambda: send_capacity_alert.delay([alert]))
+        return self.current_capacity
+
     def save(self, *args, **kwargs):
         # Ensure only one primary warehouse
         if self.is_primary:
@@ -186,6 +271,7 @@ class StockMovement(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['warehouse', 'product', '-created_at']),
+            models.Index(fields=['warehouse', '-created_at'], name='movement_wh_created_idx'),
             models.Index(fields=['movement_type', '-created_at']),
             models.Index(fields=['reference_type', 'reference_id']),
         ]
@@ -245,6 +331,10 @@ class InventoryTransfer(models.Model):
 
     class Meta:
         ordering = ['-requested_at']
+        indexes = [
+            models.Index(fields=['status', 'requested_at'], name='transfer_status_requested_idx'),
+            models.Index(fields=['status', 'expected_arrival'], name='transfer_status_arrival_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.transfer_number:
@@ -421,6 +511,15 @@ class StockAlert(models.Model):
         indexes = [
             models.Index(fields=['alert_type', 'is_resolved']),
             models.Index(fields=['warehouse', 'is_resolved']),
+            models.Index(fields=['is_resolved', 'resolved_at'], name='stockalert_resolved_at_idx'),
+        ]
+        constraints = [
+            # At most one open alert per type, warehouse and product
+            models.UniqueConstraint(
+                fields=['alert_type', 'warehouse', 'product'],
+                condition=models.Q(is_resolved=False),
+                name='uniq_open_stock_alert',
+            ),
         ]
 
     def __str__(self):
@@ -473,10 +572,18 @@ class StockCount(models.Model):
 
     class Meta:
         ordering = ['-scheduled_date']
+        indexes = [
+            models.Index(fields=['status', 'completed_at'], name='stockcount_status_done_idx'),
+        ]
+
+    @staticmethod
+    def generate_count_number():
+        """New count number; also used for rows created with bulk_create"""
+        return f"CNT-{uuid.uuid4().hex[:8].upper()}"
 
     def save(self, *args, **kwargs):
         if not self.count_number:
-            self.count_number = f"CNT-{uuid.uuid4().hex[:8].upper()}"
+            self.count_number = self.generate_count_number()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -513,6 +620,11 @@ class StockCountItem(models.Model):
     class Meta:
         unique_together = ['stock_count', 'product']
         ordering = ['product__sku']
+        indexes = [
+            # Discrepancies are a small slice of all counted items
+            models.Index(fields=['stock_count'], condition=Q(has_discrepancy=True),
+                         name='stockcountitem_discrepancy_idx'),
+        ]
 
     def __str__(self):
         return f"{self.product.sku} - Expected: {self.expected_quantity}, Counted: {self.counted_quantity}"
@@ -1,7 +1,8 @@
 from django.db.models.signals import post_save, pre_save, pre_delete
 from django.dispatch import receiver
 from django.db.models import Sum
-from .models import WarehouseStock, StockAlert, StockMovement, InventoryTransfer, TransferItem, StockCount, StockCountItem
+from django.utils import timezone
+from .models import WarehouseStock, StockAlert, StockMovement, InventoryTransfer, TransferItem, StockCount, StockCountItem, unit_volume
 from orders.models import Order, OrderItem
 
 
@@ -45,7 +46,7 @@ def check_stock_levels(sender, instance, created, **kwargs):
             product=instance.product,
             alert_type__in=['low_stock', 'out_of_stock'],
             is_resolved=False
-        ).update(is_resolved=True, resolution_notes='Stock replenished automatically')
+        ).update(is_resolved=True, resolved_at=timezone.now(), resolution_notes='Stock replenished automatically')
     
     # Damaged stock alert
     if instance.damaged_quantity > 0:
@@ -106,14 +107,17 @@ def handle_order_inventory(sender, instance, created, **kwargs):
                         )
                         warehouse_stock.reserve_stock(item.quantity)
                     except WarehouseStock.DoesNotExist:
-                        # Create alert for missing stock
-                        StockAlert.objects.create(
+                        # Create alert for missing stock (one open alert per product)
+                        StockAlert.objects.get_or_create(
                             alert_type='out_of_stock',
-                            priority='critical',
                             warehouse=warehouse,
                             product=item.product,
-                            message=f'Order {instance.order_number} requires {item.quantity} units but product not in warehouse',
-                            current_quantity=0
+                            is_resolved=False,
+                            defaults={
+                                'priority': 'critical',
+                                'message': f'Order {instance.order_number} requires {item.quantity} units but product not in warehouse',
+                                'current_quantity': 0
+                            }
                         )
         
         # When order is shipped, fulfill reservation (remove from inventory)
@@ -288,4 +292,15 @@ def sync_product_stock_after_count(sender, instance, **kwargs):
                 except Product.DoesNotExist:
                     continue
         except Exception as e:
-            print(f"Error syncing product stock after count: {e}")
\ No newline at end of file
+            print(f"Error syncing product stock after count: {e}")
+
+
+@receiver(post_save, sender=StockMovement)
+def track_warehouse_capacity(sender, instance, created, **kwargs):
+    """Keep warehouse current_capacity in step with stock movements"""
+    if not created or not instance.warehouse_id or not instance.quantity:
+        return
+
+    volume = unit_volume(instance.product.dimensions)
+    if volume:
+        instance.warehouse.adjust_capacity(volume * instance.quantity)
@@ -3,30 +3,59 @@ God-Level Celery Tasks for Inventory App
 Handles stock monitoring, warehouse operations, transfers, and analytics
 """
 from celery import shared_task
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils import timezone
-from django.db.models import Sum, Count, Avg, F, Q, Min, Max
-from django.db.models.functions import TruncDate, TruncMonth
+from django.db import connection as db_connection, transaction
+from django.db.models import (
+    Sum, Count, Avg, F, Q, Min, Max, Case, When, Value, Prefetch, Window, Exists, OuterRef, Subquery,
+    CharField, DecimalField, ExpressionWrapper, FloatField
+)
+from django.db.models.functions import Abs, Cast, Coalesce, Greatest, TruncDate, TruncMonth
 from datetime import timedelta
 from decimal import Decimal
+from itertools import islice
+from smtplib import SMTPRecipientsRefused, SMTPResponseException
+from django_redis import get_redis_connection
+import json
 import logging
+import time
+import uuid
 
 from .models import (
     Warehouse, WarehouseStock, StockMovement, InventoryTransfer,
     TransferItem, StockAlert, StockCount, StockCountItem
 )
 from products.models import Product
-from orders.models import Order
+from customers.utils import send_mail_to_admins
+from orders.models import Order, OrderItem
 
 logger = logging.getLogger(__name__)
 
+# Line separator for lists joined inside alert email f-strings
+NL = "\n"
+
 
 # ============================================================================
 # STOCK LEVEL MONITORING TASKS
 # ============================================================================
 
+# Priority and message per monitored alert type, in classification order
+STOCK_LEVEL_ALERTS = {
+    'out_of_stock': ('critical', '{product} is out of stock at {warehouse}'),
+    'low_stock': ('high', '{product} is below reorder point at {warehouse}'),
+    'reorder_point': ('medium', '{product} needs reordering at {warehouse}'),
+    'overstock': ('low', '{product} may be overstocked at {warehouse}'),
+}
+
+# Alert types closed automatically once a stock row is healthy again
+AUTO_RESOLVED_ALERTS = ('low_stock', 'out_of_stock', 'reorder_point')
+
+# Rows fetched per round-trip from the server-side cursor
+STOCK_MONITOR_CHUNK_SIZE = 2000
+
+
 @shared_task
 def monitor_stock_levels():
     """
@@ -34,6 +63,9 @@ def monitor_stock_levels():
     Creates alerts for low stock, out of stock, and overstock situations.
     Runs every 30 minutes via Celery Beat.
     
+    Stock rows are classified in SQL and diffed against the open alerts,
+    so the task issues a fixed number of queries however many rows exist.
+    
     Returns:
         dict: Summary of alerts created
     """
@@ -45,94 +77,81 @@ def monitor_stock_levels():
             'overstock': 0
         }
         
-        # Monitor all active warehouses
-        active_warehouses = Warehouse.objects.filter(is_active=True)
+        # Same precedence as the old if/elif chain; the reorder_point branch is
+        # WarehouseStock.needs_reorder (available quantity <= reorder point)
+        stock_rows = WarehouseStock.objects.filter(
+            warehouse__is_active=True
+        ).annotate(
+            bucket=Case(
+                When(quantity=0, then=Value('out_of_stock')),
+                When(
+                    Q(quantity__lte=F('reorder_point')) & Q(reorder_point__gt=0),
+                    then=Value('low_stock')
+                ),
+                When(
+                    quantity__lte=F('reorder_point') + F('reserved_quantity') + F('damaged_quantity'),
+                    then=Value('reorder_point')
+                ),
+                When(
+                    Q(reorder_quantity__gt=0) & Q(quantity__gt=F('reorder_quantity') * 3),
+                    then=Value('overstock')
+                ),
+                default=Value('ok'),
+                output_field=CharField(),
+            )
+        ).values_list(
+            'bucket', 'warehouse_id', 'product_id', 'quantity',
+            'reorder_point', 'reorder_quantity', 'warehouse__name', 'product__name'
+        ).iterator(chunk_size=STOCK_MONITOR_CHUNK_SIZE)
+        
+        open_alerts = {
+            (alert_type, warehouse_id, product_id): alert_id
+            for alert_id, alert_type, warehouse_id, product_id in StockAlert.objects.filter(
+                is_resolved=False,
+                alert_type__in=STOCK_LEVEL_ALERTS
+            ).values_list('id', 'alert_type', 'warehouse_id', 'product_id')
+        }
+        
+        new_alerts = []
+        healthy = set()
         
-        for warehouse in active_warehouses:
-            warehouse_stocks = WarehouseStock.objects.filter(
-                warehouse=warehouse
-            ).select_related('product')
+        for bucket, warehouse_id, product_id, quantity, reorder_point, reorder_quantity, warehouse_name, product_name in stock_rows:
+            if bucket == 'ok':
+                healthy.add((warehouse_id, product_id))
+                continue
             
-            for stock in warehouse_stocks:
-                # Out of stock
-                if stock.quantity == 0:
-                    alert, created = StockAlert.objects.get_or_create(
-                        alert_type='out_of_stock',
-                        warehouse=warehouse,
-                        product=stock.product,
-                        is_resolved=False,
-                        defaults={
-                            'priority': 'critical',
-                            'message': f'{stock.product.name} is out of stock at {warehouse.name}',
-                            'current_quantity': 0,
-                            'threshold_quantity': stock.reorder_point
-                        }
-                    )
-                    if created:
-                        alerts_created['out_of_stock'] += 1
-                
-                # Low stock (at or below reorder point)
-                elif stock.quantity <= stock.reorder_point and stock.reorder_point > 0:
-                    alert, created = StockAlert.objects.get_or_create(
-                        alert_type='low_stock',
-                        warehouse=warehouse,
-                        product=stock.product,
-                        is_resolved=False,
-                        defaults={
-                            'priority': 'high',
-                            'message': f'{stock.product.name} is below reorder point at {warehouse.name}',
-                            'current_quantity': stock.quantity,
-                            'threshold_quantity': stock.reorder_point
-                        }
-                    )
-                    if created:
-                        alerts_created['low_stock'] += 1
-                
-                # Reorder point reached (needs ordering)
-                elif stock.needs_reorder:
-                    alert, created = StockAlert.objects.get_or_create(
-                        alert_type='reorder_point',
-                        warehouse=warehouse,
-                        product=stock.product,
-                        is_resolved=False,
-                        defaults={
-                            'priority': 'medium',
-                            'message': f'{stock.product.name} needs reordering at {warehouse.name}',
-                            'current_quantity': stock.quantity,
-                            'threshold_quantity': stock.reorder_point
-                        }
-                    )
-                    if created:
-                        alerts_created['reorder_point'] += 1
-                
-                # Overstock detection (3x reorder quantity)
-                elif stock.reorder_quantity > 0 and stock.quantity > (stock.reorder_quantity * 3):
-                    alert, created = StockAlert.objects.get_or_create(
-                        alert_type='overstock',
-                        warehouse=warehouse,
-                        product=stock.product,
-                        is_resolved=False,
-                        defaults={
-                            'priority': 'low',
-                            'message': f'{stock.product.name} may be overstocked at {warehouse.name}',
-                            'current_quantity': stock.quantity,
-                            'threshold_quantity': stock.reorder_quantity * 3
-                        }
-                    )
-                    if created:
-                        alerts_created['overstock'] += 1
-                
-                # Auto-resolve alerts if stock is replenished
-                else:
-                    StockAlert.objects.filter(
-                        warehouse=warehouse,
-                        product=stock.product,
-                        alert_type__in=['low_stock', 'out_of_stock', 'reorder_point'],
-                        is_resolved=False
-                    ).update(
-                        is_resolved=True,
-                        resolution_notes='Stock replenished automatically'
-                    )
+            if (bucket, warehouse_id, product_id) in open_alerts:
+                continue
+            
+            priority, message = STOCK_LEVEL_ALERTS[bucket]
+            new_alerts.append(StockAlert(
+                alert_type=bucket,
+                warehouse_id=warehouse_id,
+                product_id=product_id,
+                priority=priority,
+                message=message.format(product=product_name, warehouse=warehouse_name),
+                current_quantity=quantity,
+                threshold_quantity=reorder_quantity * 3 if bucket == 'overstock' else reorder_point,
+            ))
+            alerts_created[bucket] += 1
+        
+        if new_alerts:
+            # uniq_open_stock_alert turns a concurrent duplicate into a no-op
+            StockAlert.objects.bulk_create(new_alerts, batch_size=500, ignore_conflicts=True)
+        
+        # Auto-resolve alerts if stock is replenished
+        resolved_ids = [
+            alert_id
+            for (alert_type, warehouse_id, product_id), alert_id in open_alerts.items()
+            if alert_type in AUTO_RESOLVED_ALERTS and (warehouse_id, product_id) in healthy
+        ]
+        if resolved_ids:
+            # Stamp resolved_at so cleanup_old_resolved_alerts can purge these
+            StockAlert.objects.filter(id__in=resolved_ids).update(
+                is_resolved=True,
+                resolved_at=timezone.now(),
+                resolution_notes='Stock replenished automatically'
+            )
         
         # Send consolidated alert if critical alerts exist
         total_alerts = sum(alerts_created.values())
@@ -159,19 +178,20 @@ def send_stock_alert_summary(self, alerts_created):
         str: Success message
     """
     try:
-        from customers.utils import send_mail_to_admins
+        summary_fields = ('current_quantity', 'warehouse', 'warehouse__name',
+                          'product', 'product__name', 'product__sku')
         
-        # Get critical alerts
-        critical_alerts = StockAlert.objects.filter(
+        # Get critical alerts (evaluated once; len() below, no COUNT query)
+        critical_alerts = list(StockAlert.objects.filter(
             priority='critical',
             is_resolved=False
-        ).select_related('warehouse', 'product')[:20]
+        ).select_related('warehouse', 'product').only(*summary_fields)[:20])
         
         # Get high priority alerts
-        high_alerts = StockAlert.objects.filter(
+        high_alerts = list(StockAlert.objects.filter(
             priority='high',
             is_resolved=False
-        ).select_related('warehouse', 'product')[:20]
+        ).select_related('warehouse', 'product').only(*summary_fields)[:20])
         
         subject = f"📦 Stock Alert Summary - {alerts_created['out_of_stock']} Critical"
         
@@ -184,11 +204,11 @@ New Alerts Created:
   • Reorder Point: {alerts_created['reorder_point']}
   • Overstock: {alerts_created['overstock']}
 
-CRITICAL - Out of Stock ({critical_alerts.count()}):
-{chr(10).join(f"  • {a.product.name} ({a.product.sku}) at {a.warehouse.name}" for a in critical_alerts) if critical_alerts else "  None"}
+CRITICAL - Out of Stock ({len(critical_alerts)}):
+{NL.join(f"  • {a.product.name} ({a.product.sku}) at {a.warehouse.name}" for a in critical_alerts) if critical_alerts else "  None"}
 
-HIGH PRIORITY - Low Stock ({high_alerts.count()}):
-{chr(10).join(f"  • {a.product.name} ({a.product.sku}) at {a.warehouse.name} - {a.current_quantity} units" for a in high_alerts) if high_alerts else "  None"}
+HIGH PRIORITY - Low Stock ({len(high_alerts)}):
+{NL.join(f"  • {a.product.name} ({a.product.sku}) at {a.warehouse.name} - {a.current_quantity} units" for a in high_alerts) if high_alerts else "  None"}
 
 Please review and take action on these inventory alerts.
 
@@ -219,11 +239,26 @@ def check_damaged_stock():
         # Find warehouses with damaged stock
         damaged_stock = WarehouseStock.objects.filter(
             damaged_quantity__gt=0
-        ).select_related('warehouse', 'product')
+        ).select_related('warehouse', 'product').only(
+            'quantity', 'damaged_quantity',
+            'warehouse', 'warehouse__name', 'product', 'product__name'
+        )
         
-        alerts_created = 0
+        open_alerts = set(
+            StockAlert.objects.filter(
+                alert_type='damaged',
+                is_resolved=False
+            ).values_list('warehouse_id', 'product_id')
+        )
+        
+        stock_ids = []
+        new_alerts = []
         
         for stock in damaged_stock:
+            stock_ids.append(stock.id)
+            if (stock.warehouse_id, stock.product_id) in open_alerts:
+                continue
+            
             # Calculate damage percentage
             if stock.quantity > 0:
                 damage_percentage = (stock.damaged_quantity / stock.quantity) * 100
@@ -231,24 +266,22 @@ def check_damaged_stock():
             else:
                 priority = 'medium'
             
-            alert, created = StockAlert.objects.get_or_create(
+            new_alerts.append(StockAlert(
                 alert_type='damaged',
-                warehouse=stock.warehouse,
-                product=stock.product,
-                is_resolved=False,
-                defaults={
-                    'priority': priority,
-                    'message': f'{stock.damaged_quantity} units of {stock.product.name} damaged at {stock.warehouse.name}',
-                    'current_quantity': stock.damaged_quantity,
-                    'threshold_quantity': 0
-                }
-            )
-            
-            if created:
-                alerts_created += 1
+                warehouse_id=stock.warehouse_id,
+                product_id=stock.product_id,
+                priority=priority,
+                message=f'{stock.damaged_quantity} units of {stock.product.name} damaged at {stock.warehouse.name}',
+                current_quantity=stock.damaged_quantity,
+                threshold_quantity=0
+            ))
+        
+        # uniq_open_stock_alert makes ON CONFLICT DO NOTHING skip racing duplicates
+        StockAlert.objects.bulk_create(new_alerts, batch_size=500, ignore_conflicts=True)
+        alerts_created = len(new_alerts)
         
         if alerts_created > 0:
-            send_damaged_stock_alert.delay(list(damaged_stock.values_list('id', flat=True)))
+            send_damaged_stock_alert.delay(stock_ids)
         
         logger.info(f"Damaged stock check complete: {alerts_created} new alerts")
         return f"Damaged stock check complete: {alerts_created} new alerts"
@@ -270,27 +303,38 @@ def send_damaged_stock_alert(self, stock_ids):
         str: Success message
     """
     try:
-        from customers.utils import send_mail_to_admins
-        
+        # Row value computed in SQL; plain tuples, no model hydration
         damaged_items = WarehouseStock.objects.filter(
             id__in=stock_ids
-        ).select_related('warehouse', 'product')
-        
-        total_damaged_value = sum(
-            item.damaged_quantity * (item.product.cost_price or 0)
-            for item in damaged_items
+        ).annotate(
+            damaged_value=F('damaged_quantity') * Coalesce(
+                F('product__cost_price'),
+                Value(Decimal('0'), output_field=DecimalField(max_digits=12, decimal_places=2))
+            )
+        ).values_list(
+            'product__name', 'product__sku', 'warehouse__name',
+            'damaged_quantity', 'damaged_value'
         )
         
+        lines = []
+        total_damaged_value = Decimal('0')
+        for product_name, sku, warehouse_name, damaged_quantity, value in damaged_items:
+            total_damaged_value += value
+            lines.append(
+                f"  • {product_name} ({sku}) at {warehouse_name}: "
+                f"{damaged_quantity} units (KSh {value:,.2f})"
+            )
+        
         subject = f"⚠️ Damaged Inventory Alert - KSh {total_damaged_value:,.2f} Value"
         
         message = f"""
 Damaged Inventory Report
 
-Total Damaged Items: {damaged_items.count()}
+Total Damaged Items: {len(lines)}
 Total Value: KSh {total_damaged_value:,.2f}
 
 Damaged Stock:
-{chr(10).join(f"  • {item.product.name} ({item.product.sku}) at {item.warehouse.name}: {item.damaged_quantity} units (KSh {item.damaged_quantity * (item.product.cost_price or 0):,.2f})" for item in damaged_items)}
+{NL.join(lines)}
 
 Please investigate and take appropriate action (repair, dispose, insurance claim).
 
@@ -312,49 +356,45 @@ SoundWaveAudio Inventory System
 # WAREHOUSE CAPACITY MONITORING
 # ============================================================================
 
-@shared_task
+@shared_task(ignore_result=True)
 def monitor_warehouse_capacity():
     """
     Monitor warehouse capacity usage and alert when approaching limits.
-    Runs every 6 hours via Celery Beat.
+    Threshold crossings are alerted as they happen by Warehouse.adjust_capacity;
+    this runs daily via Celery Beat as a safety net, first recomputing
+    current_capacity from stock so drift in the counter is corrected.
     
     Returns:
         dict: Warehouse capacity summary
     """
     try:
-        warehouses = Warehouse.objects.filter(is_active=True)
-        
-        capacity_alerts = []
-        
-        for warehouse in warehouses:
-            if warehouse.max_capacity and warehouse.max_capacity > 0:
-                usage_percentage = warehouse.capacity_percentage
-                
-                # Alert thresholds
-                if usage_percentage >= 90:
-                    priority = 'critical'
-                    message = f'{warehouse.name} is at {usage_percentage:.1f}% capacity (CRITICAL)'
-                    capacity_alerts.append({
-                        'warehouse': warehouse.name,
-                        'usage': usage_percentage,
-                        'priority': priority
-                    })
-                elif usage_percentage >= 80:
-                    priority = 'high'
-                    message = f'{warehouse.name} is at {usage_percentage:.1f}% capacity (HIGH)'
-                    capacity_alerts.append({
-                        'warehouse': warehouse.name,
-                        'usage': usage_percentage,
-                        'priority': priority
-                    })
-                elif usage_percentage >= 70:
-                    priority = 'medium'
-                    message = f'{warehouse.name} is at {usage_percentage:.1f}% capacity'
-                    capacity_alerts.append({
-                        'warehouse': warehouse.name,
-                        'usage': usage_percentage,
-                        'priority': priority
-                    })
+        corrected = Warehouse.recompute_capacity()
+        if corrected:
+            logger.info(f"Recomputed current_capacity for {corrected} warehouses")
+        
+        # Usage and priority computed in SQL; only warehouses at >= 70% come back
+        usage = ExpressionWrapper(
+            F('current_capacity') * 100.0 / F('max_capacity'),
+            output_field=FloatField()
+        )
+        capacity_alerts = [
+            {'warehouse': row['name'], 'usage': row['usage'], 'priority': row['priority']}
+            for row in Warehouse.objects.filter(
+                is_active=True,
+                max_capacity__gt=0
+            ).annotate(
+                usage=usage
+            ).filter(
+                usage__gte=70
+            ).annotate(
+                priority=Case(
+                    When(usage__gte=90, then=Value('critical')),
+                    When(usage__gte=80, then=Value('high')),
+                    default=Value('medium'),
+                    output_field=CharField(),
+                )
+            ).values('name', 'usage', 'priority')
+        ]
         
         if capacity_alerts:
             send_capacity_alert.delay(capacity_alerts)
@@ -367,7 +407,7 @@ def monitor_warehouse_capacity():
         raise
 
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+@shared_task(bind=True, ignore_result=True, max_retries=3, default_retry_delay=60)
 def send_capacity_alert(self, capacity_alerts):
     """
     Send warehouse capacity alerts to admins.
@@ -379,8 +419,6 @@ def send_capacity_alert(self, capacity_alerts):
         str: Success message
     """
     try:
-        from customers.utils import send_mail_to_admins
-        
         critical = [a for a in capacity_alerts if a['priority'] == 'critical']
         high = [a for a in capacity_alerts if a['priority'] == 'high']
         medium = [a for a in capacity_alerts if a['priority'] == 'medium']
@@ -391,13 +429,13 @@ def send_capacity_alert(self, capacity_alerts):
 Warehouse Capacity Monitoring Alert
 
 CRITICAL (≥90%):
-{chr(10).join(f"  • {a['warehouse']}: {a['usage']:.1f}% full" for a in critical) if critical else "  None"}
+{NL.join(f"  • {a['warehouse']}: {a['usage']:.1f}% full" for a in critical) if critical else "  None"}
 
 HIGH (80-89%):
-{chr(10).join(f"  • {a['warehouse']}: {a['usage']:.1f}% full" for a in high) if high else "  None"}
+{NL.join(f"  • {a['warehouse']}: {a['usage']:.1f}% full" for a in high) if high else "  None"}
 
 MEDIUM (70-79%):
-{chr(10).join(f"  • {a['warehouse']}: {a['usage']:.1f}% full" for a in medium) if medium else "  None"}
+{NL.join(f"  • {a['warehouse']}: {a['usage']:.1f}% full" for a in medium) if medium else "  None"}
 
 Consider:
 - Reviewing slow-moving inventory
@@ -423,7 +461,7 @@ SoundWaveAudio Warehouse Management
 # TRANSFER MANAGEMENT TASKS
 # ============================================================================
 
-@shared_task
+@shared_task(ignore_result=True)
 def monitor_pending_transfers():
     """
     Monitor pending transfers and alert on delays.
@@ -433,27 +471,27 @@ def monitor_pending_transfers():
         str: Success message with count
     """
     try:
-        # Find transfers pending for more than 24 hours
-        threshold = timezone.now() - timedelta(hours=24)
-        
-        delayed_approvals = InventoryTransfer.objects.filter(
-            status='draft',
-            requested_at__lt=threshold
-        ).select_related('from_warehouse', 'to_warehouse', 'requested_by')
-        
-        # Find transfers in transit for more than expected
-        overdue_deliveries = InventoryTransfer.objects.filter(
-            status='in_transit',
-            expected_arrival__lt=timezone.now()
-        ).select_related('from_warehouse', 'to_warehouse')
-        
-        if delayed_approvals.exists() or overdue_deliveries.exists():
-            send_transfer_delay_alert.delay(
-                list(delayed_approvals.values_list('id', flat=True)),
-                list(overdue_deliveries.values_list('id', flat=True))
-            )
+        now = timezone.now()
+        
+        # Drafts pending for more than 24 hours, and transfers in transit
+        # past their expected arrival, fetched together in one query
+        rows = InventoryTransfer.objects.filter(
+            Q(status='draft', requested_at__lt=now - timedelta(hours=24)) |
+            Q(status='in_transit', expected_arrival__lt=now)
+        ).values_list('id', 'status')
+        
+        delayed_approval_ids = []
+        overdue_delivery_ids = []
+        for transfer_id, transfer_status in rows:
+            if transfer_status == 'draft':
+                delayed_approval_ids.append(transfer_id)
+            else:
+                overdue_delivery_ids.append(transfer_id)
         
-        total = delayed_approvals.count() + overdue_deliveries.count()
+        if delayed_approval_ids or overdue_delivery_ids:
+            send_transfer_delay_alert.delay(delayed_approval_ids, overdue_delivery_ids)
+        
+        total = len(delayed_approval_ids) + len(overdue_delivery_ids)
         logger.info(f"Transfer monitoring: {total} delayed transfers found")
         return f"Found {total} delayed transfers"
     
@@ -462,7 +500,20 @@ def monitor_pending_transfers():
         raise
 
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+# Ids per IN (...) list; keeps incident-sized backlogs cheap to parse and plan
+TRANSFER_ID_CHUNK_SIZE = 1000
+
+
+def _transfers_in_chunks(transfer_ids, *fields):
+    """Yield transfers (with warehouse codes) for transfer_ids, one IN list per chunk"""
+    transfer_ids = iter(transfer_ids)
+    for chunk in iter(lambda: list(islice(transfer_ids, TRANSFER_ID_CHUNK_SIZE)), []):
+        yield from InventoryTransfer.objects.filter(id__in=chunk).select_related(
+            'from_warehouse', 'to_warehouse'
+        ).only(*fields, 'from_warehouse__code', 'to_warehouse__code')
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=3, default_retry_delay=60)
 def send_transfer_delay_alert(self, delayed_approval_ids, overdue_delivery_ids):
     """
     Send transfer delay alert to admins.
@@ -475,15 +526,12 @@ def send_transfer_delay_alert(self, delayed_approval_ids, overdue_delivery_ids):
         str: Success message
     """
     try:
-        from customers.utils import send_mail_to_admins
-        
-        delayed_approvals = InventoryTransfer.objects.filter(
-            id__in=delayed_approval_ids
-        ).select_related('from_warehouse', 'to_warehouse', 'requested_by')
-        
-        overdue_deliveries = InventoryTransfer.objects.filter(
-            id__in=overdue_delivery_ids
-        ).select_related('from_warehouse', 'to_warehouse')
+        delayed_approvals = list(_transfers_in_chunks(
+            delayed_approval_ids, 'transfer_number', 'requested_at'
+        ))
+        overdue_deliveries = list(_transfers_in_chunks(
+            overdue_delivery_ids, 'transfer_number', 'expected_arrival'
+        ))
         
         subject = f"🚚 Transfer Delays - {len(delayed_approval_ids)} Pending Approval"
         
@@ -491,10 +539,10 @@ def send_transfer_delay_alert(self, delayed_approval_ids, overdue_delivery_ids):
 Inventory Transfer Delay Alert
 
 PENDING APPROVAL (>24 hours):
-{chr(10).join(f"  • {t.transfer_number}: {t.from_warehouse.code} → {t.to_warehouse.code} (Requested: {t.requested_at.strftime('%Y-%m-%d %H:%M')})" for t in delayed_approvals) if delayed_approvals else "  None"}
+{NL.join(f"  • {t.transfer_number}: {t.from_warehouse.code} → {t.to_warehouse.code} (Requested: {t.requested_at.strftime('%Y-%m-%d %H:%M')})" for t in delayed_approvals) if delayed_approvals else "  None"}
 
 OVERDUE DELIVERIES:
-{chr(10).join(f"  • {t.transfer_number}: {t.from_warehouse.code} → {t.to_warehouse.code} (Expected: {t.expected_arrival.strftime('%Y-%m-%d')})" for t in overdue_deliveries) if overdue_deliveries else "  None"}
+{NL.join(f"  • {t.transfer_number}: {t.from_warehouse.code} → {t.to_warehouse.code} (Expected: {t.expected_arrival.strftime('%Y-%m-%d')})" for t in overdue_deliveries) if overdue_deliveries else "  None"}
 
 Please review and process these transfers immediately.
 
@@ -512,38 +560,28 @@ SoundWaveAudio Transfer Management
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def send_transfer_notification(self, transfer_id, notification_type):
-    """
-    Send transfer status notification to warehouse managers.
-    
-    Args:
-        transfer_id: ID of the transfer
-        notification_type: Type of notification (approved, shipped, received)
-    
-    Returns:
-        str: Success message
-    """
-    try:
-        transfer = InventoryTransfer.objects.select_related(
-            'from_warehouse', 'to_warehouse', 'requested_by'
-        ).get(id=transfer_id)
-        
-        # Determine recipients
-        recipients = []
-        if transfer.from_warehouse.manager:
-            recipients.append(transfer.from_warehouse.manager.email)
-        if transfer.to_warehouse.manager:
-            recipients.append(transfer.to_warehouse.manager.email)
-        
-        if not recipients:
-            logger.warning(f"No recipients for transfer notification {transfer_id}")
-            return "No recipients"
-        
-        # Build message based on type
-        if notification_type == 'approved':
-            subject = f"Transfer Approved: {transfer.transfer_number}"
-            message = f"""
+# Redis list holding rendered transfer notifications until the next flush
+TRANSFER_OUTBOX_KEY = 'inventory:transfer_notification_outbox'
+
+# Notifications that failed permanently or ran out of attempts, kept for inspection
+TRANSFER_DEAD_LETTER_KEY = 'inventory:transfer_notification_dead'
+
+# Delivery attempts per notification before it is dead-lettered
+TRANSFER_NOTIFICATION_MAX_ATTEMPTS = 5
+
+# Messages a flush run has taken but not yet sent or dead-lettered, one list
+# per run, with the runs' start times in a sorted set
+TRANSFER_PROCESSING_KEY = 'inventory:transfer_notification_processing:{run}'
+TRANSFER_PROCESSING_RUNS_KEY = 'inventory:transfer_notification_runs'
+
+# A run older than this is assumed dead and its messages are requeued
+TRANSFER_PROCESSING_STALE_SECONDS = 600
+
+# Subject, body and per-item line for each transfer notification type
+TRANSFER_NOTIFICATIONS = {
+    'approved': (
+        "Transfer Approved: {transfer.transfer_number}",
+        """
 Your inventory transfer has been approved.
 
 Transfer: {transfer.transfer_number}
@@ -552,67 +590,123 @@ To: {transfer.to_warehouse.name}
 Status: Approved - Ready for Shipment
 
 Items:
-{chr(10).join(f"  • {item.product.name}: {item.quantity} units" for item in transfer.items.all())}
+{items}
 
 Next Steps: Ship the items and update tracking information.
 
 Best regards,
 SoundWaveAudio Inventory System
-"""
-        
-        elif notification_type == 'shipped':
-            subject = f"Transfer Shipped: {transfer.transfer_number}"
-            message = f"""
+""",
+        "  • {item.product.name}: {item.quantity} units",
+    ),
+    'shipped': (
+        "Transfer Shipped: {transfer.transfer_number}",
+        """
 Inventory transfer has been shipped.
 
 Transfer: {transfer.transfer_number}
 From: {transfer.from_warehouse.name}
 To: {transfer.to_warehouse.name}
-Tracking: {transfer.tracking_number or 'N/A'}
-Expected Arrival: {transfer.expected_arrival.strftime('%Y-%m-%d') if transfer.expected_arrival else 'TBD'}
+Tracking: {tracking_number}
+Expected Arrival: {expected_arrival}
 
 Items:
-{chr(10).join(f"  • {item.product.name}: {item.quantity} units" for item in transfer.items.all())}
+{items}
 
 Please prepare for receipt and inspection.
 
 Best regards,
 SoundWaveAudio Inventory System
-"""
-        
-        elif notification_type == 'received':
-            subject = f"Transfer Received: {transfer.transfer_number}"
-            message = f"""
+""",
+        "  • {item.product.name}: {item.quantity} units",
+    ),
+    'received': (
+        "Transfer Received: {transfer.transfer_number}",
+        """
 Inventory transfer has been received and processed.
 
 Transfer: {transfer.transfer_number}
 From: {transfer.from_warehouse.name}
 To: {transfer.to_warehouse.name}
-Received: {transfer.received_at.strftime('%Y-%m-%d %H:%M')}
+Received: {received_at}
 
 Items Received:
-{chr(10).join(f"  • {item.product.name}: {item.received_quantity}/{item.quantity} units" for item in transfer.items.all())}
+{items}
 
 Inventory has been updated accordingly.
 
 Best regards,
 SoundWaveAudio Inventory System
-"""
+""",
+        "  • {item.product.name}: {item.received_quantity}/{item.quantity} units",
+    ),
+}
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=3, default_retry_delay=60)
+def send_transfer_notification(self, transfer_id, notification_type):
+    """
+    Send transfer status notification to warehouse managers.
+    The rendered email is queued and delivered by flush_transfer_notifications.
+    
+    Args:
+        transfer_id: ID of the transfer
+        notification_type: Type of notification (approved, shipped, received)
+    
+    Returns:
+        str: Success message
+    """
+    # Unknown types are rejected before any query or template work
+    template = TRANSFER_NOTIFICATIONS.get(notification_type)
+    if template is None:
+        return f"Unknown notification type: {notification_type}"
+    
+    try:
+        # Managers and item products loaded up front: 2 queries in total
+        transfer = InventoryTransfer.objects.select_related(
+            'from_warehouse__manager', 'to_warehouse__manager'
+        ).only(
+            'transfer_number', 'expected_arrival', 'received_at', 'tracking_number',
+            'from_warehouse__name', 'from_warehouse__manager__email',
+            'to_warehouse__name', 'to_warehouse__manager__email',
+        ).prefetch_related(
+            Prefetch('items', queryset=TransferItem.objects.select_related('product').only(
+                'transfer', 'quantity', 'received_quantity', 'product__name'
+            ))
+        ).get(id=transfer_id)
         
-        else:
-            return f"Unknown notification type: {notification_type}"
+        # Determine recipients
+        recipients = []
+        if transfer.from_warehouse.manager:
+            recipients.append(transfer.from_warehouse.manager.email)
+        if transfer.to_warehouse.manager:
+            recipients.append(transfer.to_warehouse.manager.email)
         
-        # Send email
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=message,
-            from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@soundwaveaudio.com'),
-            to=recipients,
+        if not recipients:
+            logger.warning(f"No recipients for transfer notification {transfer_id}")
+            return "No recipients"
+        
+        subject_format, body_format, item_format = template
+        items = '\n'.join(item_format.format(item=item) for item in transfer.items.all())
+        
+        subject = subject_format.format(transfer=transfer)
+        message = body_format.format(
+            transfer=transfer,
+            items=items,
+            expected_arrival=transfer.expected_arrival.strftime('%Y-%m-%d') if transfer.expected_arrival else 'TBD',
+            received_at=transfer.received_at.strftime('%Y-%m-%d %H:%M') if transfer.received_at else 'N/A',
+            tracking_number=transfer.tracking_number or 'N/A',
+        )
+        
+        # Queue for flush_transfer_notifications, which sends the backlog
+        # over one SMTP connection
+        get_redis_connection('default').rpush(
+            TRANSFER_OUTBOX_KEY,
+            json.dumps({'subject': subject, 'body': message, 'to': recipients})
         )
-        email.send(fail_silently=False)
         
-        logger.info(f"Transfer {notification_type} notification sent for {transfer.transfer_number}")
-        return f"Transfer notification sent"
+        logger.info(f"Transfer {notification_type} notification queued for {transfer.transfer_number}")
+        return f"Transfer notification queued"
     
     except InventoryTransfer.DoesNotExist:
         logger.error(f"Transfer {transfer_id} not found")
@@ -623,11 +717,137 @@ SoundWaveAudio Inventory System
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
 
+@shared_task(ignore_result=True)
+def flush_transfer_notifications():
+    """
+    Send queued transfer notifications over a single SMTP connection.
+    Messages are moved one at a time into a per-run processing list and only
+    removed from Redis once sent or dead-lettered, so a worker dying mid-flush
+    loses nothing: the next run puts stale processing lists back in the outbox.
+    Transient failures are requeued with an attempt count; permanent failures
+    and messages out of attempts go to TRANSFER_DEAD_LETTER_KEY.
+    Runs every minute via Celery Beat.
+    
+    Returns:
+        str: Success message with count
+    """
+    redis = get_redis_connection('default')
+    _recover_stale_transfer_runs(redis)
+    
+    # Only what is queued now; anything queued during this run waits for the next
+    pending = redis.llen(TRANSFER_OUTBOX_KEY)
+    if not pending:
+        return "No transfer notifications queued"
+    
+    try:
+        connection = get_connection()
+        connection.open()
+    except Exception as exc:
+        # Nothing has been taken from the outbox yet; the next run tries again
+        logger.error(f"Failed to flush transfer notifications: {exc}", exc_info=True)
+        return "SMTP connection failed"
+    
+    run_id = uuid.uuid4().hex
+    processing_key = TRANSFER_PROCESSING_KEY.format(run=run_id)
+    redis.zadd(TRANSFER_PROCESSING_RUNS_KEY, {run_id: time.time()})
+    
+    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@soundwaveaudio.com')
+    retry = []
+    sent = 0
+    dead_count = 0
+    
+    def dead_letter(raw, payload):
+        nonlocal dead_count
+        pipe = redis.pipeline()
+        pipe.rpush(TRANSFER_DEAD_LETTER_KEY, payload)
+        pipe.lrem(processing_key, 1, raw)
+        pipe.execute()
+        dead_count += 1
+    
+    # An unexpected error leaves the processing list for stale-run recovery
+    try:
+        for _ in range(pending):
+            raw = redis.lmove(TRANSFER_OUTBOX_KEY, processing_key, 'LEFT', 'RIGHT')
+            if raw is None:
+                break
+            
+            try:
+                data = json.loads(raw)
+                message = EmailMultiAlternatives(
+                    subject=data['subject'],
+                    body=data['body'],
+                    from_email=from_email,
+                    to=data['to'],
+                    connection=connection,
+                )
+            except (ValueError, KeyError, TypeError) as exc:
+                logger.error(f"Dead-lettering malformed transfer notification: {exc}")
+                dead_letter(raw, raw)
+                continue
+            
+            # Each message is sent on its own so a failure affects only that
+            # message; delivered messages are never queued again
+            try:
+                sent += message.send()
+            except Exception as exc:
+                if _is_permanent_email_error(exc):
+                    logger.error(f"Transfer notification to {data['to']} rejected: {exc}")
+                    dead_letter(raw, raw)
+                    continue
+                data['attempts'] = data.get('attempts', 0) + 1
+                if data['attempts'] >= TRANSFER_NOTIFICATION_MAX_ATTEMPTS:
+                    logger.error(
+                        f"Transfer notification to {data['to']} failed {data['attempts']} times: {exc}"
+                    )
+                    dead_letter(raw, json.dumps(data))
+                else:
+                    # Stays in the processing list until pushed back below
+                    retry.append(json.dumps(data))
+                continue
+            
+            redis.lrem(processing_key, 1, raw)
+    finally:
+        connection.close()
+    
+    # Processing now holds only the originals of the retried messages
+    pipe = redis.pipeline()
+    if retry:
+        # Back in front, ahead of anything queued since this run started
+        pipe.lpush(TRANSFER_OUTBOX_KEY, *reversed(retry))
+    pipe.delete(processing_key)
+    pipe.zrem(TRANSFER_PROCESSING_RUNS_KEY, run_id)
+    pipe.execute()
+    
+    logger.info(f"Sent {sent} transfer notifications ({len(retry)} requeued, {dead_count} dead-lettered)")
+    return f"Sent {sent} transfer notifications"
+
+
+def _recover_stale_transfer_runs(redis):
+    """Return messages held by flush runs that died mid-flush to the outbox"""
+    cutoff = time.time() - TRANSFER_PROCESSING_STALE_SECONDS
+    for run_id in redis.zrangebyscore(TRANSFER_PROCESSING_RUNS_KEY, 0, cutoff):
+        if isinstance(run_id, bytes):
+            run_id = run_id.decode()
+        processing_key = TRANSFER_PROCESSING_KEY.format(run=run_id)
+        # Newest first onto the head, so they come back in their original order
+        while redis.lmove(processing_key, TRANSFER_OUTBOX_KEY, 'RIGHT', 'LEFT') is not None:
+            pass
+        redis.zrem(TRANSFER_PROCESSING_RUNS_KEY, run_id)
+        logger.warning(f"Recovered transfer notifications from stale flush run {run_id}")
+
+
+def _is_permanent_email_error(exc):
+    """True for SMTP 5xx rejections and invalid addresses, which retrying cannot fix"""
+    if isinstance(exc, (SMTPRecipientsRefused, ValueError)):
+        return True
+    return isinstance(exc, SMTPResponseException) and 500 <= exc.smtp_code < 600
+
+
 # ============================================================================
 # STOCK COUNT TASKS
 # ============================================================================
 
-@shared_task
+@shared_task(ignore_result=True)
 def schedule_automatic_stock_counts():
     """
     Automatically schedule stock counts based on warehouse settings.
@@ -639,71 +859,82 @@ def schedule_automatic_stock_counts():
     try:
         from django.contrib.auth.models import User
         
-        warehouses = Warehouse.objects.filter(is_active=True)
-        counts_scheduled = 0
+        now = timezone.now()
+        thirty_days_ago = now - timedelta(days=30)
+        scheduled_date = now.date() + timedelta(days=7)
         
-        for warehouse in warehouses:
-            # Check if warehouse needs a cycle count (every 2 weeks)
-            last_count = StockCount.objects.filter(
-                warehouse=warehouse,
+        # Assignee for warehouses without a manager, looked up once per run
+        fallback_assignee = User.objects.filter(is_staff=True).values_list('id', flat=True).first()
+        
+        # Latest completed cycle count per warehouse, in one grouped query
+        last_counted = dict(
+            StockCount.objects.filter(
                 count_type='cycle',
                 status='completed'
-            ).order_by('-completed_at').first()
-            
-            should_schedule = False
-            
-            if not last_count:
-                should_schedule = True
-            else:
-                days_since_count = (timezone.now() - last_count.completed_at).days
-                if days_since_count >= 14:
-                    should_schedule = True
+            ).values_list('warehouse').annotate(last=Max('completed_at')).order_by()
+        )
+        
+        # Warehouses needing a cycle count (every 2 weeks)
+        new_counts = []
+        for warehouse_id, manager_id in Warehouse.objects.filter(
+            is_active=True
+        ).values_list('id', 'manager_id'):
+            last = last_counted.get(warehouse_id)
+            if last is not None and (now - last).days < 14:
+                continue
             
-            if should_schedule:
-                # Schedule cycle count for next week
-                scheduled_date = timezone.now().date() + timedelta(days=7)
-                
-                # Assign to warehouse manager
-                assigned_to = warehouse.manager if warehouse.manager else User.objects.filter(is_staff=True).first()
-                
-                if assigned_to:
-                    stock_count = StockCount.objects.create(
-                        warehouse=warehouse,
-                        count_type='cycle',
-                        scheduled_date=scheduled_date,
-                        assigned_to=assigned_to,
-                        notes='Automatically scheduled cycle count'
-                    )
-                    
-                    # Add high-value or high-movement items to count
-                    # Get top 50 products by movement in last 30 days
-                    thirty_days_ago = timezone.now() - timedelta(days=30)
-                    
-                    high_activity_products = StockMovement.objects.filter(
-                        warehouse=warehouse,
-                        created_at__gte=thirty_days_ago
-                    ).values('product').annotate(
-                        movement_count=Count('id')
-                    ).order_by('-movement_count')[:50]
-                    
-                    product_ids = [item['product'] for item in high_activity_products]
-                    
-                    warehouse_stocks = WarehouseStock.objects.filter(
-                        warehouse=warehouse,
-                        product_id__in=product_ids
-                    )
-                    
-                    for stock in warehouse_stocks:
-                        StockCountItem.objects.create(
-                            stock_count=stock_count,
-                            product=stock.product,
-                            expected_quantity=stock.quantity
-                        )
-                    
-                    counts_scheduled += 1
-                    
-                    # Send notification
-                    send_stock_count_scheduled_notification.delay(stock_count.id)
+            # Assign to warehouse manager
+            assigned_to_id = manager_id or fallback_assignee
+            if assigned_to_id:
+                new_counts.append(StockCount(
+                    count_number=StockCount.generate_count_number(),
+                    warehouse_id=warehouse_id,
+                    count_type='cycle',
+                    scheduled_date=scheduled_date,
+                    assigned_to_id=assigned_to_id,
+                    notes='Automatically scheduled cycle count'
+                ))
+        
+        if new_counts:
+            StockCount.objects.bulk_create(new_counts)
+        counts_scheduled = len(new_counts)
+        
+        # Count the top 50 products by movement in the last 30 days, for all
+        # scheduled warehouses from one grouped query
+        counts_by_warehouse = {count.warehouse_id: count for count in new_counts}
+        top_products = {warehouse_id: set() for warehouse_id in counts_by_warehouse}
+        movements = StockMovement.objects.filter(
+            warehouse_id__in=counts_by_warehouse,
+            created_at__gte=thirty_days_ago
+        ).values_list('warehouse_id', 'product_id').annotate(
+            movement_count=Count('id')
+        ).order_by('warehouse_id', '-movement_count')
+        
+        for warehouse_id, product_id, _ in movements:
+            if len(top_products[warehouse_id]) < 50:
+                top_products[warehouse_id].add(product_id)
+        
+        warehouse_stocks = WarehouseStock.objects.filter(
+            warehouse_id__in=counts_by_warehouse,
+            product_id__in=set().union(*top_products.values())
+        ).values_list('warehouse_id', 'product_id', 'quantity')
+        
+        StockCountItem.objects.bulk_create(
+            [
+                StockCountItem(
+                    stock_count=counts_by_warehouse[warehouse_id],
+                    product_id=product_id,
+                    expected_quantity=quantity
+                )
+                for warehouse_id, product_id, quantity in warehouse_stocks
+                if product_id in top_products[warehouse_id]
+            ],
+            batch_size=1000
+        )
+        
+        # Send notification
+        for stock_count in new_counts:
+            send_stock_count_scheduled_notification.delay(stock_count.id)
         
         logger.info(f"Scheduled {counts_scheduled} automatic stock counts")
         return f"Scheduled {counts_scheduled} stock counts"
@@ -713,7 +944,11 @@ def schedule_automatic_stock_counts():
         raise
 
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+# Display labels for StockCount.count_type, looked up without a model instance
+COUNT_TYPE_LABELS = dict(StockCount.COUNT_TYPES)
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=3, default_retry_delay=60)
 def send_stock_count_scheduled_notification(self, count_id):
     """
     Send notification when stock count is scheduled.
@@ -725,25 +960,32 @@ def send_stock_count_scheduled_notification(self, count_id):
         str: Success message
     """
     try:
-        stock_count = StockCount.objects.select_related(
-            'warehouse', 'assigned_to'
-        ).get(id=count_id)
-        
-        recipient_email = stock_count.assigned_to.email
-        recipient_name = stock_count.assigned_to.get_full_name() or stock_count.assigned_to.first_name
+        # One narrow row; the assigned user and warehouse are never hydrated
+        stock_count = StockCount.objects.filter(id=count_id).annotate(
+            item_count=Count('items')
+        ).values(
+            'count_number', 'count_type', 'scheduled_date', 'item_count', 'warehouse__name',
+            'assigned_to__email', 'assigned_to__first_name', 'assigned_to__last_name',
+        ).get()
+        
+        recipient_email = stock_count['assigned_to__email']
+        recipient_name = (
+            f"{stock_count['assigned_to__first_name']} {stock_count['assigned_to__last_name']}".strip()
+            or stock_count['assigned_to__first_name']
+        )
         
-        subject = f"Stock Count Scheduled: {stock_count.count_number}"
+        subject = f"Stock Count Scheduled: {stock_count['count_number']}"
         
         message = f"""
 Dear {recipient_name},
 
 A stock count has been scheduled for your attention.
 
-Count Number: {stock_count.count_number}
-Warehouse: {stock_count.warehouse.name}
-Type: {stock_count.get_count_type_display()}
-Scheduled Date: {stock_count.scheduled_date.strftime('%Y-%m-%d')}
-Items to Count: {stock_count.total_items}
+Count Number: {stock_count['count_number']}
+Warehouse: {stock_count['warehouse__name']}
+Type: {COUNT_TYPE_LABELS.get(stock_count['count_type'], stock_count['count_type'])}
+Scheduled Date: {stock_count['scheduled_date'].strftime('%Y-%m-%d')}
+Items to Count: {stock_count['item_count']}
 
 Please complete this count by the scheduled date.
 
@@ -771,7 +1013,7 @@ SoundWaveAudio Inventory System
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def analyze_stock_count_discrepancies():
     """
     Analyze completed stock counts for patterns in discrepancies.
@@ -781,54 +1023,49 @@ def analyze_stock_count_discrepancies():
         dict: Analysis results
     """
     try:
-        from customers.utils import send_mail_to_admins
-        
         # Analyze counts from last 30 days
         thirty_days_ago = timezone.now() - timedelta(days=30)
         
-        completed_counts = StockCount.objects.filter(
+        total_counts = StockCount.objects.filter(
             status='completed',
             completed_at__gte=thirty_days_ago
-        ).prefetch_related('items')
-        
-        total_counts = completed_counts.count()
-        total_items_counted = 0
-        total_discrepancies = 0
-        discrepancy_value = Decimal('0.00')
-        
-        warehouse_discrepancies = {}
-        product_discrepancies = {}
-        
-        for count in completed_counts:
-            for item in count.items.all():
-                total_items_counted += 1
-                
-                if item.has_discrepancy:
-                    total_discrepancies += 1
-                    
-                    # Calculate value of discrepancy
-                    if item.product.cost_price:
-                        discrepancy_value += abs(item.discrepancy) * item.product.cost_price
-                    
-                    # Track by warehouse
-                    warehouse_name = count.warehouse.name
-                    if warehouse_name not in warehouse_discrepancies:
-                        warehouse_discrepancies[warehouse_name] = 0
-                    warehouse_discrepancies[warehouse_name] += 1
-                    
-                    # Track by product
-                    product_key = f"{item.product.name} ({item.product.sku})"
-                    if product_key not in product_discrepancies:
-                        product_discrepancies[product_key] = 0
-                    product_discrepancies[product_key] += 1
+        ).count()
+        
+        # All reductions run in SQL; only the top-N rows come back
+        counted_items = StockCountItem.objects.filter(
+            stock_count__status='completed',
+            stock_count__completed_at__gte=thirty_days_ago
+        )
+        discrepancy_items = counted_items.filter(has_discrepancy=True)
+        
+        totals = counted_items.aggregate(
+            items=Count('id'),
+            discrepancies=Count('id', filter=Q(has_discrepancy=True)),
+            value=Sum(
+                Abs('discrepancy') * F('product__cost_price'),
+                filter=Q(has_discrepancy=True)
+            ),
+        )
+        total_items_counted = totals['items']
+        total_discrepancies = totals['discrepancies']
+        discrepancy_value = totals['value'] or Decimal('0.00')
+        
+        top_warehouses = [
+            (row['stock_count__warehouse__name'], row['n'])
+            for row in discrepancy_items.values(
+                'stock_count__warehouse__name'
+            ).annotate(n=Count('id')).order_by('-n')[:5]
+        ]
+        top_products = [
+            (f"{row['product__name']} ({row['product__sku']})", row['n'])
+            for row in discrepancy_items.values(
+                'product__name', 'product__sku'
+            ).annotate(n=Count('id')).order_by('-n')[:10]
+        ]
         
         # Calculate accuracy rate
         accuracy_rate = ((total_items_counted - total_discrepancies) / total_items_counted * 100) if total_items_counted > 0 else 100
         
-        # Find top problem areas
-        top_warehouses = sorted(warehouse_discrepancies.items(), key=lambda x: x[1], reverse=True)[:5]
-        top_products = sorted(product_discrepancies.items(), key=lambda x: x[1], reverse=True)[:10]
-        
         # Send report
         subject = f"📋 Stock Count Analysis - {accuracy_rate:.1f}% Accuracy"
         
@@ -843,10 +1080,10 @@ Summary:
   • Discrepancy Value: KSh {discrepancy_value:,.2f}
 
 Warehouses with Most Discrepancies:
-{chr(10).join(f"  {i+1}. {wh}: {count} discrepancies" for i, (wh, count) in enumerate(top_warehouses)) if top_warehouses else "  None"}
+{NL.join(f"  {i+1}. {wh}: {count} discrepancies" for i, (wh, count) in enumerate(top_warehouses)) if top_warehouses else "  None"}
 
 Products with Most Discrepancies:
-{chr(10).join(f"  {i+1}. {prod}: {count} times" for i, (prod, count) in enumerate(top_products)) if top_products else "  None"}
+{NL.join(f"  {i+1}. {prod}: {count} times" for i, (prod, count) in enumerate(top_products)) if top_products else "  None"}
 
 Recommendations:
   • Review counting procedures at problematic warehouses
@@ -890,97 +1127,77 @@ def generate_inventory_valuation_report():
         dict: Valuation report data
     """
     try:
-        from customers.utils import send_mail_to_admins
-        
         today = timezone.now().date()
         
-        # Calculate inventory value by warehouse
-        warehouses = Warehouse.objects.filter(is_active=True)
-        warehouse_valuations = []
-        total_inventory_value = Decimal('0.00')
-        total_units = 0
+        # Value and units per warehouse and per category are summed in SQL;
+        # stock rows without a cost price add units but no value
+        stock_value = Sum(
+            F('quantity') * F('product__cost_price'),
+            output_field=DecimalField(max_digits=14, decimal_places=2)
+        )
         
-        for warehouse in warehouses:
-            stocks = WarehouseStock.objects.filter(
-                warehouse=warehouse
-            ).select_related('product')
-            
-            warehouse_value = Decimal('0.00')
-            warehouse_units = 0
-            
-            for stock in stocks:
-                if stock.product.cost_price:
-                    warehouse_value += stock.quantity * stock.product.cost_price
-                warehouse_units += stock.quantity
-            
-            warehouse_valuations.append({
+        warehouse_valuations = [
+            {
                 'warehouse': warehouse.name,
-                'value': warehouse_value,
-                'units': warehouse_units,
+                'value': warehouse.value,
+                'units': warehouse.units,
                 'capacity_usage': warehouse.capacity_percentage
-            })
-            
-            total_inventory_value += warehouse_value
-            total_units += warehouse_units
-        
-        # Calculate by category
-        category_valuations = []
-        
-        from products.models import Category
-        categories = Category.objects.all()
-        
-        for category in categories:
-            category_value = Decimal('0.00')
-            category_units = 0
-            
-            stocks = WarehouseStock.objects.filter(
-                product__category=category
-            ).select_related('product')
-            
-            for stock in stocks:
-                if stock.product.cost_price:
-                    category_value += stock.quantity * stock.product.cost_price
-                category_units += stock.quantity
-            
-            if category_value > 0:
-                category_valuations.append({
-                    'category': category.name,
-                    'value': category_value,
-                    'units': category_units
-                })
-        
-        # Sort by value
-        category_valuations.sort(key=lambda x: x['value'], reverse=True)
-        
-        # Calculate aging (slow-moving inventory)
-        thirty_days_ago = timezone.now() - timedelta(days=30)
+            }
+            for warehouse in Warehouse.objects.filter(is_active=True).only(
+                'name', 'max_capacity', 'current_capacity'
+            ).annotate(
+                value=Coalesce(
+                    Sum(
+                        F('stock__quantity') * F('stock__product__cost_price'),
+                        output_field=DecimalField(max_digits=14, decimal_places=2)
+                    ),
+                    Value(Decimal('0.00'))
+                ),
+                units=Coalesce(Sum('stock__quantity'), 0)
+            )
+        ]
+        total_inventory_value = sum((wh['value'] for wh in warehouse_valuations), Decimal('0.00'))
+        total_units = sum(wh['units'] for wh in warehouse_valuations)
+        
+        # Top categories by value
+        category_valuations = [
+            {'category': row['product__category__name'], 'value': row['value'], 'units': row['units']}
+            for row in WarehouseStock.objects.filter(
+                product__category__isnull=False
+            ).values(
+                'product__category_id', 'product__category__name'
+            ).annotate(
+                value=stock_value,
+                units=Sum('quantity')
+            ).filter(
+                value__gt=0
+            ).order_by('-value')[:5]
+        ]
+        
+        # Calculate aging: stocked products with no order in the last 90 days,
+        # as a NOT EXISTS rather than a DISTINCT over the order-item join
         ninety_days_ago = timezone.now() - timedelta(days=90)
         
         slow_moving = WarehouseStock.objects.filter(
-            product__orderitem__order__created_at__lt=ninety_days_ago
-        ).distinct().count()
+            quantity__gt=0
+        ).exclude(
+            Exists(OrderItem.objects.filter(
+                product=OuterRef('product_id'),
+                order__created_at__gte=ninety_days_ago
+            ))
+        ).values('product_id').distinct().count()
         
         # Send report
         subject = f"💰 Inventory Valuation Report - {today}"
         
-        message = f"""
-Daily Inventory Valuation Report for {today}
-
-TOTAL INVENTORY VALUE: KSh {total_inventory_value:,.2f}
-Total Units: {total_units:,}
-
-By Warehouse:
-{chr(10).join(f"  • {wh['warehouse']}: KSh {wh['value']:,.2f} ({wh['units']:,} units, {wh['capacity_usage']:.1f}% capacity)" for wh in warehouse_valuations)}
-
-Top 5 Categories by Value:
-{chr(10).join(f"  {i+1}. {cat['category']}: KSh {cat['value']:,.2f} ({cat['units']:,} units)" for i, cat in enumerate(category_valuations[:5]))}
-
-Inventory Health:
-  • Slow-Moving Items (>90 days): {slow_moving}
-  
-Best regards,
-SoundWaveAudio Inventory Analytics
-"""
+        message = render_to_string('emails/inventory/valuation_report.txt', {
+            'today': today,
+            'total_value': total_inventory_value,
+            'total_units': total_units,
+            'warehouses': warehouse_valuations,
+            'categories': category_valuations[:5],
+            'slow_moving': slow_moving,
+        })
         
         send_mail_to_admins(subject, message)
         
@@ -1001,6 +1218,10 @@ SoundWaveAudio Inventory Analytics
         raise
 
 
+# Urgency label for each reorder priority computed in SQL
+REORDER_URGENCY = {1: 'CRITICAL', 2: 'HIGH', 3: 'MEDIUM', 4: 'LOW'}
+
+
 @shared_task
 def generate_reorder_recommendations():
     """
@@ -1012,112 +1233,102 @@ def generate_reorder_recommendations():
         dict: Reorder recommendations
     """
     try:
-        from customers.utils import send_mail_to_admins
-        
-        # Get products that need reordering
+        # Sales over the last 30 days for each stock row
+        thirty_days_ago = timezone.now() - timedelta(days=30)
+        recent_sales = StockMovement.objects.filter(
+            product=OuterRef('product_id'),
+            warehouse=OuterRef('warehouse_id'),
+            movement_type='sale',
+            created_at__gte=thirty_days_ago
+        ).order_by().values('product').annotate(total=Sum('quantity')).values('total')
+        
+        # Products that need reordering, with sales rate, days of stock left and
+        # urgency computed in SQL and returned most urgent first
         reorder_needed = WarehouseStock.objects.filter(
             warehouse__is_active=True,
             quantity__lte=F('reorder_point'),
             reorder_quantity__gt=0
-        ).select_related('warehouse', 'product', 'product__brand', 'product__category')
+        ).select_related('warehouse', 'product', 'product__brand').only(
+            'quantity', 'reserved_quantity', 'damaged_quantity', 'reorder_point', 'reorder_quantity',
+            'warehouse__name', 'product__name', 'product__sku', 'product__cost_price',
+            'product__brand__name',
+        ).annotate(
+            sold_30d=Abs(Coalesce(Subquery(recent_sales), 0)),
+            available=Greatest(F('quantity') - F('reserved_quantity') - F('damaged_quantity'), 0),
+        ).annotate(
+            # Float division, as before; only shown and used for days_remaining
+            daily_sales_rate=ExpressionWrapper(
+                Cast('sold_30d', FloatField()) / Value(30.0),
+                output_field=FloatField()
+            ),
+        ).annotate(
+            days_remaining=Case(
+                When(sold_30d__gt=0, then=ExpressionWrapper(
+                    F('available') / F('daily_sales_rate'), output_field=FloatField()
+                )),
+                default=Value(999.0),  # No recent sales
+                output_field=FloatField(),
+            ),
+        ).annotate(
+            priority=Case(
+                When(days_remaining__lt=7, then=Value(1)),
+                When(days_remaining__lt=14, then=Value(2)),
+                When(days_remaining__lt=30, then=Value(3)),
+                default=Value(4),
+            ),
+            # 30 days of sales (daily rate * 30 is just the 30-day total) plus
+            # safety stock, never below the reorder quantity. Kept in integers
+            # so no rounding can drop a unit
+            recommended_qty=Case(
+                When(sold_30d__gt=0, then=Greatest(
+                    F('sold_30d') + F('reorder_point'), F('reorder_quantity')
+                )),
+                default=F('reorder_quantity'),
+            ),
+        ).annotate(
+            order_cost=Coalesce(
+                ExpressionWrapper(
+                    F('recommended_qty') * F('product__cost_price'),
+                    output_field=DecimalField(max_digits=14, decimal_places=2)
+                ),
+                Value(Decimal('0.00'))
+            ),
+        ).order_by('priority', 'days_remaining')
         
         recommendations = []
         total_reorder_cost = Decimal('0.00')
         
         for stock in reorder_needed:
-            # Calculate daily sales rate (last 30 days)
-            thirty_days_ago = timezone.now() - timedelta(days=30)
-            
-            recent_sales = StockMovement.objects.filter(
-                warehouse=stock.warehouse,
-                product=stock.product,
-                movement_type='sale',
-                created_at__gte=thirty_days_ago
-            ).aggregate(total_sold=Sum('quantity'))['total_sold'] or 0
-            
-            daily_sales_rate = abs(recent_sales) / 30.0 if recent_sales else 0
-            
-            # Calculate days of stock remaining
-            if daily_sales_rate > 0:
-                days_remaining = stock.available_quantity / daily_sales_rate
-            else:
-                days_remaining = 999  # No recent sales
-            
-            # Calculate recommended order quantity
-            # Order enough for 30 days + safety stock
-            if daily_sales_rate > 0:
-                recommended_qty = int((daily_sales_rate * 30) + stock.reorder_point)
-            else:
-                recommended_qty = stock.reorder_quantity
-            
-            # Ensure minimum reorder quantity
-            recommended_qty = max(recommended_qty, stock.reorder_quantity)
-            
-            # Calculate cost
-            if stock.product.cost_price:
-                order_cost = recommended_qty * stock.product.cost_price
-                total_reorder_cost += order_cost
-            else:
-                order_cost = Decimal('0.00')
-            
-            # Determine urgency
-            if days_remaining < 7:
-                urgency = 'CRITICAL'
-                priority = 1
-            elif days_remaining < 14:
-                urgency = 'HIGH'
-                priority = 2
-            elif days_remaining < 30:
-                urgency = 'MEDIUM'
-                priority = 3
-            else:
-                urgency = 'LOW'
-                priority = 4
-            
+            total_reorder_cost += stock.order_cost
             recommendations.append({
                 'warehouse': stock.warehouse.name,
                 'product': stock.product.name,
                 'sku': stock.product.sku,
                 'brand': stock.product.brand.name if stock.product.brand else 'N/A',
                 'current_stock': stock.quantity,
-                'available': stock.available_quantity,
-                'daily_sales_rate': round(daily_sales_rate, 2),
-                'days_remaining': round(days_remaining, 1),
-                'recommended_qty': recommended_qty,
-                'order_cost': float(order_cost),
-                'urgency': urgency,
-                'priority': priority
+                'available': stock.available,
+                'daily_sales_rate': round(stock.daily_sales_rate, 2),
+                'days_remaining': round(stock.days_remaining, 1),
+                'recommended_qty': stock.recommended_qty,
+                'order_cost': float(stock.order_cost),
+                'urgency': REORDER_URGENCY[stock.priority],
+                'priority': stock.priority
             })
         
-        # Sort by priority
-        recommendations.sort(key=lambda x: (x['priority'], x['days_remaining']))
-        
         # Send report
         critical = [r for r in recommendations if r['urgency'] == 'CRITICAL']
         high = [r for r in recommendations if r['urgency'] == 'HIGH']
         
         subject = f"📦 Reorder Recommendations - {len(critical)} Critical"
         
-        message = f"""
-Inventory Reorder Recommendations
-
-TOTAL REORDER COST: KSh {total_reorder_cost:,.2f}
-Total Items Needing Reorder: {len(recommendations)}
-
-CRITICAL (< 7 days stock):
-{chr(10).join(f"  • {r['product']} ({r['sku']}) at {r['warehouse']}: {r['available']} units ({r['days_remaining']:.1f} days left) - Order {r['recommended_qty']} units (KSh {r['order_cost']:,.2f})" for r in critical[:10]) if critical else "  None"}
-
-HIGH (7-14 days stock):
-{chr(10).join(f"  • {r['product']} ({r['sku']}) at {r['warehouse']}: {r['available']} units ({r['days_remaining']:.1f} days left) - Order {r['recommended_qty']} units (KSh {r['order_cost']:,.2f})" for r in high[:10]) if high else "  None"}
-
-MEDIUM Priority: {len([r for r in recommendations if r['urgency'] == 'MEDIUM'])}
-LOW Priority: {len([r for r in recommendations if r['urgency'] == 'LOW'])}
-
-Please review and place orders accordingly.
-
-Best regards,
-SoundWaveAudio Procurement System
-"""
+        message = render_to_string('emails/inventory/reorder_recommendations.txt', {
+            'total_cost': total_reorder_cost,
+            'total_items': len(recommendations),
+            'critical': critical[:10],
+            'high': high[:10],
+            'medium_count': sum(1 for r in recommendations if r['urgency'] == 'MEDIUM'),
+            'low_count': sum(1 for r in recommendations if r['urgency'] == 'LOW'),
+        })
         
         send_mail_to_admins(subject, message)
         
@@ -1137,6 +1348,66 @@ SoundWaveAudio Procurement System
         raise
 
 
+# Rows kept per turnover bucket
+TURNOVER_TOP_N = 20
+
+# Per-product stock and 90-day sales for products stocked in an active
+# warehouse, classified as slow (>180 days to sell), fast (<30 days) or
+# none (no sales). Each bucket is ranked and counted with window functions
+# so only the top rows come back. Table names are filled in from _meta.
+TURNOVER_SQL = """
+WITH stocked AS (
+    SELECT ws.product_id, SUM(ws.quantity) AS stock
+    FROM {stock} ws
+    WHERE ws.product_id IN (
+        SELECT s.product_id FROM {stock} s
+        JOIN {warehouse} w ON w.id = s.warehouse_id
+        WHERE w.is_active AND s.quantity > 0
+    )
+    GROUP BY ws.product_id
+),
+sold AS (
+    SELECT product_id, ABS(SUM(quantity)) AS sold
+    FROM {movement}
+    WHERE movement_type = 'sale' AND created_at >= %s
+    GROUP BY product_id
+),
+turnover AS (
+    SELECT st.product_id, st.stock, COALESCE(so.sold, 0) AS sold,
+           90.0 * st.stock / NULLIF(so.sold, 0) AS days_to_sell
+    FROM stocked st
+    LEFT JOIN sold so ON so.product_id = st.product_id
+    WHERE st.stock > 0
+),
+ranked AS (
+    SELECT b.*, t.bucket,
+           COUNT(*) OVER (PARTITION BY t.bucket) AS bucket_size,
+           ROW_NUMBER() OVER (
+               PARTITION BY t.bucket
+               ORDER BY CASE t.bucket
+                   WHEN 'slow' THEN b.days_to_sell
+                   WHEN 'fast' THEN -b.days_to_sell
+                   ELSE b.stock
+               END DESC
+           ) AS rn
+    FROM turnover b
+    CROSS JOIN LATERAL (
+        SELECT CASE
+            WHEN b.sold = 0 THEN 'none'
+            WHEN b.days_to_sell > 180 THEN 'slow'
+            WHEN b.days_to_sell < 30 THEN 'fast'
+        END AS bucket
+    ) t
+    WHERE t.bucket IS NOT NULL
+)
+SELECT r.bucket, r.bucket_size, p.name, p.sku, r.stock, r.sold, r.days_to_sell
+FROM ranked r
+JOIN {product} p ON p.id = r.product_id
+WHERE r.rn <= %s
+ORDER BY r.bucket, r.rn
+"""
+
+
 @shared_task
 def analyze_stock_turnover():
     """
@@ -1147,113 +1418,66 @@ def analyze_stock_turnover():
         dict: Turnover analysis
     """
     try:
-        from customers.utils import send_mail_to_admins
-        
         # Calculate turnover for last 90 days
         ninety_days_ago = timezone.now() - timedelta(days=90)
         
-        products_with_stock = WarehouseStock.objects.filter(
-            warehouse__is_active=True,
-            quantity__gt=0
-        ).values('product').distinct()
+        with db_connection.cursor() as cursor:
+            cursor.execute(
+                TURNOVER_SQL.format(
+                    stock=WarehouseStock._meta.db_table,
+                    warehouse=Warehouse._meta.db_table,
+                    movement=StockMovement._meta.db_table,
+                    product=Product._meta.db_table,
+                ),
+                [ninety_days_ago, TURNOVER_TOP_N]
+            )
+            rows = cursor.fetchall()
         
+        bucket_counts = {'slow': 0, 'fast': 0, 'none': 0}
         slow_movers = []
         fast_movers = []
         no_movement = []
         
-        for item in products_with_stock:
-            product_id = item['product']
-            
-            try:
-                product = Product.objects.get(id=product_id)
-            except Product.DoesNotExist:
+        for bucket, bucket_size, name, sku, stock, sold, days_to_sell in rows:
+            bucket_counts[bucket] = bucket_size
+            if bucket == 'none':
+                no_movement.append({'product': name, 'sku': sku, 'stock': stock})
                 continue
             
-            # Calculate total sold in period
-            total_sold = StockMovement.objects.filter(
-                product=product,
-                movement_type='sale',
-                created_at__gte=ninety_days_ago
-            ).aggregate(total=Sum('quantity'))['total'] or 0
-            
-            total_sold = abs(total_sold)
-            
-            # Get average inventory
-            avg_inventory = WarehouseStock.objects.filter(
-                product=product
-            ).aggregate(total=Sum('quantity'))['total'] or 0
-            
-            # Calculate turnover rate
-            if avg_inventory > 0 and total_sold > 0:
-                turnover_rate = total_sold / avg_inventory
-                days_to_sell = 90 / turnover_rate if turnover_rate > 0 else 999
-                
-                if days_to_sell > 180:  # Taking >6 months to sell
-                    slow_movers.append({
-                        'product': product.name,
-                        'sku': product.sku,
-                        'stock': avg_inventory,
-                        'sold_90d': total_sold,
-                        'turnover_rate': round(turnover_rate, 2),
-                        'days_to_sell': round(days_to_sell, 1)
-                    })
-                elif days_to_sell < 30:  # Selling in <30 days
-                    fast_movers.append({
-                        'product': product.name,
-                        'sku': product.sku,
-                        'stock': avg_inventory,
-                        'sold_90d': total_sold,
-                        'turnover_rate': round(turnover_rate, 2),
-                        'days_to_sell': round(days_to_sell, 1)
-                    })
-            elif avg_inventory > 0 and total_sold == 0:
-                no_movement.append({
-                    'product': product.name,
-                    'sku': product.sku,
-                    'stock': avg_inventory
-                })
-        
-        # Sort
-        slow_movers.sort(key=lambda x: x['days_to_sell'], reverse=True)
-        fast_movers.sort(key=lambda x: x['turnover_rate'], reverse=True)
+            item = {
+                'product': name,
+                'sku': sku,
+                'stock': stock,
+                'sold_90d': sold,
+                'turnover_rate': round(sold / stock, 2),
+                'days_to_sell': round(float(days_to_sell), 1)
+            }
+            (slow_movers if bucket == 'slow' else fast_movers).append(item)
         
         # Send report
-        subject = f"📊 Inventory Turnover Analysis - {len(slow_movers)} Slow Movers"
+        subject = f"📊 Inventory Turnover Analysis - {bucket_counts['slow']} Slow Movers"
         
-        message = f"""
-Inventory Turnover Analysis (Last 90 Days)
-
-SLOW MOVERS (>180 days to sell) - {len(slow_movers)} items:
-{chr(10).join(f"  • {item['product']} ({item['sku']}): {item['stock']} units in stock, {item['sold_90d']} sold, {item['days_to_sell']:.0f} days to sell" for item in slow_movers[:15])}
-
-NO MOVEMENT (0 sales) - {len(no_movement)} items:
-{chr(10).join(f"  • {item['product']} ({item['sku']}): {item['stock']} units sitting idle" for item in no_movement[:10])}
-
-FAST MOVERS (<30 days to sell) - {len(fast_movers)} items:
-{chr(10).join(f"  • {item['product']} ({item['sku']}): Turnover {item['turnover_rate']}x, {item['days_to_sell']:.0f} days to sell" for item in fast_movers[:10])}
-
-Recommendations:
-  • Consider promotions/discounts for slow movers
-  • Review pricing for items with no movement
-  • Increase stock levels for fast movers
-  • Discontinue products with consistent no movement
-
-Best regards,
-SoundWaveAudio Inventory Analytics
-"""
+        message = render_to_string('emails/inventory/stock_turnover.txt', {
+            'slow_count': bucket_counts['slow'],
+            'no_movement_count': bucket_counts['none'],
+            'fast_count': bucket_counts['fast'],
+            'slow_movers': slow_movers[:15],
+            'no_movement': no_movement[:10],
+            'fast_movers': fast_movers[:10],
+        })
         
         send_mail_to_admins(subject, message)
         
         analysis_data = {
-            'slow_movers_count': len(slow_movers),
-            'no_movement_count': len(no_movement),
-            'fast_movers_count': len(fast_movers),
-            'slow_movers': slow_movers[:20],
-            'no_movement': no_movement[:20],
+            'slow_movers_count': bucket_counts['slow'],
+            'no_movement_count': bucket_counts['none'],
+            'fast_movers_count': bucket_counts['fast'],
+            'slow_movers': slow_movers,
+            'no_movement': no_movement,
             'fast_movers': fast_movers[:10]
         }
         
-        logger.info(f"Turnover analysis complete: {len(slow_movers)} slow movers found")
+        logger.info(f"Turnover analysis complete: {bucket_counts['slow']} slow movers found")
         return analysis_data
     
     except Exception as exc:
@@ -1275,88 +1499,80 @@ def detect_suspicious_movements():
         dict: Suspicious movements found
     """
     try:
-        from customers.utils import send_mail_to_admins
-        
         # Check movements from last 24 hours
         yesterday = timezone.now() - timedelta(hours=24)
         
+        # Adjustments per product/warehouse over the same window, counted
+        # alongside each row instead of with a query per movement
         recent_movements = StockMovement.objects.filter(
             created_at__gte=yesterday
-        ).select_related('warehouse', 'product', 'created_by')
+        ).select_related('warehouse', 'product', 'created_by').only(
+            'movement_number', 'movement_type', 'quantity', 'created_at', 'approved_by',
+            'warehouse__name', 'product__name', 'product__sku', 'product__cost_price',
+            'created_by__first_name', 'created_by__last_name',
+        ).annotate(
+            adjustment_count=Window(
+                expression=Count('id', filter=Q(movement_type='adjustment')),
+                partition_by=[F('product_id'), F('warehouse_id')]
+            )
+        )
         
         suspicious = []
         
-        for movement in recent_movements:
+        high_value_threshold = Decimal('10000')  # KSh
+        
+        for movement in recent_movements.iterator(chunk_size=STOCK_MONITOR_CHUNK_SIZE):
             flags = []
+            movement_type = movement.movement_type
+            quantity = abs(movement.quantity)
+            product = movement.product
+            created_at = movement.created_at
             
             # Flag 1: Large quantity adjustments
-            if movement.movement_type == 'adjustment' and abs(movement.quantity) > 50:
-                flags.append(f"Large adjustment: {abs(movement.quantity)} units")
+            if movement_type == 'adjustment' and quantity > 50:
+                flags.append(f"Large adjustment: {quantity} units")
             
             # Flag 2: Multiple adjustments on same product
-            same_product_adjustments = StockMovement.objects.filter(
-                product=movement.product,
-                warehouse=movement.warehouse,
-                movement_type='adjustment',
-                created_at__gte=yesterday
-            ).count()
-            
-            if same_product_adjustments > 3:
-                flags.append(f"Multiple adjustments: {same_product_adjustments} times")
+            if movement.adjustment_count > 3:
+                flags.append(f"Multiple adjustments: {movement.adjustment_count} times")
             
             # Flag 3: Writeoff without approval
-            if movement.movement_type == 'writeoff' and not movement.approved_by:
+            if movement_type == 'writeoff' and not movement.approved_by_id:
                 flags.append("Writeoff without approval")
             
             # Flag 4: Lost/damaged with high value
-            if movement.movement_type in ['lost', 'damaged']:
-                if movement.product.cost_price:
-                    value = abs(movement.quantity) * movement.product.cost_price
-                    if value > 10000:  # >10,000 KSh
+            if movement_type in ('lost', 'damaged'):
+                cost_price = product.cost_price
+                if cost_price:
+                    value = quantity * cost_price
+                    if value > high_value_threshold:
                         flags.append(f"High value loss: KSh {value:,.2f}")
             
             # Flag 5: After-hours movements
-            movement_hour = movement.created_at.hour
+            movement_hour = created_at.hour
             if movement_hour < 6 or movement_hour > 22:
-                flags.append(f"After-hours activity: {movement.created_at.strftime('%H:%M')}")
+                flags.append(f"After-hours activity: {created_at.strftime('%H:%M')}")
             
             if flags:
                 suspicious.append({
                     'movement_number': movement.movement_number,
                     'warehouse': movement.warehouse.name if movement.warehouse else 'N/A',
-                    'product': movement.product.name,
-                    'sku': movement.product.sku,
+                    'product': product.name,
+                    'sku': product.sku,
                     'type': movement.get_movement_type_display(),
                     'quantity': movement.quantity,
                     'created_by': movement.created_by.get_full_name() if movement.created_by else 'Unknown',
-                    'created_at': movement.created_at.strftime('%Y-%m-%d %H:%M'),
+                    'created_at': created_at.strftime('%Y-%m-%d %H:%M'),
                     'flags': flags
                 })
         
         if suspicious:
             subject = f"🚨 Suspicious Inventory Movements - {len(suspicious)} Flagged"
             
-            message = f"""
-Suspicious Inventory Movement Alert
-
-{len(suspicious)} movements have been flagged for review:
-
-{chr(10).join(f'''
-Movement: {item['movement_number']}
-Product: {item['product']} ({item['sku']})
-Warehouse: {item['warehouse']}
-Type: {item['type']}
-Quantity: {item['quantity']}
-User: {item['created_by']}
-Time: {item['created_at']}
-Flags: {', '.join(item['flags'])}
----''' for item in suspicious[:20])}
-
-Please investigate these movements immediately.
-
-Best regards,
-SoundWaveAudio Security System
-"""
+            message = render_to_string('emails/inventory/suspicious_movements.txt', {
+                'suspicious_count': len(suspicious),
+                'movements': suspicious[:20],
+            })
             
             send_mail_to_admins(subject, message)
         
@@ -1378,8 +1594,6 @@ def generate_movement_audit_report():
         dict: Audit report data
     """
     try:
-        from customers.utils import send_mail_to_admins
-        
         # Analyze movements from last 7 days
         seven_days_ago = timezone.now() - timedelta(days=7)
         
@@ -1416,48 +1630,33 @@ def generate_movement_audit_report():
             movement_count=Count('id')
         ).order_by('-movement_count')[:10]
         
-        # Cost tracking
-        movements_with_cost = movements.exclude(total_cost__isnull=True)
-        total_value_moved = movements_with_cost.aggregate(
-            total=Sum('total_cost')
-        )['total'] or Decimal('0.00')
+        # Movement count and cost tracking in one pass (SUM skips NULL costs)
+        totals = movements.aggregate(count=Count('id'), total=Sum('total_cost'))
+        total_movements = totals['count']
+        total_value_moved = totals['total'] or Decimal('0.00')
         
         subject = f"📋 Weekly Movement Audit Report"
         
-        message = f"""
-Inventory Movement Audit Report (Last 7 Days)
-
-SUMMARY:
-  • Total Movements: {movements.count()}
-  • Total Value Tracked: KSh {total_value_moved:,.2f}
-
-By Movement Type:
-{chr(10).join(f"  • {item['movement_type']}: {item['count']} movements" for item in by_type)}
-
-By Warehouse:
-{chr(10).join(f"  • {item['warehouse__name'] or 'N/A'}: {item['count']} movements" for item in by_warehouse)}
-
-Top 10 Most Active Products:
-{chr(10).join(f"  {i+1}. {item['product__name']} ({item['product__sku']}): {item['movement_count']} movements" for i, item in enumerate(active_products))}
-
-Top 10 Users by Activity:
-{chr(10).join(f"  {i+1}. {item['created_by__first_name']} {item['created_by__last_name']}: {item['count']} movements" for i, item in enumerate(by_user))}
-
-Best regards,
-SoundWaveAudio Audit System
-"""
+        message = render_to_string('emails/inventory/movement_audit.txt', {
+            'total_movements': total_movements,
+            'total_value': total_value_moved,
+            'by_type': by_type,
+            'by_warehouse': by_warehouse,
+            'active_products': active_products,
+            'by_user': by_user,
+        })
         
         send_mail_to_admins(subject, message)
         
         report_data = {
-            'total_movements': movements.count(),
+            'total_movements': total_movements,
             'total_value': float(total_value_moved),
             'by_type': list(by_type),
             'by_warehouse': list(by_warehouse),
             'active_products': list(active_products)
         }
         
-        logger.info(f"Movement audit report generated: {movements.count()} movements")
+        logger.info(f"Movement audit report generated: {total_movements} movements")
         return report_data
     
     except Exception as exc:
@@ -1481,13 +1680,12 @@ def cleanup_old_resolved_alerts():
     try:
         ninety_days_ago = timezone.now() - timedelta(days=90)
         
-        old_alerts = StockAlert.objects.filter(
+        # Nothing cascades from StockAlert and it has no delete signals, so
+        # this is a single fast DELETE; its row count is the cleanup total
+        deleted_count, _ = StockAlert.objects.filter(
             is_resolved=True,
             resolved_at__lt=ninety_days_ago
-        )
-        
-        deleted_count = old_alerts.count()
-        old_alerts.delete()
+        ).delete()
         
         logger.info(f"Cleaned up {deleted_count} old resolved alerts")
         return f"Cleaned up {deleted_count} old alerts"
@@ -1507,19 +1705,36 @@ def sync_product_stock_from_warehouses():
         str: Success message with count
     """
     try:
-        products = Product.objects.all()
-        updated_count = 0
-        
-        for product in products:
-            # Calculate total across all warehouses
-            total_stock = WarehouseStock.objects.filter(
-                product=product
-            ).aggregate(total=Sum('quantity'))['total'] or 0
+        # Totals across all warehouses, one grouped query
+        totals = dict(
+            WarehouseStock.objects.values('product_id').annotate(
+                total=Sum('quantity')
+            ).values_list('product_id', 'total')
+        )
+        
+        stale_ids = [
+            product_id
+            for product_id, stock_quantity in Product.objects.values_list(
+                'id', 'stock_quantity'
+            ).iterator(chunk_size=2000)
+            if stock_quantity != totals.get(product_id, 0)
+        ]
+        
+        # Only the out-of-sync rows are locked, in one transaction; rows another
+        # worker holds are skipped and picked up on the next run
+        with transaction.atomic():
+            to_update = list(
+                Product.objects.select_for_update(skip_locked=True).filter(
+                    id__in=stale_ids
+                ).only('id', 'stock_quantity')
+            )
+            for product in to_update:
+                product.stock_quantity = totals.get(product.id, 0)
             
-            if product.stock_quantity != total_stock:
-                product.stock_quantity = total_stock
-                product.save(update_fields=['stock_quantity'])
-                updated_count += 1
+            # bulk_update skips Product signals, so warehouse totals are not
+            # redistributed back onto the warehouses they came from
+            Product.objects.bulk_update(to_update, ['stock_quantity'], batch_size=1000)
+        updated_count = len(to_update)
         
         logger.info(f"Synced stock for {updated_count} products")
         return f"Synced {updated_count} products"
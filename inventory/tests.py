@@ -1,7 +1,28 @@
-from django.test import TestCase
-from inventory.models import Warehouse, WarehouseStock, StockAlert
-from products.models import Product
+from django.test import TestCase, TransactionTestCase
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from inventory.models import (
+    Warehouse, WarehouseStock, StockAlert, StockMovement, InventoryTransfer, TransferItem,
+    StockCount, StockCountItem
+)
+from inventory.tasks import (
+    TRANSFER_DEAD_LETTER_KEY, TRANSFER_NOTIFICATION_MAX_ATTEMPTS, TRANSFER_OUTBOX_KEY,
+    TRANSFER_PROCESSING_RUNS_KEY, TRANSFER_PROCESSING_STALE_SECONDS,
+)
+from products.models import Brand, Category, Product
+from customers.models import Address
+from orders.models import Order, OrderItem
 from django.contrib.auth.models import User
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from smtplib import SMTPRecipientsRefused, SMTPServerDisconnected
+from unittest.mock import patch
+import json
 
 class SignalTests(TestCase):
     def test_low_stock_alert_signal(self):
@@ -37,4 +58,938 @@ class SignalTests(TestCase):
         
         self.assertIsNotNone(alert)
         self.assertEqual(alert.current_quantity, 5)
-        self.assertEqual(alert.threshold_quantity, 10)
\ No newline at end of file
+        self.assertEqual(alert.threshold_quantity, 10)
+
+
+class FakeRedis:
+    """In-memory stand-in for the list and sorted-set commands the transfer outbox uses"""
+    
+    def __init__(self):
+        self.lists = defaultdict(list)
+        self.zsets = defaultdict(dict)
+    
+    def rpush(self, key, *values):
+        self.lists[key].extend(values)
+        return len(self.lists[key])
+    
+    def lpush(self, key, *values):
+        for value in values:
+            self.lists[key].insert(0, value)
+        return len(self.lists[key])
+    
+    def llen(self, key):
+        return len(self.lists[key])
+    
+    def lmove(self, source, destination, wherefrom, whereto):
+        if not self.lists[source]:
+            return None
+        value = self.lists[source].pop(0 if wherefrom == 'LEFT' else -1)
+        if whereto == 'LEFT':
+            self.lists[destination].insert(0, value)
+        else:
+            self.lists[destination].append(value)
+        return value
+    
+    def lrem(self, key, count, value):
+        removed = 0
+        while removed < count and value in self.lists[key]:
+            self.lists[key].remove(value)
+            removed += 1
+        return removed
+    
+    def delete(self, key):
+        return int(self.lists.pop(key, None) is not None)
+    
+    def zadd(self, key, mapping):
+        self.zsets[key].update(mapping)
+    
+    def zrangebyscore(self, key, low, high):
+        return [member for member, score in self.zsets[key].items() if low <= score <= high]
+    
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets[key].pop(member, None)
+    
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+    
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, args))
+        return queue
+    
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, args in self.commands]
+
+
+class InventoryTestMixin:
+    """Shared warehouse/product fixtures"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='inventorymanager',
+            email='manager@example.com',
+            password='testpass123'
+        )
+        self.warehouse = Warehouse.objects.create(name='Main Warehouse', code='MAIN', manager=self.user)
+        self.category = Category.objects.create(name='Speakers')
+        self.brand = Brand.objects.create(name='SoundWave')
+    
+    def make_product(self, sku):
+        return Product.objects.create(
+            name=f'Product {sku}',
+            sku=sku,
+            description='Test product',
+            category=self.category,
+            brand=self.brand,
+            price=Decimal('100.00')
+        )
+    
+    def make_stock(self, sku, quantity, reserved=0, damaged=0, reorder_point=0,
+                   reorder_quantity=0, warehouse=None):
+        return WarehouseStock.objects.create(
+            warehouse=warehouse or self.warehouse,
+            product=self.make_product(sku),
+            quantity=quantity,
+            reserved_quantity=reserved,
+            damaged_quantity=damaged,
+            reorder_point=reorder_point,
+            reorder_quantity=reorder_quantity
+        )
+
+
+class MonitorStockLevelsTests(InventoryTestMixin, TestCase):
+    """SQL bucketing gives the same alerts as the old per-row if/elif chain"""
+    
+    @staticmethod
+    def old_bucket(stock):
+        if stock.quantity == 0:
+            return 'out_of_stock'
+        elif stock.quantity <= stock.reorder_point and stock.reorder_point > 0:
+            return 'low_stock'
+        elif stock.needs_reorder:
+            return 'reorder_point'
+        elif stock.reorder_quantity > 0 and stock.quantity > stock.reorder_quantity * 3:
+            return 'overstock'
+        return 'ok'
+    
+    def setUp(self):
+        super().setUp()
+        self.stocks = [
+            self.make_stock('OUT', 0, reorder_point=5, reorder_quantity=10),
+            self.make_stock('LOW', 3, reorder_point=5, reorder_quantity=10),
+            self.make_stock('RESERVED', 8, reserved=4, reorder_point=5, reorder_quantity=10),
+            self.make_stock('NO-RP', 2, reserved=1, damaged=2),
+            self.make_stock('OVER', 40, reorder_point=5, reorder_quantity=10),
+            self.make_stock('OK', 20, reorder_point=5, reorder_quantity=10),
+            self.make_stock('NO-RQ', 10),
+        ]
+        inactive = Warehouse.objects.create(name='Closed', code='CLOSED', manager=self.user, is_active=False)
+        self.make_stock('INACTIVE', 0, reorder_point=5, warehouse=inactive)
+        # Start from no alerts so every bucket is created by the task itself
+        StockAlert.objects.all().delete()
+    
+    @patch('inventory.tasks.send_stock_alert_summary')
+    def test_buckets_match_previous_classification(self, mock_summary):
+        from .tasks import monitor_stock_levels
+        
+        result = monitor_stock_levels()
+        
+        expected = {bucket: 0 for bucket in ('low_stock', 'out_of_stock', 'reorder_point', 'overstock')}
+        for stock in self.stocks:
+            bucket = self.old_bucket(stock)
+            if bucket != 'ok':
+                expected[bucket] += 1
+            open_types = set(StockAlert.objects.filter(
+                warehouse=stock.warehouse, product=stock.product, is_resolved=False
+            ).values_list('alert_type', flat=True))
+            self.assertEqual(open_types, set() if bucket == 'ok' else {bucket}, msg=stock.product.sku)
+        
+        self.assertEqual(result, expected)
+        self.assertFalse(StockAlert.objects.filter(warehouse__is_active=False).exists())
+        mock_summary.delay.assert_called_once_with(expected)
+    
+    @patch('inventory.tasks.send_stock_alert_summary')
+    def test_second_run_creates_no_duplicates(self, mock_summary):
+        from .tasks import monitor_stock_levels
+        
+        monitor_stock_levels()
+        count = StockAlert.objects.count()
+        result = monitor_stock_levels()
+        
+        self.assertEqual(sum(result.values()), 0)
+        self.assertEqual(StockAlert.objects.count(), count)
+    
+    @patch('inventory.tasks.send_stock_alert_summary')
+    def test_healthy_stock_resolves_stock_level_alerts(self, mock_summary):
+        from .tasks import monitor_stock_levels
+        
+        healthy = self.stocks[5]
+        reorder_alert = StockAlert.objects.create(
+            alert_type='reorder_point', warehouse=self.warehouse, product=healthy.product,
+            message='Needs reordering', current_quantity=4
+        )
+        overstock_alert = StockAlert.objects.create(
+            alert_type='overstock', warehouse=self.warehouse, product=healthy.product,
+            message='Overstocked', current_quantity=40
+        )
+        
+        monitor_stock_levels()
+        
+        reorder_alert.refresh_from_db()
+        overstock_alert.refresh_from_db()
+        self.assertTrue(reorder_alert.is_resolved)
+        self.assertIsNotNone(reorder_alert.resolved_at)
+        self.assertFalse(overstock_alert.is_resolved)
+
+
+class OpenStockAlertConstraintTests(InventoryTestMixin, TestCase):
+    """uniq_open_stock_alert allows one open alert per type/warehouse/product"""
+    
+    def setUp(self):
+        super().setUp()
+        self.product = self.make_product('ALERT-1')
+        self.alert_fields = {
+            'alert_type': 'low_stock',
+            'warehouse': self.warehouse,
+            'product': self.product,
+            'message': 'Low stock',
+            'current_quantity': 1,
+        }
+        StockAlert.objects.create(**self.alert_fields)
+    
+    def test_second_open_alert_is_rejected(self):
+        with transaction.atomic(), self.assertRaises(IntegrityError):
+            StockAlert.objects.create(**self.alert_fields)
+    
+    def test_resolved_duplicates_are_allowed(self):
+        StockAlert.objects.create(is_resolved=True, **self.alert_fields)
+        StockAlert.objects.create(is_resolved=True, **self.alert_fields)
+        
+        self.assertEqual(StockAlert.objects.filter(product=self.product).count(), 3)
+
+
+class ResolveDuplicateOpenAlertsMigrationTests(TransactionTestCase):
+    """0003 closes duplicate open alerts before adding uniq_open_stock_alert"""
+    
+    migrate_from = [('inventory', '0002_inventorytransfer_stockalert_stockcount_and_more')]
+    migrate_to = [('inventory', '0003_stockalert_uniq_open_stock_alert')]
+    
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        # Other apps stay migrated; build their models at their latest state
+        targets = [key for key in executor.loader.graph.leaf_nodes() if key[0] != 'inventory']
+        apps = executor.loader.project_state(targets + self.migrate_from).apps
+        
+        User = apps.get_model('auth', 'User')
+        Category = apps.get_model('products', 'Category')
+        Brand = apps.get_model('products', 'Brand')
+        Product = apps.get_model('products', 'Product')
+        Warehouse = apps.get_model('inventory', 'Warehouse')
+        StockAlert = apps.get_model('inventory', 'StockAlert')
+        
+        manager = User.objects.create(username='migrationmanager')
+        warehouse = Warehouse.objects.create(name='Main Warehouse', code='MAIN', manager=manager)
+        product = Product.objects.create(
+            name='Migration Product',
+            sku='MIG-1',
+            description='Test product',
+            category=Category.objects.create(name='Speakers'),
+            brand=Brand.objects.create(name='SoundWave'),
+            price=Decimal('100.00')
+        )
+        alert_fields = {
+            'warehouse': warehouse,
+            'product': product,
+            'message': 'Alert',
+            'current_quantity': 1,
+        }
+        self.low_stock_ids = [
+            StockAlert.objects.create(alert_type='low_stock', **alert_fields).id
+            for _ in range(3)
+        ]
+        self.overstock_id = StockAlert.objects.create(alert_type='overstock', **alert_fields).id
+        self.resolved_id = StockAlert.objects.create(
+            alert_type='low_stock', is_resolved=True, **alert_fields
+        ).id
+        
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        self.apps = executor.loader.project_state(self.migrate_to).apps
+    
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+    
+    def test_only_newest_duplicate_stays_open(self):
+        StockAlert = self.apps.get_model('inventory', 'StockAlert')
+        
+        open_ids = set(StockAlert.objects.filter(is_resolved=False).values_list('id', flat=True))
+        
+        self.assertEqual(open_ids, {max(self.low_stock_ids), self.overstock_id})
+        closed = StockAlert.objects.filter(id__in=self.low_stock_ids[:-1])
+        self.assertTrue(all(a.resolution_notes == 'Duplicate alert closed automatically' for a in closed))
+        self.assertEqual(StockAlert.objects.get(id=self.resolved_id).resolution_notes, '')
+
+
+class StockTurnoverTests(InventoryTestMixin, TestCase):
+    """TURNOVER_SQL reports the same movers as the old per-product loop"""
+    
+    def setUp(self):
+        super().setUp()
+        self.make_stock('SLOW', 100)
+        self.make_stock('FAST', 10)
+        self.make_stock('IDLE', 50)
+        self.make_stock('STEADY', 60)
+        self.make_stock('EMPTY', 0)
+        for sku, sold in (('SLOW', 10), ('FAST', 100), ('STEADY', 60), ('EMPTY', 5)):
+            StockMovement.objects.create(
+                warehouse=self.warehouse,
+                product=Product.objects.get(sku=sku),
+                movement_type='sale',
+                quantity=-sold,
+                created_by=self.user
+            )
+    
+    def old_turnover(self):
+        ninety_days_ago = timezone.now() - timedelta(days=90)
+        slow_movers, fast_movers, no_movement = [], [], []
+        product_ids = WarehouseStock.objects.filter(
+            warehouse__is_active=True, quantity__gt=0
+        ).values_list('product', flat=True).distinct()
+        for product in Product.objects.filter(id__in=product_ids):
+            total_sold = abs(StockMovement.objects.filter(
+                product=product, movement_type='sale', created_at__gte=ninety_days_ago
+            ).aggregate(total=Sum('quantity'))['total'] or 0)
+            stock = WarehouseStock.objects.filter(product=product).aggregate(total=Sum('quantity'))['total'] or 0
+            if stock > 0 and total_sold > 0:
+                turnover_rate = total_sold / stock
+                days_to_sell = 90 / turnover_rate
+                item = {
+                    'product': product.name,
+                    'sku': product.sku,
+                    'stock': stock,
+                    'sold_90d': total_sold,
+                    'turnover_rate': round(turnover_rate, 2),
+                    'days_to_sell': round(days_to_sell, 1)
+                }
+                if days_to_sell > 180:
+                    slow_movers.append(item)
+                elif days_to_sell < 30:
+                    fast_movers.append(item)
+            elif stock > 0:
+                no_movement.append({'product': product.name, 'sku': product.sku, 'stock': stock})
+        slow_movers.sort(key=lambda x: x['days_to_sell'], reverse=True)
+        fast_movers.sort(key=lambda x: x['turnover_rate'], reverse=True)
+        return slow_movers, fast_movers, no_movement
+    
+    @patch('inventory.tasks.send_mail_to_admins')
+    def test_turnover_matches_previous_calculation(self, mock_send_mail):
+        from .tasks import analyze_stock_turnover
+        
+        result = analyze_stock_turnover()
+        slow_movers, fast_movers, no_movement = self.old_turnover()
+        
+        self.assertEqual(result['slow_movers'], slow_movers)
+        self.assertEqual(result['fast_movers'], fast_movers[:10])
+        self.assertEqual(
+            sorted(result['no_movement'], key=lambda x: x['sku']),
+            sorted(no_movement, key=lambda x: x['sku'])
+        )
+        self.assertEqual(result['slow_movers_count'], len(slow_movers))
+        self.assertEqual(result['fast_movers_count'], len(fast_movers))
+        self.assertEqual(result['no_movement_count'], len(no_movement))
+        mock_send_mail.assert_called_once()
+
+class ReorderRecommendationTests(InventoryTestMixin, TestCase):
+    """The annotated reorder query matches the old per-row calculation"""
+    
+    def setUp(self):
+        super().setUp()
+        # sku: (quantity, reserved, reorder_point, reorder_quantity, sold in 30 days)
+        rows = {
+            'ONE-SALE': (2, 0, 10, 5, 1),
+            'MIN-QTY': (5, 0, 10, 20, 7),
+            'CRITICAL': (3, 0, 10, 4, 90),
+            'RESERVED': (8, 2, 8, 6, 45),
+            'NO-SALES': (1, 0, 5, 12, 0),
+            'HIGH': (10, 0, 20, 5, 30),
+        }
+        for sku, (quantity, reserved, reorder_point, reorder_quantity, sold) in rows.items():
+            stock = self.make_stock(sku, quantity, reserved=reserved, reorder_point=reorder_point,
+                                    reorder_quantity=reorder_quantity)
+            if sold:
+                StockMovement.objects.create(
+                    warehouse=self.warehouse,
+                    product=stock.product,
+                    movement_type='sale',
+                    quantity=-sold,
+                    created_by=self.user
+                )
+        Product.objects.filter(sku__in=['ONE-SALE', 'CRITICAL', 'RESERVED']).update(cost_price=Decimal('12.50'))
+        # Above the reorder point, so not recommended
+        self.make_stock('HEALTHY', 50, reorder_point=10, reorder_quantity=5)
+    
+    def old_recommendations(self):
+        thirty_days_ago = timezone.now() - timedelta(days=30)
+        recommendations = []
+        total_reorder_cost = Decimal('0.00')
+        for stock in WarehouseStock.objects.filter(
+            warehouse__is_active=True, quantity__lte=F('reorder_point'), reorder_quantity__gt=0
+        ).select_related('warehouse', 'product'):
+            recent_sales = StockMovement.objects.filter(
+                warehouse=stock.warehouse, product=stock.product,
+                movement_type='sale', created_at__gte=thirty_days_ago
+            ).aggregate(total_sold=Sum('quantity'))['total_sold'] or 0
+            daily_sales_rate = abs(recent_sales) / 30.0 if recent_sales else 0
+            days_remaining = stock.available_quantity / daily_sales_rate if daily_sales_rate > 0 else 999
+            if daily_sales_rate > 0:
+                recommended_qty = int((daily_sales_rate * 30) + stock.reorder_point)
+            else:
+                recommended_qty = stock.reorder_quantity
+            recommended_qty = max(recommended_qty, stock.reorder_quantity)
+            order_cost = Decimal('0.00')
+            if stock.product.cost_price:
+                order_cost = recommended_qty * stock.product.cost_price
+                total_reorder_cost += order_cost
+            priority = 1 if days_remaining < 7 else 2 if days_remaining < 14 else 3 if days_remaining < 30 else 4
+            recommendations.append({
+                'sku': stock.product.sku,
+                'available': stock.available_quantity,
+                'daily_sales_rate': round(daily_sales_rate, 2),
+                'days_remaining': round(days_remaining, 1),
+                'recommended_qty': recommended_qty,
+                'order_cost': float(order_cost),
+                'priority': priority,
+            })
+        return recommendations, total_reorder_cost
+    
+    @patch('inventory.tasks.send_mail_to_admins')
+    def test_recommendations_match_previous_calculation(self, mock_send_mail):
+        from .tasks import generate_reorder_recommendations
+        
+        result = generate_reorder_recommendations()
+        expected, total_cost = self.old_recommendations()
+        
+        fields = list(expected[0])
+        actual = [{field: r[field] for field in fields} for r in result['recommendations']]
+        self.assertEqual(
+            sorted(actual, key=lambda r: r['sku']),
+            sorted(expected, key=lambda r: r['sku'])
+        )
+        self.assertEqual(
+            [(r['priority'], r['days_remaining']) for r in result['recommendations']],
+            sorted((r['priority'], r['days_remaining']) for r in expected)
+        )
+        self.assertEqual(result['total_cost'], float(total_cost))
+        self.assertEqual(result['critical_count'], sum(1 for r in expected if r['priority'] == 1))
+    
+    @patch('inventory.tasks.send_mail_to_admins')
+    def test_single_sale_adds_one_unit(self, mock_send_mail):
+        """One unit sold in 30 days recommends reorder_point + 1"""
+        from .tasks import generate_reorder_recommendations
+        
+        result = generate_reorder_recommendations()
+        
+        one_sale = next(r for r in result['recommendations'] if r['sku'] == 'ONE-SALE')
+        self.assertEqual(one_sale['recommended_qty'], 11)
+
+
+class ValuationReportTests(InventoryTestMixin, TestCase):
+    """SQL valuation sums match the old per-warehouse and per-category loops"""
+    
+    def setUp(self):
+        super().setUp()
+        self.overflow = Warehouse.objects.create(name='Overflow', code='OVER', manager=self.user)
+        closed = Warehouse.objects.create(name='Closed', code='SHUT', manager=self.user, is_active=False)
+        cables = Category.objects.create(name='Cables')
+        Category.objects.create(name='Unused')
+        # sku: (warehouse, quantity, cost price, category)
+        rows = {
+            'AMP': (self.warehouse, 10, Decimal('5.00'), self.category),
+            'NO-COST': (self.warehouse, 4, None, self.category),
+            'SOLD-OUT': (self.warehouse, 0, Decimal('9.99'), self.category),
+            'HDMI': (self.overflow, 3, Decimal('20.50'), cables),
+            'RCA': (closed, 100, Decimal('1.25'), cables),
+        }
+        for sku, (warehouse, quantity, cost_price, category) in rows.items():
+            stock = self.make_stock(sku, quantity, warehouse=warehouse)
+            Product.objects.filter(pk=stock.product_id).update(cost_price=cost_price, category=category)
+    
+    def old_valuation(self):
+        warehouse_valuations = []
+        for warehouse in Warehouse.objects.filter(is_active=True):
+            value, units = Decimal('0.00'), 0
+            for stock in WarehouseStock.objects.filter(warehouse=warehouse).select_related('product'):
+                if stock.product.cost_price:
+                    value += stock.quantity * stock.product.cost_price
+                units += stock.quantity
+            warehouse_valuations.append({
+                'warehouse': warehouse.name,
+                'value': value,
+                'units': units,
+                'capacity_usage': warehouse.capacity_percentage
+            })
+        category_valuations = []
+        for category in Category.objects.all():
+            value, units = Decimal('0.00'), 0
+            for stock in WarehouseStock.objects.filter(product__category=category).select_related('product'):
+                if stock.product.cost_price:
+                    value += stock.quantity * stock.product.cost_price
+                units += stock.quantity
+            if value > 0:
+                category_valuations.append({'category': category.name, 'value': value, 'units': units})
+        category_valuations.sort(key=lambda x: x['value'], reverse=True)
+        return warehouse_valuations, category_valuations
+    
+    @patch('inventory.tasks.send_mail_to_admins')
+    def test_valuation_matches_previous_calculation(self, mock_send_mail):
+        from .tasks import generate_inventory_valuation_report
+        
+        result = generate_inventory_valuation_report()
+        warehouses, categories = self.old_valuation()
+        
+        self.assertEqual(result['warehouses'], warehouses)
+        self.assertEqual(result['categories'], categories[:5])
+        self.assertEqual(result['total_value'], float(sum((wh['value'] for wh in warehouses), Decimal('0.00'))))
+        self.assertEqual(result['total_units'], sum(wh['units'] for wh in warehouses))
+        mock_send_mail.assert_called_once()
+
+
+class SlowMovingStockTests(InventoryTestMixin, TestCase):
+    """Slow-moving stock is stocked products with no order in the last 90 days"""
+    
+    @patch('orders.tasks.send_order_confirmation_email.delay')
+    def setUp(self, mock_confirmation):
+        super().setUp()
+        overflow = Warehouse.objects.create(name='Overflow', code='OVER', manager=self.user)
+        address = Address.objects.create(
+            customer=self.user.customer,
+            address_type='shipping',
+            street_address='1 Moi Avenue',
+            city='Nairobi',
+            postal_code='00100'
+        )
+        self.make_stock('RECENT', 5)
+        self.make_stock('OLD-ORDER', 5)
+        self.make_stock('NEVER-SOLD', 5)
+        self.make_stock('SOLD-OUT', 0)
+        # Same product stocked in two warehouses counts once
+        WarehouseStock.objects.create(
+            warehouse=overflow, product=Product.objects.get(sku='NEVER-SOLD'), quantity=2
+        )
+        for sku, age in (('RECENT', 10), ('RECENT', 200), ('OLD-ORDER', 120), ('SOLD-OUT', 120)):
+            order = Order.objects.create(
+                customer=self.user.customer,
+                billing_address=address,
+                shipping_address=address,
+                subtotal=Decimal('100.00'),
+                total=Decimal('100.00')
+            )
+            OrderItem.objects.create(
+                order=order,
+                product=Product.objects.get(sku=sku),
+                quantity=1,
+                price=Decimal('100.00')
+            )
+            Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(days=age))
+    
+    @patch('inventory.tasks.send_mail_to_admins')
+    def test_counts_stocked_products_without_recent_orders(self, mock_send_mail):
+        from .tasks import generate_inventory_valuation_report
+        
+        result = generate_inventory_valuation_report()
+        
+        # OLD-ORDER and NEVER-SOLD; the old join on any order older than 90 days
+        # counted RECENT and SOLD-OUT instead and missed NEVER-SOLD
+        self.assertEqual(result['slow_moving_count'], 2)
+
+
+class StockCountDiscrepancyTests(InventoryTestMixin, TestCase):
+    """SQL discrepancy aggregates match the old loop over every counted item"""
+    
+    def setUp(self):
+        super().setUp()
+        overflow = Warehouse.objects.create(name='Overflow', code='OVER', manager=self.user)
+        amp = self.make_product('AMP')
+        cable = self.make_product('CABLE')
+        mic = self.make_product('MIC')
+        Product.objects.filter(pk__in=[amp.pk, cable.pk]).update(cost_price=Decimal('4.00'))
+        now = timezone.now()
+        # (warehouse, status, completed days ago, [(product, expected, counted)])
+        counts = [
+            (self.warehouse, 'completed', 5, [(amp, 10, 7), (cable, 5, 5), (mic, 3, 6)]),
+            (overflow, 'completed', 2, [(amp, 10, 12)]),
+            (self.warehouse, 'completed', 40, [(mic, 8, 1)]),
+            (overflow, 'in_progress', None, [(cable, 4, 9)]),
+        ]
+        for warehouse, status, days_ago, items in counts:
+            stock_count = StockCount.objects.create(
+                warehouse=warehouse,
+                status=status,
+                scheduled_date=now.date(),
+                completed_at=now - timedelta(days=days_ago) if days_ago is not None else None,
+                assigned_to=self.user
+            )
+            for product, expected, counted in items:
+                StockCountItem.objects.create(
+                    stock_count=stock_count,
+                    product=product,
+                    expected_quantity=expected,
+                    counted_quantity=counted
+                )
+    
+    def old_analysis(self):
+        completed_counts = StockCount.objects.filter(
+            status='completed', completed_at__gte=timezone.now() - timedelta(days=30)
+        ).prefetch_related('items')
+        total_items, total_discrepancies, value = 0, 0, Decimal('0.00')
+        warehouses, products = defaultdict(int), defaultdict(int)
+        for count in completed_counts:
+            for item in count.items.all():
+                total_items += 1
+                if item.has_discrepancy:
+                    total_discrepancies += 1
+                    if item.product.cost_price:
+                        value += abs(item.discrepancy) * item.product.cost_price
+                    warehouses[count.warehouse.name] += 1
+                    products[f"{item.product.name} ({item.product.sku})"] += 1
+        accuracy_rate = ((total_items - total_discrepancies) / total_items * 100) if total_items > 0 else 100
+        results = {
+            'total_counts': completed_counts.count(),
+            'total_items': total_items,
+            'discrepancies': total_discrepancies,
+            'accuracy_rate': float(accuracy_rate),
+            'discrepancy_value': float(value)
+        }
+        top_warehouses = sorted(warehouses.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_products = sorted(products.items(), key=lambda x: x[1], reverse=True)[:10]
+        return results, top_warehouses, top_products
+    
+    @patch('inventory.tasks.send_mail_to_admins')
+    def test_analysis_matches_previous_calculation(self, mock_send_mail):
+        from .tasks import analyze_stock_count_discrepancies
+        
+        result = analyze_stock_count_discrepancies()
+        expected, top_warehouses, top_products = self.old_analysis()
+        
+        self.assertEqual(result, expected)
+        message = mock_send_mail.call_args[0][1]
+        for i, (warehouse, count) in enumerate(top_warehouses):
+            self.assertIn(f"  {i+1}. {warehouse}: {count} discrepancies", message)
+        for i, (product, count) in enumerate(top_products):
+            self.assertIn(f"  {i+1}. {product}: {count} times", message)
+
+
+class ScheduleStockCountTests(InventoryTestMixin, TestCase):
+    """Batched scheduling creates the same counts and items as the old per-warehouse loop"""
+    
+    def setUp(self):
+        super().setUp()
+        self.overflow = Warehouse.objects.create(name='Overflow', code='OVER', manager=self.user)
+        recent = Warehouse.objects.create(name='Recent', code='RCNT', manager=self.user)
+        Warehouse.objects.create(name='Closed', code='SHUT', manager=self.user, is_active=False)
+        now = timezone.now()
+        for warehouse, days_ago in ((self.overflow, 20), (recent, 3)):
+            StockCount.objects.create(
+                warehouse=warehouse,
+                count_type='cycle',
+                status='completed',
+                scheduled_date=now.date(),
+                completed_at=now - timedelta(days=days_ago),
+                assigned_to=self.user
+            )
+        self.make_stock('AMP', 12)
+        self.make_stock('CABLE', 30)
+        self.make_stock('MIC', 4)
+        self.make_stock('HDMI', 9, warehouse=self.overflow)
+        self.make_stock('RCA', 6, warehouse=recent)
+        # sku: (warehouse, movements in the last 30 days, older movements)
+        movements = {
+            'AMP': (self.warehouse, 3, 0),
+            'CABLE': (self.warehouse, 1, 2),
+            'MIC': (self.warehouse, 0, 4),
+            'HDMI': (self.overflow, 2, 0),
+            'RCA': (recent, 5, 0),
+        }
+        for sku, (warehouse, recent_moves, old_moves) in movements.items():
+            product = Product.objects.get(sku=sku)
+            for i in range(recent_moves + old_moves):
+                movement = StockMovement.objects.create(
+                    warehouse=warehouse,
+                    product=product,
+                    movement_type='adjustment',
+                    quantity=1,
+                    created_by=self.user
+                )
+                if i >= recent_moves:
+                    StockMovement.objects.filter(pk=movement.pk).update(created_at=now - timedelta(days=45))
+        # Moved in Main but not stocked there, so not counted
+        StockMovement.objects.create(
+            warehouse=self.warehouse,
+            product=self.make_product('DONGLE'),
+            movement_type='adjustment',
+            quantity=1,
+            created_by=self.user
+        )
+    
+    def old_schedule(self):
+        """What the old loop would create, as {warehouse: (assignee, {product: expected})}"""
+        expected = {}
+        thirty_days_ago = timezone.now() - timedelta(days=30)
+        for warehouse in Warehouse.objects.filter(is_active=True):
+            last_count = StockCount.objects.filter(
+                warehouse=warehouse, count_type='cycle', status='completed'
+            ).order_by('-completed_at').first()
+            if last_count and (timezone.now() - last_count.completed_at).days < 14:
+                continue
+            product_ids = [
+                item['product'] for item in StockMovement.objects.filter(
+                    warehouse=warehouse, created_at__gte=thirty_days_ago
+                ).values('product').annotate(movement_count=Count('id')).order_by('-movement_count')[:50]
+            ]
+            expected[warehouse.id] = (warehouse.manager_id, {
+                stock.product_id: stock.quantity
+                for stock in WarehouseStock.objects.filter(warehouse=warehouse, product_id__in=product_ids)
+            })
+        return expected
+    
+    @patch('inventory.tasks.send_stock_count_scheduled_notification.delay')
+    def test_schedule_matches_previous_loop(self, mock_notify):
+        from .tasks import schedule_automatic_stock_counts
+        
+        expected = self.old_schedule()
+        result = schedule_automatic_stock_counts()
+        
+        scheduled = StockCount.objects.filter(status='scheduled').prefetch_related('items')
+        actual = {
+            count.warehouse_id: (count.assigned_to_id, {
+                item.product_id: item.expected_quantity for item in count.items.all()
+            })
+            for count in scheduled
+        }
+        self.assertEqual(actual, expected)
+        self.assertEqual(set(expected), {self.warehouse.id, self.overflow.id})
+        self.assertEqual(result, f"Scheduled {len(expected)} stock counts")
+        self.assertEqual(
+            sorted(call.args[0] for call in mock_notify.call_args_list),
+            sorted(count.id for count in scheduled)
+        )
+        for count in scheduled:
+            self.assertEqual(count.scheduled_date, timezone.now().date() + timedelta(days=7))
+            self.assertEqual(count.count_type, 'cycle')
+
+
+class SyncProductStockTests(InventoryTestMixin, TestCase):
+    """The grouped stock sync leaves products as the old per-product loop would"""
+    
+    def setUp(self):
+        super().setUp()
+        overflow = Warehouse.objects.create(name='Overflow', code='OVER', manager=self.user)
+        self.make_stock('AMP', 12)
+        WarehouseStock.objects.create(warehouse=overflow, product=Product.objects.get(sku='AMP'), quantity=8)
+        self.make_stock('CABLE', 30)
+        self.make_stock('MIC', 0)
+        self.make_product('UNSTOCKED')
+        # Drift product counters away from the warehouse totals
+        Product.objects.filter(sku='AMP').update(stock_quantity=5)
+        Product.objects.filter(sku='MIC').update(stock_quantity=3)
+        Product.objects.filter(sku='UNSTOCKED').update(stock_quantity=7)
+    
+    def old_sync(self):
+        expected, updated_count = {}, 0
+        for product in Product.objects.all():
+            total_stock = WarehouseStock.objects.filter(product=product).aggregate(total=Sum('quantity'))['total'] or 0
+            if product.stock_quantity != total_stock:
+                updated_count += 1
+            expected[product.sku] = total_stock
+        return expected, updated_count
+    
+    def test_sync_matches_previous_loop(self):
+        from .tasks import sync_product_stock_from_warehouses
+        
+        expected, updated_count = self.old_sync()
+        warehouse_stock = list(WarehouseStock.objects.values_list('id', 'quantity'))
+        
+        result = sync_product_stock_from_warehouses()
+        
+        self.assertEqual(result, f"Synced {updated_count} products")
+        self.assertEqual(dict(Product.objects.values_list('sku', 'stock_quantity')), expected)
+        # Warehouse rows are untouched by the product update
+        self.assertEqual(list(WarehouseStock.objects.values_list('id', 'quantity')), warehouse_stock)
+        self.assertEqual(sync_product_stock_from_warehouses(), "Synced 0 products")
+
+
+class TransferNotificationOutboxTests(InventoryTestMixin, TestCase):
+    """Transfer notifications are queued in Redis and delivered by the flush task"""
+    
+    def setUp(self):
+        super().setUp()
+        self.redis = FakeRedis()
+        patcher = patch('inventory.tasks.get_redis_connection', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        receiver = User.objects.create_user(
+            username='receivingmanager',
+            email='receiving@example.com',
+            password='testpass123'
+        )
+        destination = Warehouse.objects.create(name='Branch', code='BRANCH', manager=receiver)
+        self.transfer = InventoryTransfer.objects.create(
+            from_warehouse=self.warehouse,
+            to_warehouse=destination,
+            requested_by=self.user
+        )
+        TransferItem.objects.create(transfer=self.transfer, product=self.make_product('TRF-1'), quantity=3)
+    
+    def queue(self, subject, attempts=None):
+        data = {'subject': subject, 'body': 'Body', 'to': ['manager@example.com']}
+        if attempts is not None:
+            data['attempts'] = attempts
+        self.redis.rpush(TRANSFER_OUTBOX_KEY, json.dumps(data))
+    
+    def test_notification_is_queued_then_sent(self):
+        from .tasks import send_transfer_notification, flush_transfer_notifications
+        
+        send_transfer_notification(self.transfer.id, 'approved')
+        
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(len(self.redis.lists[TRANSFER_OUTBOX_KEY]), 1)
+        
+        flush_transfer_notifications()
+        
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.subject, f'Transfer Approved: {self.transfer.transfer_number}')
+        self.assertEqual(message.to, ['manager@example.com', 'receiving@example.com'])
+        self.assertIn('Product TRF-1: 3 units', message.body)
+        self.assertEqual(self.redis.lists[TRANSFER_OUTBOX_KEY], [])
+    
+    def test_failures_requeue_or_dead_letter_only_that_message(self):
+        from .tasks import flush_transfer_notifications
+        
+        for subject in ('delivered', 'transient', 'rejected'):
+            self.queue(subject)
+        
+        side_effect = [1, SMTPServerDisconnected('dropped'), SMTPRecipientsRefused({})]
+        with patch.object(EmailMultiAlternatives, 'send', side_effect=side_effect):
+            flush_transfer_notifications()
+        
+        retried = [json.loads(raw) for raw in self.redis.lists[TRANSFER_OUTBOX_KEY]]
+        dead = [json.loads(raw) for raw in self.redis.lists[TRANSFER_DEAD_LETTER_KEY]]
+        self.assertEqual([(d['subject'], d['attempts']) for d in retried], [('transient', 1)])
+        self.assertEqual([d['subject'] for d in dead], ['rejected'])
+        # Nothing is left behind in a processing list
+        self.assertEqual(
+            sum(len(values) for values in self.redis.lists.values()), len(retried) + len(dead)
+        )
+        self.assertEqual(self.redis.zsets[TRANSFER_PROCESSING_RUNS_KEY], {})
+    
+    def test_message_out_of_attempts_is_dead_lettered(self):
+        from .tasks import flush_transfer_notifications
+        
+        self.queue('flaky', attempts=TRANSFER_NOTIFICATION_MAX_ATTEMPTS - 1)
+        
+        with patch.object(EmailMultiAlternatives, 'send', side_effect=SMTPServerDisconnected('dropped')):
+            flush_transfer_notifications()
+        
+        self.assertEqual(self.redis.lists[TRANSFER_OUTBOX_KEY], [])
+        dead = [json.loads(raw) for raw in self.redis.lists[TRANSFER_DEAD_LETTER_KEY]]
+        self.assertEqual([(d['subject'], d['attempts']) for d in dead],
+                         [('flaky', TRANSFER_NOTIFICATION_MAX_ATTEMPTS)])
+    
+    def test_worker_dying_mid_flush_loses_nothing(self):
+        from .tasks import flush_transfer_notifications
+        
+        class WorkerDied(BaseException):
+            pass
+        
+        for subject in ('delivered', 'in flight', 'untouched'):
+            self.queue(subject)
+        
+        with patch.object(EmailMultiAlternatives, 'send', side_effect=[1, WorkerDied()]):
+            with self.assertRaises(WorkerDied):
+                flush_transfer_notifications()
+        
+        held = [json.loads(raw)['subject'] for values in self.redis.lists.values() for raw in values]
+        self.assertEqual(sorted(held), ['in flight', 'untouched'])
+        
+        # Age the dead run past the stale cutoff; the next flush recovers it
+        runs = self.redis.zsets[TRANSFER_PROCESSING_RUNS_KEY]
+        for run_id in runs:
+            runs[run_id] -= TRANSFER_PROCESSING_STALE_SECONDS + 1
+        flush_transfer_notifications()
+        
+        self.assertEqual([m.subject for m in mail.outbox], ['in flight', 'untouched'])
+        self.assertFalse(any(self.redis.lists.values()))
+        self.assertEqual(runs, {})
+
+
+class WarehouseCapacityTests(InventoryTestMixin, TestCase):
+    """Capacity counter updates, threshold alerts and the daily recompute"""
+    
+    def setUp(self):
+        super().setUp()
+        self.warehouse.max_capacity = Decimal('100.00')
+        self.warehouse.save()
+    
+    def set_capacity(self, value):
+        Warehouse.objects.filter(pk=self.warehouse.pk).update(current_capacity=value)
+    
+    def test_counter_never_goes_below_zero(self):
+        self.set_capacity(Decimal('3.00'))
+        
+        self.assertEqual(self.warehouse.adjust_capacity(Decimal('-5')), Decimal('0.00'))
+        self.warehouse.refresh_from_db()
+        self.assertEqual(self.warehouse.current_capacity, Decimal('0.00'))
+    
+    @patch('inventory.tasks.send_capacity_alert')
+    def test_crossing_a_threshold_queues_alert_on_commit(self, mock_alert):
+        self.set_capacity(Decimal('65.00'))
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.warehouse.adjust_capacity(Decimal('10'))
+            mock_alert.delay.assert_not_called()
+        for callback in callbacks:
+            callback()
+        
+        mock_alert.delay.assert_called_once_with(
+            [{'warehouse': 'Main Warehouse', 'usage': 75.0, 'priority': 'medium'}]
+        )
+    
+    @patch('inventory.tasks.send_capacity_alert')
+    def test_no_alert_within_a_bucket_or_on_decrease(self, mock_alert):
+        self.set_capacity(Decimal('75.00'))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.warehouse.adjust_capacity(Decimal('2'))
+            self.warehouse.adjust_capacity(Decimal('-20'))
+        
+        mock_alert.delay.assert_not_called()
+    
+    @patch('inventory.tasks.send_capacity_alert')
+    def test_daily_monitor_recomputes_drifted_counter(self, mock_alert):
+        from .tasks import monitor_warehouse_capacity
+        
+        stock = self.make_stock('BOX', 85)
+        Product.objects.filter(pk=stock.product_id).update(
+            dimensions={'length': 100, 'width': 100, 'height': 100}
+        )
+        # Stock written without a StockMovement leaves the counter behind
+        self.set_capacity(Decimal('10.00'))
+        
+        result = monitor_warehouse_capacity()
+        
+        self.warehouse.refresh_from_db()
+        self.assertEqual(self.warehouse.current_capacity, Decimal('85.00'))
+        self.assertEqual(result['alerts'], [{'warehouse': 'Main Warehouse', 'usage': 85.0, 'priority': 'high'}])
+        mock_alert.delay.assert_called_once_with(result['alerts'])
@@ -0,0 +1,32 @@
+"""
+Celery Beat schedule for the orders app.
+Merged into the project-wide schedule by backend/celery.py.
+
+Daily 9 AM and 11 PM jobs are not listed here; they are fanned out by the
+dispatch_daily_9am / dispatch_nightly_reports tasks in backend/celery.py.
+"""
+from backend.schedules import crontab
+
+
+BEAT_SCHEDULE = {
+    'auto-confirm-paid-orders': {
+        'task': 'orders.tasks.auto_confirm_paid_orders',
+        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+    },
+    'auto-cancel-unpaid-orders': {
+        'task': 'orders.tasks.auto_cancel_unpaid_orders',
+        'schedule': crontab(hour=2, minute=0),  # Daily at 2 AM
+    },
+    'check-pending-orders': {
+        'task': 'orders.tasks.check_pending_orders',
+        'schedule': crontab(minute=0),  # Every hour
+    },
+    'sync-tracking-updates': {
+        'task': 'orders.tasks.sync_tracking_updates',
+        'schedule': crontab(minute=0, hour='*/6'),  # Every 6 hours
+    },
+    'cleanup-old-order-data': {
+        'task': 'orders.tasks.cleanup_old_order_data',
+        'schedule': crontab(day_of_week=0, hour=3, minute=0),  # Every Sunday at 3 AM
+    },
+}
@@ -0,0 +1,33 @@
+"""
+Celery Beat schedule for the payments app.
+Merged into the project-wide schedule by backend/celery.py.
+"""
+from backend.schedules import crontab
+
+
+BEAT_SCHEDULE = {
+    'check-pending-mpesa-transactions': {
+        'task': 'payments.tasks.check_pending_transactions',
+        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+    },
+    'auto-timeout-stuck-transactions': {
+        'task': 'payments.tasks.auto_timeout_stuck_transactions',
+        'schedule': crontab(minute=0),  # Every hour
+    },
+    'monitor-failed-payments': {
+        'task': 'payments.tasks.monitor_failed_payments',
+        'schedule': crontab(minute=30),  # Every hour at minute 30
+    },
+    'reconcile-daily-mpesa-transactions': {
+        'task': 'payments.tasks.reconcile_daily_transactions',
+        'schedule': crontab(hour=23, minute=30),  # Daily at 11:30 PM [long]
+    },
+    'cleanup-old-mpesa-callbacks': {
+        'task': 'payments.tasks.cleanup_old_callbacks',
+        'schedule': crontab(day_of_week=0, hour=2, minute=0),  # Every Sunday at 2 AM
+    },
+    'refresh-mpesa-access-tokens': {
+        'task': 'payments.tasks.refresh_mpesa_access_tokens',
+        'schedule': crontab(minute='*/50'),  # Every 50 minutes
+    },
+}
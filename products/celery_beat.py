@@ -0,0 +1,52 @@
+"""
+Celery Beat schedule for the products app.
+Merged into the project-wide schedule by backend/celery.py.
+
+Daily 9 AM and 11 PM jobs are not listed here; they are fanned out by the
+dispatch_daily_9am / dispatch_nightly_reports tasks in backend/celery.py.
+"""
+from backend.schedules import crontab
+
+
+BEAT_SCHEDULE = {
+    'check-low-stock-products': {
+        'task': 'products.tasks.check_low_stock_products',
+        'schedule': crontab(minute=0),  # Every hour
+    },
+    'check-out-of-stock-products': {
+        'task': 'products.tasks.check_out_of_stock_products',
+        'schedule': crontab(minute=0, hour='*/2'),  # Every 2 hours
+    },
+    'auto-deactivate-out-of-stock': {
+        'task': 'products.tasks.auto_deactivate_out_of_stock_products',
+        'schedule': crontab(day_of_week=1, hour=3, minute=0),  # Every Monday at 3 AM
+    },
+    'auto-approve-verified-reviews': {
+        'task': 'products.tasks.auto_approve_verified_reviews',
+        'schedule': crontab(hour=2, minute=0),  # Daily at 2 AM
+    },
+    'expire-sales-daily': {
+        'task': 'products.tasks.expire_sale_prices',
+        'schedule': crontab(hour=0, minute=5),  # Daily at 12:05 AM
+    },
+    'expire-new-arrivals-daily': {
+        'task': 'products.tasks.expire_new_arrivals',
+        'schedule': crontab(hour=0, minute=10),  # Daily at 12:10 AM
+    },
+    'activate-scheduled-products': {
+        'task': 'products.tasks.activate_scheduled_products',
+        'schedule': crontab(hour=0, minute=15),  # Daily at 12:15 AM
+    },
+    'update-bestsellers-daily': {
+        'task': 'products.tasks.update_bestseller_status',
+        'schedule': crontab(hour=3, minute=0),  # Daily at 3 AM
+    },
+    'update-product-popularity-scores': {
+        'task': 'products.tasks.update_product_popularity_scores',
+        'schedule': crontab(hour=4, minute=0),  # Daily at 4 AM [long]
+    },
+    'cleanup-orphaned-product-images': {
+        'task': 'products.tasks.cleanup_orphaned_product_images',
+        'schedule': crontab(day_of_week=0, hour=4, minute=0),  # Every Sunday at 4 AM [long]
+    },
+}